@@ -1,5 +1,6 @@
 import glob
 import os
+import shutil
 
 from dotenv import load_dotenv
 from flask import Flask
@@ -7,12 +8,22 @@ from flask.testing import FlaskClient
 
 from error_handler import ErrorHandler
 from helpers.config import Config
+from helpers.content_addressed_storage import ContentAddressedStorage
+from helpers.file_delivery import FileDelivery
 from helpers.codemaze_logger import CodemazeLogger
+from helpers.read_your_writes import ReadYourWrites
+from helpers.result_memo import ResultMemo
 from helpers.runner_queue_manager import RunnerQueueManager
+from helpers.session_cache import SessionCache
+from helpers.storage import Storage
+from helpers.submission_queue import SubmissionQueue
 from repository.database import Database
 from router import Router
+from runner_worker import RunnerWorker
 from services.session_service import SessionService
 
+FORM_OVERHEAD_BYTES = 64 * 1024
+
 def __get_path(*relative_path: str) -> str:
     cur_dir = os.path.realpath(os.path.curdir)
     current_path = os.path.split(cur_dir)[1]
@@ -27,14 +38,26 @@ def __init_app(storage_path: str) -> Flask:
     app.config['STORAGE_PATH'] = storage_path
     app.config['SCRIPTS_PATH'] = __get_path('files', 'scripts')
     CodemazeLogger.start(app)
-    Database.initialize(__get_env('CODEMAZE_DB_STRING'), app)
     Config.initialize(__get_path('config.toml'))
+    app.config['MAX_CONTENT_LENGTH'] = __max_content_length()
+    app.config['USE_X_SENDFILE'] = FileDelivery(Config.get('files.delivery')) == FileDelivery.X_SENDFILE
+    ReadYourWrites.initialize(__get_env('REDIS_ADDRESS'))
+    Database.initialize(__get_env('CODEMAZE_DB_STRING'), app, os.getenv('CODEMAZE_READ_DB_STRING') or None)
     RunnerQueueManager.initialize(__get_env('REDIS_ADDRESS'))
+    SubmissionQueue.initialize(__get_env('REDIS_ADDRESS'))
+    ResultMemo.initialize(__get_env('REDIS_ADDRESS'))
+    SessionCache.initialize(__get_env('REDIS_ADDRESS'))
+    Storage.initialize(ContentAddressedStorage())
     SessionService.initialize(key)
     Router(os.getenv('MOSS_USER_ID')).create_routes(app)
     ErrorHandler.register(app)
     return app
 
+def __max_content_length() -> int:
+    # larger bodies are rejected (413) before being parsed - the largest upload is a task, a test case (input and output), or a source code
+    max_files_mb = max(float(Config.get('files.task-max-size-mb')), 2 * float(Config.get('files.test-max-size-mb')), float(Config.get('files.code-max-size-mb')))
+    return int(max_files_mb * 1024 * 1024) + FORM_OVERHEAD_BYTES
+
 def __get_env(name: str) -> str:
     var = os.getenv(name)
     if var is None or var.strip() == '':
@@ -55,12 +78,29 @@ def run_as_debug() -> Flask:
     storage_path = __get_path('files', 'debug')
     return __init_app(storage_path)
 
+def __run_worker(storage_path: str) -> None:
+    app = __init_app(storage_path)
+    for thread in RunnerWorker(app).start(daemon=False):
+        thread.join()
+
+def run_worker() -> None:
+    __set_up()
+    __run_worker(__get_path('files', 'production'))
+
+def run_worker_as_debug() -> None:
+    __set_up()
+    __run_worker(__get_path('files', 'debug'))
+
 def run_as_test() -> FlaskClient:
     __set_up()
     storage_path = __get_path('files', 'test')
     for file in glob.glob(os.path.join(storage_path, '*')):
-        os.remove(file)
+        if os.path.isdir(file):
+            shutil.rmtree(file) # e.g. the compilation cache
+        else:
+            os.remove(file)
     app = __init_app(storage_path)
+    RunnerWorker(app).start(daemon=True)
     return app.test_client()
 
 if __name__ == '__main__':
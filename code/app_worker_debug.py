@@ -0,0 +1,3 @@
+from app import run_worker_as_debug
+
+run_worker_as_debug()
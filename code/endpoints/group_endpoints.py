@@ -7,7 +7,8 @@ from endpoints.models.group import GroupVO
 from endpoints.models.join_request import JoinRequestVO
 from endpoints.models.user import UserVO
 from helpers.authenticator_decorator import authentication_required
-from helpers.exceptions import ServerError, NotFound, Forbidden, Internal_UniqueViolation, Conflict
+from helpers.exceptions import ServerError, NotFound, Forbidden, Internal_UniqueViolation, Conflict, ParameterValidationError
+from helpers.pagination import Cursor, pagination_headers, set_up_pagination_parser
 from helpers.role import Role
 from helpers.unwrapper import unwrap, json_unwrapped
 from services.group_service import GroupService
@@ -15,6 +16,8 @@ from services.session_service import SessionService
 
 _namespace = Namespace('groups', description='')
 
+_requests_page_parser = _namespace.parser()
+
 _new_group_model = _namespace.model('New Group', {
      'name': fields.String(required=True)
 })
@@ -89,7 +92,7 @@ class GroupsResource(Resource): # type: ignore
                 case 'false' | 'False':
                     member_of = False
         try:
-            return unwrap(GroupsResource._group_service).get_all(user if member_of else None, unwrap(SessionService.shared).get_user)
+            return unwrap(GroupsResource._group_service).get_all(user if member_of else None)
         except ServerError as e:
             abort(500, str(e))
 
@@ -165,17 +168,24 @@ class JoinResource(Resource): # type: ignore
 class RequestsResource(Resource): # type: ignore
     _group_service: GroupService | None = None
 
-    @_namespace.doc(description='*Managers only*\nRetrieve a list of join requests.')
+    @_namespace.doc(description='*Managers only*\nRetrieve a list of join requests, oldest first.\nWhen `limit` is set and there are more requests, the `X-Next-Cursor` header is the `after` of the next page.')
+    @_namespace.response(400, 'Error')
     @_namespace.response(401, 'Error')
     @_namespace.response(403, 'Error')
     @_namespace.response(404, 'Error')
     @_namespace.response(500, 'Error')
+    @_namespace.expect(_requests_page_parser, validate=True)
     @_namespace.marshal_with(_join_request_model, as_list=True, envelope='requests')
     @_namespace.doc(security='bearer')
     @authentication_required(Role.MANAGER)
-    def get(self, group_id: int, user: UserVO) -> list[JoinRequestVO]:
+    def get(self, group_id: int, user: UserVO) -> tuple[list[JoinRequestVO], int, dict[str, str]]:
+        args = _requests_page_parser.parse_args()
         try:
-            return unwrap(RequestsResource._group_service).get_students_with_join_request(group_id, user.id)
+            after = Cursor.decode(args.get('after'))
+            requests, next_cursor = unwrap(RequestsResource._group_service).get_students_with_join_request(group_id, user.id, after, args.get('limit'))
+            return requests, 200, pagination_headers(next_cursor)
+        except ParameterValidationError as e:
+            abort(400, str(e))
         except NotFound as e:
             abort(404, str(e))
         except Forbidden as e:
@@ -231,6 +241,7 @@ class GroupStudentResource(Resource): # type: ignore
 
 class GroupEndpoints:
     def __init__(self, api: Api, group_service: GroupService) -> None:
+        set_up_pagination_parser(_requests_page_parser)
         api.add_namespace(_namespace)
         GroupsResource._group_service = group_service
         GroupResource._group_service = group_service
@@ -4,7 +4,7 @@ from flask_restx import Api, Resource, Namespace, fields
 from endpoints.models.user import UserVO
 from endpoints.session_endpoints import user_model
 from helpers.email_validation_decorator import validate_email
-from helpers.exceptions import ServerError, Internal_UniqueViolation, Conflict, Forbidden
+from helpers.exceptions import ServerError, Internal_UniqueViolation, Conflict, Forbidden, ServiceUnavailable
 from helpers.role import Role
 from helpers.unwrapper import json_unwrapped, unwrap
 from services.session_service import SessionService
@@ -22,6 +22,7 @@ class ManagerResource(Resource): # type: ignore
     @_namespace.expect(signup_model, validate=True)
     @_namespace.response(400, 'Error')
     @_namespace.response(500, 'Error')
+    @_namespace.response(503, 'Error')
     @_namespace.marshal_with(user_model, code=201)
     @validate_email()
     def post(self) -> tuple[UserVO, int]:
@@ -34,6 +35,8 @@ class ManagerResource(Resource): # type: ignore
             abort(403, str(e))
         except Internal_UniqueViolation:
             abort(409, str(Conflict()))
+        except ServiceUnavailable as e:
+            abort(503, str(e))
         except ServerError as e:
             abort(500, str(e))
 
@@ -2,15 +2,18 @@ from __future__ import annotations
 
 from endpoints.models.tcase_result_vo import TCaseResultVO
 from helpers.commons import compute_percentage, latest_source_code_download_url
+from helpers.result_status import ResultStatus
 from repository.dto.result import ResultDTO
 
 class ResultVO:
     def __init__(self) -> None:
         self.id = -1
         self.attempt_number = -1
-        self.open_result_percentage: float = -1
+        self.status = ResultStatus.DONE
+        self.error: str | None = None
+        self.open_result_percentage: float | None = -1
         self.closed_result_percentage: float | None = -1
-        self.result_percentage: float = -1
+        self.result_percentage: float | None = -1
         self.source_url = ''
         self.open_results: list[TCaseResultVO] = []
         self.closed_results: list[TCaseResultVO] = []
@@ -22,10 +25,19 @@ class ResultVO:
         vo = ResultVO()
         vo.id = dto.id
         vo.attempt_number = attempt_numer
-        vo.open_result_percentage = round((dto.correct_open / len_open_tests) * 100, 2)
-        vo.closed_result_percentage = round((dto.correct_closed / len_closed_tests) * 100, 2) if len_closed_tests > 0 else None
-        vo.result_percentage = compute_percentage(vo.open_result_percentage, vo.closed_result_percentage, len_open_tests, len_closed_tests)
+        vo.status = ResultStatus(dto.status)
         vo.source_url = latest_source_code_download_url(dto.task_id)
+        vo.error = dto.error
+        if vo.status != ResultStatus.DONE:
+            # not evaluated (yet)
+            vo.open_result_percentage = None
+            vo.closed_result_percentage = None
+            vo.result_percentage = None
+            return vo
+        open_result_percentage = round((dto.correct_open / len_open_tests) * 100, 2)
+        vo.open_result_percentage = open_result_percentage
+        vo.closed_result_percentage = round((dto.correct_closed / len_closed_tests) * 100, 2) if len_closed_tests > 0 else None
+        vo.result_percentage = compute_percentage(open_result_percentage, vo.closed_result_percentage, len_open_tests, len_closed_tests)
         vo.open_results = open_results
         vo.closed_results = closed_results
         return vo
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from helpers.commons import test_download_url_in, test_download_url_out
+from helpers.comparison_mode import ComparisonMode
 from repository.dto.test_case import TestCaseDTO
 
 class TCaseVO:
@@ -9,14 +10,21 @@ class TCaseVO:
         self.input_url: str | None = None
         self.output_url: str | None = None
         self.closed = False
+        self.comparison_mode = ComparisonMode.EXACT
+        self.tolerance: float | None = None
         self.input_path: str | None = None
         self.output_path: str | None = None
+        self.input_sha256: str | None = None
+        self.output_sha256: str | None = None
+        self.output_size: int | None = None
 
     @staticmethod
     def import_from_dto(dto: TestCaseDTO, is_manager: bool) -> TCaseVO:
         vo = TCaseVO()
         vo.id = dto.id
         vo.closed = dto.closed
+        vo.comparison_mode = ComparisonMode(dto.comparison_mode)
+        vo.tolerance = dto.tolerance
         if vo.closed is False or is_manager is True:
             # The manager can download the files
             vo.input_url = test_download_url_in(dto.id)
@@ -28,6 +36,11 @@ class TCaseVO:
         vo = TCaseVO()
         vo.id = dto.id
         vo.closed = dto.closed
+        vo.comparison_mode = ComparisonMode(dto.comparison_mode)
+        vo.tolerance = dto.tolerance
         vo.input_path = dto.input_file_path
         vo.output_path = dto.output_file_path
+        vo.input_sha256 = dto.input_sha256
+        vo.output_sha256 = dto.output_sha256
+        vo.output_size = dto.output_size
         return vo
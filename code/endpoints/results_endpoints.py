@@ -1,6 +1,6 @@
 # pylint: disable=duplicate-code
 
-from flask import abort, send_file
+from flask import abort
 from flask.wrappers import Response
 from flask_restx import Api, Namespace, Resource, fields
 from flask_restx.reqparse import RequestParser
@@ -12,7 +12,9 @@ from endpoints.models.user import UserVO
 from helpers.authenticator_decorator import authentication_required
 from helpers.exceptions import Forbidden, NotFound, InvalidFileExtension, InvalidFileSize, ServerError, InvalidSourceCode
 from helpers.file import File
+from helpers.result_status import ResultStatus
 from helpers.role import Role
+from helpers.storage import Storage
 from helpers.unwrapper import unwrap
 from services.group_service import GroupService
 from services.result_service import ResultService
@@ -35,9 +37,11 @@ _test_result_model = _namespace.model('Test Case Result', {
 _result_model = _namespace.model('Result', {
     'id': fields.Integer(required=True),
     'attempt_number': fields.Integer(required=True),
-    'open_result_percentage': fields.Float(required=True),
+    'status': fields.String(required=True, enum=[status.value for status in ResultStatus]),
+    'error': fields.String(),
+    'open_result_percentage': fields.Float(),
     'closed_result_percentage': fields.Float(),
-    'result_percentage': fields.Float(required=True),
+    'result_percentage': fields.Float(),
     'source_url': fields.String(required=True),
     'open_results': fields.Nested(_test_result_model, as_list=True, skip_none=True, required=True),
     'closed_results': fields.Nested(_test_result_model, as_list=True, skip_none=True, required=True)
@@ -84,7 +88,7 @@ class ResultsResource(Resource): # type: ignore
     _tcase_service: TCaseService | None
     _result_service: ResultService | None
 
-    @_namespace.doc(description='Submit a code to be evaluated.')
+    @_namespace.doc(description='Submit a code to be evaluated.\nStudents\' submissions are queued (202) - poll `GET /results/<id>` until the status is `done` or `failed` (see `error`). Managers get the evaluated result (201).')
     @_namespace.expect(_submit_result_parser, validate=True)
     @_namespace.param('code', _in='formData', type='file', required=True)
     @_namespace.response(400, 'Error')
@@ -94,19 +98,20 @@ class ResultsResource(Resource): # type: ignore
     @_namespace.response(413, 'Error')
     @_namespace.response(422, 'Error')
     @_namespace.response(500, 'Error')
-    @_namespace.marshal_with(_result_model, code=201)
+    @_namespace.response(201, 'Success', _result_model)
+    @_namespace.marshal_with(_result_model, code=202)
     @_namespace.doc(security='bearer')
     @authentication_required()
     def post(self, task_id: int, user: UserVO) -> tuple[ResultVO, int]:
         args = _submit_result_parser.parse_args()
         file_storage: FileStorage = args['code']
         filename = unwrap(file_storage.filename)
-        blob = file_storage.stream.read()
         try:
-            user_groups = unwrap(ResultsResource._group_service).get_all(user, unwrap(SessionService.shared).get_user)
+            user_groups = unwrap(ResultsResource._group_service).get_all(user)
             task = unwrap(ResultsResource._task_service).get_task(task_id, user.id, user_groups, active_required=True)
             tests = unwrap(ResultsResource._tcase_service).get_tests(user.id, task, user_groups, running_context=True)
-            return unwrap(ResultsResource._result_service).run(user, task, tests, File(filename, blob)), 201
+            result = unwrap(ResultsResource._result_service).run(user, task, tests, File(filename, file_storage.stream))
+            return result, 202 if user.role == Role.STUDENT else 201
         except Forbidden as e:
             abort(403, str(e))
         except NotFound as e:
@@ -129,7 +134,7 @@ class ResultsResource(Resource): # type: ignore
     @authentication_required(Role.MANAGER)
     def get(self, task_id: int, user: UserVO) -> ReportVO:
         try:
-            user_groups = unwrap(ResultsResource._group_service).get_all(user, unwrap(SessionService.shared).get_user)
+            user_groups = unwrap(ResultsResource._group_service).get_all(user)
             task = unwrap(ResultsResource._task_service).get_task(task_id, user.id, user_groups, active_required=False)
             students = unwrap(ResultsResource._group_service).get_students_of_group(task.group_id, user.id)
             tests = unwrap(ResultsResource._tcase_service).get_tests(user.id, task, user_groups, running_context=True)
@@ -156,10 +161,10 @@ class SourceCodeDownloadResource(Resource): # type: ignore
     @authentication_required(role=Role.STUDENT)
     def get(self, task_id: int, user: UserVO) -> Response:
         try:
-            user_groups = unwrap(SourceCodeDownloadResource._group_service).get_all(user, unwrap(SessionService.shared).get_user)
+            user_groups = unwrap(SourceCodeDownloadResource._group_service).get_all(user)
             task = unwrap(SourceCodeDownloadResource._task_service).get_task(task_id, user.id, user_groups, active_required=False)
             name, path = unwrap(SourceCodeDownloadResource._result_service).get_latest_source_code_name_path(task, user.id)
-            return send_file(path, download_name=name)
+            return unwrap(Storage.shared).send_file(path, name)
         except Forbidden as e:
             abort(403, str(e))
         except NotFound as e:
@@ -183,7 +188,7 @@ class LatestResultResource(Resource): # type: ignore
     @authentication_required(role=Role.STUDENT)
     def get(self, task_id: int, user: UserVO) -> ResultVO:
         try:
-            user_groups = unwrap(LatestResultResource._group_service).get_all(user, unwrap(SessionService.shared).get_user)
+            user_groups = unwrap(LatestResultResource._group_service).get_all(user)
             task = unwrap(LatestResultResource._task_service).get_task(task_id, user.id, user_groups, active_required=False)
             tests = unwrap(LatestResultResource._tcase_service).get_tests(user.id, task, user_groups, running_context=True)
             return unwrap(LatestResultResource._result_service).get_latest_result(task, user, tests)
@@ -194,6 +199,28 @@ class LatestResultResource(Resource): # type: ignore
         except ServerError as e:
             abort(500, str(e))
 
+class ResultResource(Resource): # type: ignore
+    _tcase_service: TCaseService | None
+    _result_service: ResultService | None
+
+    @_namespace.doc(description='*Students only*\nGet the given result. While the status is `queued` or `running` there are no percentages or tests\' results.')
+    @_namespace.response(401, 'Error')
+    @_namespace.response(403, 'Error')
+    @_namespace.response(404, 'Error')
+    @_namespace.response(500, 'Error')
+    @_namespace.marshal_with(_result_model)
+    @_namespace.doc(security='bearer')
+    @authentication_required(role=Role.STUDENT)
+    def get(self, id: int, user: UserVO) -> ResultVO:
+        try:
+            return unwrap(ResultResource._result_service).get_result(id, user, unwrap(ResultResource._tcase_service).get_running_tests)
+        except Forbidden as e:
+            abort(403, str(e))
+        except NotFound as e:
+            abort(404, str(e))
+        except ServerError as e:
+            abort(500, str(e))
+
 class ResultCodeResource(Resource): # type: ignore
     _group_service: GroupService | None
     _task_service: TaskService | None
@@ -209,9 +236,9 @@ class ResultCodeResource(Resource): # type: ignore
     @authentication_required(role=Role.MANAGER)
     def get(self, id: int, user: UserVO) -> Response:
         try:
-            user_groups = unwrap(ResultCodeResource._group_service).get_all(user, unwrap(SessionService.shared).get_user)
+            user_groups = unwrap(ResultCodeResource._group_service).get_all(user)
             name, path = unwrap(ResultCodeResource._result_service).get_source_code_from_result_name_path(id, user.id, user_groups, unwrap(ResultCodeResource._task_service).get_task, unwrap(SessionService.shared).get_user)
-            return send_file(path, download_name=name)
+            return unwrap(Storage.shared).send_file(path, name)
         except Forbidden as e:
             abort(403, str(e))
         except NotFound as e:
@@ -235,6 +262,8 @@ class ResultsEndpoints():
         LatestResultResource._task_service = task_service
         LatestResultResource._tcase_service = tcase_service
         LatestResultResource._result_service = result_service
+        ResultResource._tcase_service = tcase_service
+        ResultResource._result_service = result_service
         ResultCodeResource._group_service = group_service
         ResultCodeResource._task_service = task_service
         ResultCodeResource._result_service = result_service
@@ -243,4 +272,5 @@ class ResultsEndpoints():
         self.__tasks_namespace.add_resource(ResultsResource, '/<int:task_id>/results')
         self.__tasks_namespace.add_resource(LatestResultResource, '/<int:task_id>/results/latest')
         self.__tasks_namespace.add_resource(SourceCodeDownloadResource, '/<int:task_id>/results/latest/code')
+        _namespace.add_resource(ResultResource, '/<int:id>')
         _namespace.add_resource(ResultCodeResource, '/<int:id>/code')
@@ -3,7 +3,7 @@ from flask_restx import Api, Resource, Namespace, fields
 
 from endpoints.models.user import UserVO
 from helpers.email_validation_decorator import validate_email
-from helpers.exceptions import Forbidden, ServerError
+from helpers.exceptions import Forbidden, ServerError, ServiceUnavailable
 from helpers.unwrapper import json_unwrapped, unwrap
 from services.session_service import SessionService
 
@@ -28,6 +28,7 @@ class SessionResource(Resource): # type: ignore
     @_namespace.response(400, 'Error')
     @_namespace.response(403, 'Credentials error')
     @_namespace.response(500, 'Server error')
+    @_namespace.response(503, 'Error')
     @_namespace.marshal_with(user_model)
     @validate_email()
     def post(self) -> UserVO:
@@ -37,6 +38,8 @@ class SessionResource(Resource): # type: ignore
             return unwrap(SessionService.shared).login(email, password)
         except Forbidden as e:
             abort(403, str(e))
+        except ServiceUnavailable as e:
+            abort(503, str(e))
         except ServerError as e:
             abort(500, str(e))
 
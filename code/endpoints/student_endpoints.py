@@ -5,7 +5,7 @@ from endpoints.manager_endpoints import signup_model
 from endpoints.models.user import UserVO
 from endpoints.session_endpoints import user_model
 from helpers.email_validation_decorator import validate_email
-from helpers.exceptions import ServerError, Internal_UniqueViolation, Conflict
+from helpers.exceptions import ServerError, Internal_UniqueViolation, Conflict, ServiceUnavailable
 from helpers.role import Role
 from helpers.unwrapper import json_unwrapped, unwrap
 from services.session_service import SessionService
@@ -17,6 +17,7 @@ class StudentResource(Resource): # type: ignore
     @_namespace.expect(signup_model, validate=True)
     @_namespace.response(400, 'Error')
     @_namespace.response(500, 'Error')
+    @_namespace.response(503, 'Error')
     @_namespace.marshal_with(user_model, code=201)
     @validate_email()
     def post(self) -> tuple[UserVO, int]:
@@ -27,6 +28,8 @@ class StudentResource(Resource): # type: ignore
             return unwrap(SessionService.shared).create_user(email, name, password, Role.STUDENT), 201
         except Internal_UniqueViolation:
             abort(409, str(Conflict()))
+        except ServiceUnavailable as e:
+            abort(503, str(e))
         except ServerError as e:
             abort(500, str(e))
 
@@ -1,6 +1,6 @@
 # pylint: disable=duplicate-code
 
-from flask import abort, send_file
+from flask import abort
 from flask.wrappers import Response
 from flask_restx import Api, Resource, Namespace, inputs, fields
 from flask_restx.reqparse import RequestParser
@@ -13,7 +13,9 @@ from endpoints.models.user import UserVO
 from helpers.authenticator_decorator import authentication_required
 from helpers.exceptions import NotFound, ServerError, Forbidden, InvalidFileExtension, InvalidFileSize, ParameterValidationError
 from helpers.file import File
+from helpers.pagination import Cursor, pagination_headers, set_up_pagination_parser
 from helpers.role import Role
+from helpers.storage import Storage
 from helpers.unwrapper import unwrap
 from services.group_service import GroupService
 from services.session_service import SessionService
@@ -24,6 +26,7 @@ _namespace = Namespace('tasks', description='')
 
 _new_task_parser = _namespace.parser()
 _update_task_parser = _namespace.parser()
+_tasks_page_parser = _namespace.parser()
 
 def _set_up_task_parser(parser: RequestParser, updating: bool) -> None:
     required = not updating
@@ -80,10 +83,9 @@ class TasksResource(Resource): # type: ignore
         ends_on = args.get('ends_on')
         file_storage: FileStorage = args['file']
         filename = unwrap(file_storage.filename)
-        blob = file_storage.stream.read()
         try:
             group = unwrap(TasksResource._group_service).get_group(group_id, unwrap(SessionService.shared).get_user)
-            return unwrap(TasksResource._task_service).create_task(user, group, name, max_attempts, languages, starts_on, ends_on, File(filename, blob)), 201
+            return unwrap(TasksResource._task_service).create_task(user, group, name, max_attempts, languages, starts_on, ends_on, File(filename, file_storage.stream)), 201
         except ParameterValidationError as e:
             abort(400, str(e))
         except Forbidden as e:
@@ -97,19 +99,26 @@ class TasksResource(Resource): # type: ignore
         except ServerError as e:
             abort(500, str(e))
 
-    @_namespace.doc(description='Returns a list of tasks for the current group.')
+    @_namespace.doc(description='Returns a list of tasks for the current group, oldest first.\nWhen `limit` is set and there are more tasks, the `X-Next-Cursor` header is the `after` of the next page.')
+    @_namespace.response(400, 'Error')
     @_namespace.response(401, 'Error')
     @_namespace.response(403, 'Error')
     @_namespace.response(404, 'Error')
     @_namespace.response(500, 'Error')
     @_namespace.doc(security='bearer')
+    @_namespace.expect(_tasks_page_parser, validate=True)
     @_namespace.marshal_with(_task_model, as_list=True, envelope='tasks')
     @authentication_required()
-    def get(self, group_id: int, user: UserVO) -> list[TaskVO]:
+    def get(self, group_id: int, user: UserVO) -> tuple[list[TaskVO], int, dict[str, str]]:
+        args = _tasks_page_parser.parse_args()
         try:
+            after = Cursor.decode(args.get('after'))
             group = unwrap(TasksResource._group_service).get_group(group_id, unwrap(SessionService.shared).get_user)
-            user_groups = unwrap(TasksResource._group_service).get_all(user, unwrap(SessionService.shared).get_user)
-            return unwrap(TasksResource._task_service).get_tasks(user.id, group, user_groups)
+            user_groups = unwrap(TasksResource._group_service).get_all(user)
+            tasks, next_cursor = unwrap(TasksResource._task_service).get_tasks(user.id, group, user_groups, after, args.get('limit'))
+            return tasks, 200, pagination_headers(next_cursor)
+        except ParameterValidationError as e:
+            abort(400, str(e))
         except Forbidden as e:
             abort(403, str(e))
         except NotFound as e:
@@ -131,9 +140,9 @@ class TaskDownloadResource(Resource): # type: ignore
     @authentication_required()
     def get(self, id: int, user: UserVO) -> Response:
         try:
-            user_groups = unwrap(TaskDownloadResource._group_service).get_all(user, unwrap(SessionService.shared).get_user)
+            user_groups = unwrap(TaskDownloadResource._group_service).get_all(user)
             name, path = unwrap(TaskDownloadResource._task_service).get_task_name_path(id, user_groups, user.id)
-            return send_file(path, download_name=name)
+            return unwrap(Storage.shared).send_file(path, name)
         except Forbidden as e:
             abort(403, str(e))
         except NotFound as e:
@@ -174,7 +183,7 @@ class TaskResource(Resource): # type: ignore
         file: File | None = None
         file_storage: FileStorage | None = args['file']
         if file_storage is not None:
-            file = File(unwrap(file_storage.filename), file_storage.stream.read())
+            file = File(unwrap(file_storage.filename), file_storage.stream)
         try:
             def get_group(id: int) -> GroupVO:
                 return unwrap(TaskResource._group_service).get_group(id, unwrap(SessionService.shared).get_user)
@@ -202,7 +211,7 @@ class TaskResource(Resource): # type: ignore
     @authentication_required()
     def get(self, id: int, user: UserVO) -> TaskVO:
         try:
-            user_groups = unwrap(TaskResource._group_service).get_all(user, unwrap(SessionService.shared).get_user)
+            user_groups = unwrap(TaskResource._group_service).get_all(user)
             task = unwrap(TaskResource._task_service).get_task(id, user.id, user_groups, active_required=False)
             tests = unwrap(TaskResource._tcase_service).get_tests(user.id, task, user_groups)
             return task.appending_tests(tests)
@@ -217,6 +226,7 @@ class TaskEndpoints:
     def __init__(self, api: Api, groups_namespace: Namespace, group_service: GroupService, task_service: TaskService, tcase_service: TCaseService) -> None:
         _set_up_task_parser(_new_task_parser, updating=False)
         _set_up_task_parser(_update_task_parser, updating=True)
+        set_up_pagination_parser(_tasks_page_parser)
         _namespace.add_model('Task Details', _task_details_model)
         api.add_namespace(_namespace)
         self.__groups_namespace = groups_namespace
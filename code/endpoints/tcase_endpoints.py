@@ -1,4 +1,4 @@
-from flask import abort, send_file
+from flask import abort
 from flask.wrappers import Response
 from flask_restx import Api, Namespace, Resource, inputs, fields
 from flask_restx.reqparse import RequestParser
@@ -9,27 +9,34 @@ from endpoints.models.all_tests_vo import AllTestsVO
 from endpoints.models.tcase_vo import TCaseVO
 from endpoints.models.user import UserVO
 from helpers.authenticator_decorator import authentication_required
-from helpers.exceptions import Forbidden, NotFound, ServerError, InvalidFileSize, InvalidFileExtension
+from helpers.comparison_mode import ComparisonMode
+from helpers.exceptions import Forbidden, NotFound, ServerError, InvalidFileSize, InvalidFileExtension, ParameterValidationError
 from helpers.file import File
+from helpers.pagination import Cursor, pagination_headers, set_up_pagination_parser
 from helpers.role import Role
+from helpers.storage import Storage
 from helpers.unwrapper import unwrap
 from services.group_service import GroupService
-from services.session_service import SessionService
 from services.task_service import TaskService
 from services.tcase_service import TCaseService
 
 _namespace = Namespace('tests', description='')
 
 _new_test_parser = _namespace.parser()
+_tests_page_parser = _namespace.parser()
 
 def _set_up_test_parser(parser: RequestParser) -> None:
     parser.add_argument('input', type=FileStorage, required=True, location='files')
     parser.add_argument('output', type=FileStorage, required=True, location='files')
     parser.add_argument('closed', type=inputs.boolean, required=True, location='form')
+    parser.add_argument('comparison_mode', type=str, required=False, default=ComparisonMode.EXACT.value, choices=[mode.value for mode in ComparisonMode], location='form')
+    parser.add_argument('tolerance', type=float, required=False, location='form')
 
 test_model = _namespace.model('Test Case', {
     'id': fields.Integer(required=True),
     'closed': fields.Boolean(required=True),
+    'comparison_mode': fields.String(required=True, enum=[mode.value for mode in ComparisonMode]),
+    'tolerance': fields.Float(required=False),
     'input_url': fields.String(required=False),
     'output_url': fields.String(required=False)
 }, skipNone=True)
@@ -44,11 +51,13 @@ class TestsResource(Resource): # type: ignore
     _task_service: TaskService | None
     _tcase_service: TCaseService | None
 
-    @_namespace.doc(description='*Managers only*\nAdd a new test case to the task.')
+    @_namespace.doc(description='*Managers only*\nAdd a new test case to the task.\n`comparison_mode` (default `exact`): `exact` - same lines; `trailing_whitespace` - ignores whitespace at the end of each line and blank lines at the end; `tokens` - same whitespace-separated tokens; `numeric` - same tokens, numbers within `tolerance` (absolute, or relative for numbers greater than 1).')
     @_namespace.expect(_new_test_parser, validate=True)
     @_namespace.param('input', _in='formData', type='file', required=True)
     @_namespace.param('output', _in='formData', type='file', required=True)
     @_namespace.param('closed', _in='formData', type=bool, required=True)
+    @_namespace.param('comparison_mode', _in='formData', type=str, required=False, enum=[mode.value for mode in ComparisonMode])
+    @_namespace.param('tolerance', _in='formData', type=float, required=False)
     @_namespace.response(400, 'Error')
     @_namespace.response(401, 'Error')
     @_namespace.response(403, 'Error')
@@ -62,12 +71,16 @@ class TestsResource(Resource): # type: ignore
         input_storage: FileStorage = args['input']
         output_storage: FileStorage = args['output']
         closed = args['closed']
+        comparison_mode = ComparisonMode(args['comparison_mode'])
+        tolerance = args.get('tolerance')
         try:
-            user_groups = unwrap(TestsResource._group_service).get_all(user, unwrap(SessionService.shared).get_user)
+            user_groups = unwrap(TestsResource._group_service).get_all(user)
             task = unwrap(TestsResource._task_service).get_task(task_id, user.id, user_groups, active_required=True)
-            input_file = File(unwrap(input_storage.filename), input_storage.stream.read())
-            output_file = File(unwrap(output_storage.filename), output_storage.stream.read())
-            return unwrap(TestsResource._tcase_service).add_test_case(task, input_file, output_file, closed), 201
+            input_file = File(unwrap(input_storage.filename), input_storage.stream)
+            output_file = File(unwrap(output_storage.filename), output_storage.stream)
+            return unwrap(TestsResource._tcase_service).add_test_case(task, input_file, output_file, closed, comparison_mode, tolerance), 201
+        except ParameterValidationError as e:
+            abort(400, str(e))
         except Forbidden as e:
             abort(403, str(e))
         except NotFound as e:
@@ -79,19 +92,26 @@ class TestsResource(Resource): # type: ignore
         except ServerError as e:
             abort(500, str(e))
 
-    @_namespace.doc(description='Returns a list of tests for the current task.')
+    @_namespace.doc(description='Returns a list of tests for the current task, oldest first.\nWhen `limit` is set and there are more tests, the `X-Next-Cursor` header is the `after` of the next page.')
+    @_namespace.response(400, 'Error')
     @_namespace.response(401, 'Error')
     @_namespace.response(403, 'Error')
     @_namespace.response(404, 'Error')
     @_namespace.response(500, 'Error')
+    @_namespace.expect(_tests_page_parser, validate=True)
     @_namespace.marshal_with(all_tests_model)
     @_namespace.doc(security='bearer')
     @authentication_required()
-    def get(self, task_id: int, user: UserVO) -> AllTestsVO:
+    def get(self, task_id: int, user: UserVO) -> tuple[AllTestsVO, int, dict[str, str]]:
+        args = _tests_page_parser.parse_args()
         try:
-            user_groups = unwrap(TestsResource._group_service).get_all(user, unwrap(SessionService.shared).get_user)
+            after = Cursor.decode(args.get('after'))
+            user_groups = unwrap(TestsResource._group_service).get_all(user)
             task = unwrap(TestsResource._task_service).get_task(task_id, user.id, user_groups, active_required=False)
-            return unwrap(TestsResource._tcase_service).get_tests(user.id, task, user_groups)
+            tests, next_cursor = unwrap(TestsResource._tcase_service).get_tests_page(user.id, task, user_groups, after, args.get('limit'))
+            return tests, 200, pagination_headers(next_cursor)
+        except ParameterValidationError as e:
+            abort(400, str(e))
         except Forbidden as e:
             abort(403, str(e))
         except NotFound as e:
@@ -114,7 +134,7 @@ class TestResource(Resource): # type: ignore
     @authentication_required(role=Role.MANAGER)
     def delete(self, id: int, user: UserVO) -> dict[str, str]:
         try:
-            user_groups = unwrap(TestResource._group_service).get_all(user, unwrap(SessionService.shared).get_user)
+            user_groups = unwrap(TestResource._group_service).get_all(user)
             unwrap(TestResource._tcase_service).delete_test(id, user.id, unwrap(TestResource._task_service).get_task, user_groups)
             return {'message': 'Success'}
         except Forbidden as e:
@@ -139,9 +159,9 @@ class TestDownloadInResource(Resource): # type: ignore
     @authentication_required()
     def get(self, id: int, user: UserVO) -> Response:
         try:
-            user_groups = unwrap(TestDownloadInResource._group_service).get_all(user, unwrap(SessionService.shared).get_user)
+            user_groups = unwrap(TestDownloadInResource._group_service).get_all(user)
             path = unwrap(TestDownloadInResource._tcase_service).get_test_case_in_path(id, user.id, unwrap(TestDownloadInResource._task_service).get_task, user_groups)
-            return send_file(path, download_name='test.in')
+            return unwrap(Storage.shared).send_file(path, 'test.in')
         except Forbidden as e:
             abort(403, str(e))
         except NotFound as e:
@@ -164,9 +184,9 @@ class TestDownloadOutResource(Resource): # type: ignore
     @authentication_required()
     def get(self, id: int, user: UserVO) -> Response:
         try:
-            user_groups = unwrap(TestDownloadOutResource._group_service).get_all(user, unwrap(SessionService.shared).get_user)
+            user_groups = unwrap(TestDownloadOutResource._group_service).get_all(user)
             path = unwrap(TestDownloadOutResource._tcase_service).get_test_case_out_path(id, user.id, unwrap(TestDownloadOutResource._task_service).get_task, user_groups)
-            return send_file(path, download_name='test.out')
+            return unwrap(Storage.shared).send_file(path, 'test.out')
         except Forbidden as e:
             abort(403, str(e))
         except NotFound as e:
@@ -177,6 +197,7 @@ class TestDownloadOutResource(Resource): # type: ignore
 class TCaseEndpoints:
     def __init__(self, api: Api, tasks_namespace: Namespace, group_service: GroupService, task_service: TaskService, tcase_service: TCaseService) -> None:
         _set_up_test_parser(_new_test_parser)
+        set_up_pagination_parser(_tests_page_parser)
         api.add_namespace(_namespace)
         self.__tasks_namespace = tasks_namespace
         TestsResource._group_service = group_service
@@ -3,7 +3,7 @@ from flask_restx import Api, Resource, Namespace, fields
 
 from endpoints.models.user import UserVO
 from helpers.authenticator_decorator import authentication_required
-from helpers.exceptions import NotFound, ServerError, WrongCurrentPassword
+from helpers.exceptions import NotFound, ServerError, WrongCurrentPassword, ServiceUnavailable
 from helpers.unwrapper import json_unwrapped, unwrap
 from services.session_service import SessionService
 
@@ -33,6 +33,7 @@ class UserResource(Resource): # type: ignore
     @_namespace.response(404, 'Error')
     @_namespace.response(422, 'Error')
     @_namespace.response(500, 'Error')
+    @_namespace.response(503, 'Error')
     @_namespace.marshal_with(_user_info_model)
     @_namespace.doc(security='bearer')
     @authentication_required()
@@ -52,6 +53,8 @@ class UserResource(Resource): # type: ignore
             abort(404, str(e))
         except WrongCurrentPassword as e:
             abort(422, str(e))
+        except ServiceUnavailable as e:
+            abort(503, str(e))
         except ServerError as e:
             abort(500, str(e))
 
@@ -1,6 +1,6 @@
 from typing import Callable, TypeVar, Any
 
-from flask import request, abort
+from flask import request, abort, g
 
 from helpers.exceptions import Unauthorized, NotFound, ServerError
 from helpers.role import Role
@@ -21,6 +21,7 @@ def authentication_required(role: Role | None = None) -> Callable[[Callable[...,
             try:
                 user = unwrap(SessionService.shared).validate_session_token(token, role)
                 kwargs['user'] = user
+                g.user_id = user.id # e.g. for reading the user's own writes
                 return function(*args, **kwargs)
             except (Unauthorized, NotFound):
                 abort(401, str(Unauthorized()))
@@ -1,3 +1,4 @@
+import hashlib
 import os
 
 from flask import url_for, current_app
@@ -14,6 +15,13 @@ def storage_path() -> str:
 def scripts_path() -> str:
     return str(current_app.config['SCRIPTS_PATH'])
 
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(64 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
 def filename(path: str) -> str:
     return os.path.split(path)[1]
 
@@ -0,0 +1,7 @@
+from enum import StrEnum, auto
+
+class ComparisonMode(StrEnum):
+    EXACT = auto()
+    TRAILING_WHITESPACE = auto()
+    TOKENS = auto()
+    NUMERIC = auto()
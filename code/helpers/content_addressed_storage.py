@@ -0,0 +1,53 @@
+import os
+import uuid
+
+from helpers import commons
+from helpers.exceptions import ServerError
+from helpers.storage import Storage
+from repository.stored_file_repository import StoredFileRepository
+
+BLOBS_DIRECTORY = 'blobs'
+
+# Files are stored once per content, as <storage>/blobs/ab/cd/abcd...<extension> - the sha256 is sharded so no directory grows too large.
+# The extension is part of the name, as the runners tell the language by it.
+# Each reference is counted (see StoredFileRepository), and the file is removed when the last one is released.
+class ContentAddressedStorage(Storage):
+    def __init__(self) -> None:
+        self.__stored_file_repository = StoredFileRepository()
+
+    def __path(self, name: str) -> str:
+        return os.path.join(commons.storage_path(), BLOBS_DIRECTORY, name[0:2], name[2:4], name)
+
+    def save(self, source_path: str, sha256: str, extension: str) -> str:
+        name = sha256 + extension
+        path = self.__path(name)
+        def write() -> None:
+            if os.path.exists(path):
+                return
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # moved once completely written, so a partially written file is never read
+            os.replace(source_path, path)
+        self.__stored_file_repository.add_reference(name, write)
+        return path
+
+    def sha256(self, path: str) -> str | None:
+        if os.path.dirname(path) == os.path.dirname(self.__path(commons.filename(path))):
+            return os.path.splitext(commons.filename(path))[0] # it's the name
+        return super().sha256(path) # stored before the content-addressed storage - hashing it on every download would defeat the delivery offloading
+
+    def release(self, path: str) -> None:
+        # moved aside while the row is locked, and only removed once its deletion is committed - put back otherwise
+        detached_path = f'{path}.{uuid.uuid4().hex}.released'
+        def detach() -> None:
+            try:
+                os.replace(path, detached_path)
+            except FileNotFoundError:
+                pass
+        try:
+            self.__stored_file_repository.remove_reference(commons.filename(path), detach)
+        except ServerError as e:
+            if os.path.exists(detached_path):
+                os.replace(detached_path, path)
+            raise e
+        if os.path.exists(detached_path):
+            os.remove(detached_path)
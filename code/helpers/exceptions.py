@@ -52,3 +52,7 @@ class WrongCurrentPassword(Exception):
 class InvalidCodec(Exception):
     def __init__(self, file_type: str) -> None:
         super().__init__(f"Your {file_type} contains one or more invalid characters. Remove it before submitting the file again.")
+
+class ServiceUnavailable(Exception):
+    def __init__(self) -> None:
+        super().__init__("Too many requests are being processed. Try again in a few seconds.")
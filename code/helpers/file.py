@@ -1,23 +1,56 @@
+import hashlib
 import os
-import uuid
+import tempfile
+from typing import IO
 
 from helpers import commons
 from helpers.exceptions import InvalidFileExtension, InvalidFileSize
+from helpers.storage import Storage
+from helpers.unwrapper import unwrap
+
+CHUNK_SIZE = 64 * 1024
+
+def _read_umask() -> int:
+    # os.umask can only be read by setting it
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+_UMASK = _read_umask() # read once, on import - setting it isn't thread safe
 
 class File:
-    def __init__(self, filename: str, blob: bytes):
+    def __init__(self, filename: str, stream: IO[bytes]):
         self.filename = filename
-        self.blob = blob
+        self.stream = stream
+        # known once saved
+        self.sha256: str | None = None
+        self.size: int | None = None
 
     # pylint: disable=dangerous-default-value
     def save(self, allowed_extensions: set[str] = commons.ALLOWED_TEXT_EXTENSIONS, max_file_size_mb: float = 1) -> str:
         file_extension = commons.file_extension(self.filename)
         if self.filename.strip() == '' or file_extension not in allowed_extensions:
             raise InvalidFileExtension(allowed_extensions)
-        if len(self.blob) <= 0 or (len(self.blob) / (1024 * 1024)) > max_file_size_mb:
-            raise InvalidFileSize(f'{max_file_size_mb} MB')
-        secure_filename = str(uuid.uuid4()) + file_extension
-        full_path = os.path.join(commons.storage_path(), secure_filename)
-        with open(full_path, 'wb') as file:
-            file.write(self.blob)
-            return full_path
+        # copied in chunks - the upload is never fully in memory, and it's given up as soon as it's too large
+        max_size = max_file_size_mb * 1024 * 1024
+        digest = hashlib.sha256()
+        size = 0
+        descriptor, temporary_path = tempfile.mkstemp(dir=commons.storage_path())
+        try:
+            with os.fdopen(descriptor, 'wb') as temporary:
+                for chunk in iter(lambda: self.stream.read(CHUNK_SIZE), b''):
+                    size += len(chunk)
+                    if size > max_size:
+                        raise InvalidFileSize(f'{max_file_size_mb} MB')
+                    digest.update(chunk)
+                    temporary.write(chunk)
+            if size <= 0:
+                raise InvalidFileSize(f'{max_file_size_mb} MB')
+            self.sha256 = digest.hexdigest()
+            self.size = size
+            # mkstemp creates it as 0600 - the reverse proxy serving the downloads (files.delivery) usually runs as another user
+            os.chmod(temporary_path, 0o644 & ~_UMASK)
+            return unwrap(Storage.shared).save(temporary_path, self.sha256, file_extension)
+        finally:
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path) # not moved to the storage
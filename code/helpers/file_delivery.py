@@ -0,0 +1,6 @@
+from enum import StrEnum, auto
+
+class FileDelivery(StrEnum):
+    APP = auto()
+    X_SENDFILE = auto()
+    X_ACCEL_REDIRECT = auto()
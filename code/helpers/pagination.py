@@ -0,0 +1,38 @@
+from __future__ import annotations
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+import binascii
+from datetime import datetime
+
+from flask_restx import inputs
+from flask_restx.reqparse import RequestParser
+
+from helpers.exceptions import ParameterValidationError
+
+MAX_LIMIT = 100
+NEXT_CURSOR_HEADER = 'X-Next-Cursor'
+
+# Keyset pagination over (created_at, id): the next page starts right after the last row, without an OFFSET.
+class Cursor:
+    def __init__(self, created_at: datetime, id: int) -> None:
+        self.created_at = created_at
+        self.id = id
+
+    def encode(self) -> str:
+        return urlsafe_b64encode(f'{self.created_at.isoformat()}|{self.id}'.encode('utf-8')).decode('ascii')
+
+    @staticmethod
+    def decode(value: str | None) -> Cursor | None:
+        if value is None:
+            return None
+        try:
+            created_at, id = urlsafe_b64decode(value.encode('ascii')).decode('utf-8').split('|')
+            return Cursor(datetime.fromisoformat(created_at), int(id))
+        except (binascii.Error, UnicodeError, ValueError) as e:
+            raise ParameterValidationError('after', value, 'cursor') from e
+
+def set_up_pagination_parser(parser: RequestParser) -> None:
+    parser.add_argument('after', type=str, required=False, location='args', help=f'The {NEXT_CURSOR_HEADER} header of the previous page.')
+    parser.add_argument('limit', type=inputs.int_range(1, MAX_LIMIT), required=False, location='args', help=f'Page size (up to {MAX_LIMIT}). Everything after the cursor is returned if not set.')
+
+def pagination_headers(next_cursor: Cursor | None) -> dict[str, str]:
+    return { NEXT_CURSOR_HEADER: next_cursor.encode() } if next_cursor is not None else {}
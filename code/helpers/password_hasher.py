@@ -0,0 +1,102 @@
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+import os
+from threading import Lock
+import time
+from typing import Callable, TypeVar
+
+from bcrypt import checkpw, gensalt, hashpw
+
+from helpers.codemaze_logger import CodemazeLogger
+from helpers.config import Config
+from helpers.exceptions import ServiceUnavailable
+
+SLOW_QUEUE_SECONDS = 1
+
+T = TypeVar('T')
+
+# bcrypt is CPU bound on purpose: it runs on a small pool per process, so a burst of logins (e.g. the start of an exam) queues there instead of starving every other request.
+# A queued password holds its request thread, so a process never has more of them pending than admin.password-workers plus its request threads (CODEMAZE_REQUEST_THREADS, set by gunicorn):
+# a burst queues, and only the passwords waiting longer than admin.password-queue-timeout (or beyond that bound) fail with ServiceUnavailable.
+class PasswordHasher:
+    __lock = Lock()
+    __executor: ThreadPoolExecutor | None = None
+    __pending = 0
+    __operations = 0
+    __total_queue_time = 0.0
+    __max_queue_time = 0.0
+
+    @staticmethod
+    def rounds() -> int:
+        return int(Config.get('admin.bcrypt-rounds'))
+
+    @staticmethod
+    def __mean_queue_time() -> float:
+        return PasswordHasher.__total_queue_time / PasswordHasher.__operations if PasswordHasher.__operations > 0 else 0
+
+    @staticmethod
+    def __max_pending() -> int | None:
+        # None without gunicorn (e.g. the tests), which doesn't run requests in a fixed number of threads
+        request_threads = os.getenv('CODEMAZE_REQUEST_THREADS')
+        if request_threads is None:
+            return None
+        return int(Config.get('admin.password-workers')) + int(request_threads)
+
+    @staticmethod
+    def __get_executor() -> ThreadPoolExecutor:
+        # created on first use - i.e. after gunicorn forks the workers
+        with PasswordHasher.__lock:
+            if PasswordHasher.__executor is None:
+                PasswordHasher.__executor = ThreadPoolExecutor(max_workers=int(Config.get('admin.password-workers')), thread_name_prefix='password-hasher')
+            return PasswordHasher.__executor
+
+    @staticmethod
+    def __started(queue_time: float) -> None:
+        with PasswordHasher.__lock:
+            PasswordHasher.__operations += 1
+            PasswordHasher.__total_queue_time += queue_time
+            PasswordHasher.__max_queue_time = max(PasswordHasher.__max_queue_time, queue_time)
+            pending = PasswordHasher.__pending
+        message = f'Password hashing | queue time: {queue_time:.3f}s | pending: {pending} | mean queue time: {PasswordHasher.__mean_queue_time():.3f}s | max queue time: {PasswordHasher.__max_queue_time:.3f}s'
+        if queue_time >= SLOW_QUEUE_SECONDS:
+            CodemazeLogger.shared().warning(message + ' - consider increasing admin.password-workers, and the request threads with it')
+        else:
+            CodemazeLogger.shared().debug(message)
+
+    @staticmethod
+    def __run(function: Callable[[], T]) -> T:
+        max_pending = PasswordHasher.__max_pending()
+        with PasswordHasher.__lock:
+            if max_pending is not None and PasswordHasher.__pending >= max_pending:
+                CodemazeLogger.shared().warning(f'Password hashing queue is full ({PasswordHasher.__pending} pending)')
+                raise ServiceUnavailable()
+            PasswordHasher.__pending += 1
+        try:
+            submitted = time.monotonic()
+            def job() -> T:
+                PasswordHasher.__started(time.monotonic() - submitted)
+                return function()
+            future: Future[T] = PasswordHasher.__get_executor().submit(job)
+            try:
+                return future.result(timeout=float(Config.get('admin.password-queue-timeout')))
+            except FutureTimeoutError as e:
+                if future.cancel(): # still queued - give up on it
+                    CodemazeLogger.shared().warning('Password hashing queue timed out')
+                    raise ServiceUnavailable() from e
+                return future.result() # already running - it's about to finish
+        finally:
+            with PasswordHasher.__lock:
+                PasswordHasher.__pending -= 1
+
+    @staticmethod
+    def hash(password: str) -> str:
+        rounds = PasswordHasher.rounds()
+        return PasswordHasher.__run(lambda: hashpw(password.encode('utf-8'), gensalt(rounds)).decode('utf-8'))
+
+    @staticmethod
+    def verify(password: str, password_hash: str) -> bool:
+        return PasswordHasher.__run(lambda: checkpw(password.encode('utf-8'), password_hash.encode('utf-8')))
+
+    @staticmethod
+    def needs_rehash(password_hash: str) -> bool:
+        # $2b$<rounds>$<salt and hash>
+        return int(password_hash.split('$')[2]) != PasswordHasher.rounds()
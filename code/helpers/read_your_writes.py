@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+from flask import g, has_app_context
+from redis import Redis, RedisError
+
+from helpers.codemaze_logger import CodemazeLogger
+from helpers.config import Config
+from helpers.unwrapper import unwrap
+
+# Read-only queries go to the read replica, except for a while after the user's own write (database.read-your-writes-seconds),
+# so they see it even if the replica is lagging behind. Shared by the workers through Redis.
+class ReadYourWrites:
+    __shared: ReadYourWrites | None = None
+
+    def __init__(self, host: str, port: int) -> None:
+        self.redis = Redis(host, port, decode_responses=True)
+
+    @staticmethod
+    def __key(user_id: int) -> str:
+        return f'read-your-writes:{user_id}'
+
+    @staticmethod
+    def wrote() -> None:
+        if not has_app_context():
+            return
+        g.read_from_primary = True
+        user_id: int | None = g.get('user_id')
+        if user_id is None:
+            return # e.g. the runner worker
+        window = int(Config.get('database.read-your-writes-seconds'))
+        try:
+            unwrap(ReadYourWrites.__shared).redis.set(ReadYourWrites.__key(user_id), 1, ex=window)
+        except RedisError:
+            CodemazeLogger.shared().exception('Failed to store the user\'s write')
+
+    @staticmethod
+    def read_from_primary() -> bool:
+        if not has_app_context():
+            return True
+        if 'read_from_primary' not in g:
+            user_id: int | None = g.get('user_id')
+            try:
+                g.read_from_primary = user_id is not None and unwrap(ReadYourWrites.__shared).redis.exists(ReadYourWrites.__key(user_id)) > 0
+            except RedisError:
+                CodemazeLogger.shared().exception('Failed to read the user\'s writes')
+                g.read_from_primary = True
+        return bool(g.read_from_primary)
+
+    @staticmethod
+    def initialize(address: str) -> None:
+        if ReadYourWrites.__shared is not None:
+            return
+        host, port = address.split(':')
+        ReadYourWrites.__shared = ReadYourWrites(host, int(port))
@@ -0,0 +1,70 @@
+from __future__ import annotations
+import json
+from typing import Any
+import uuid
+
+from redis import Redis, RedisError
+
+from helpers.codemaze_logger import CodemazeLogger
+from helpers.config import Config
+from helpers.unwrapper import unwrap
+
+# Only an optimization: when Redis fails, the submission runs as if it wasn't memoized.
+class ResultMemo:
+    __shared: ResultMemo | None = None
+
+    def __init__(self, host: str, port: int) -> None:
+        self.redis = Redis(host, port, decode_responses=True)
+
+    @staticmethod
+    def __redis() -> Redis[str]:
+        return unwrap(ResultMemo.__shared).redis
+
+    @staticmethod
+    def __ttl() -> int:
+        return int(float(Config.get('runners.result-memo-hours')) * 3600)
+
+    @staticmethod
+    def __generation_key(task_id: int) -> str:
+        return f'result-memo:{task_id}:generation'
+
+    @staticmethod
+    def key(task_id: int, fingerprint: str) -> str | None:
+        # a new task's generation makes every previous entry unreachable (they expire on their own)
+        try:
+            generation = ResultMemo.__redis().get(ResultMemo.__generation_key(task_id)) or '0'
+        except RedisError:
+            CodemazeLogger.shared().exception('Failed to read the result memo\'s generation')
+            return None
+        return f'result-memo:{task_id}:{generation}:{fingerprint}'
+
+    @staticmethod
+    def get(key: str) -> list[dict[str, Any]] | None:
+        try:
+            verdicts = ResultMemo.__redis().get(key)
+        except RedisError:
+            CodemazeLogger.shared().exception('Failed to read the result memo')
+            return None
+        if verdicts is None:
+            return None
+        return list(json.loads(verdicts))
+
+    @staticmethod
+    def set(key: str, verdicts: list[dict[str, Any]]) -> None:
+        try:
+            ResultMemo.__redis().set(key, json.dumps(verdicts), ex=ResultMemo.__ttl())
+        except RedisError:
+            CodemazeLogger.shared().exception('Failed to write the result memo')
+
+    @staticmethod
+    def invalidate(task_id: int) -> None:
+        # Not failing open - the previous verdicts would be served for the changed tests.
+        # Unique, so a generation can't come back once expired. It outlives the entries written under it.
+        ResultMemo.__redis().set(ResultMemo.__generation_key(task_id), uuid.uuid4().hex, ex=ResultMemo.__ttl())
+
+    @staticmethod
+    def initialize(address: str) -> None:
+        if ResultMemo.__shared is not None:
+            return
+        host, port = address.split(':')
+        ResultMemo.__shared = ResultMemo(host, int(port))
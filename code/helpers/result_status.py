@@ -0,0 +1,7 @@
+from enum import StrEnum, auto
+
+class ResultStatus(StrEnum):
+    QUEUED = auto()
+    RUNNING = auto()
+    DONE = auto()
+    FAILED = auto()
@@ -1,83 +1,172 @@
 from __future__ import annotations
-import json
-from time import sleep
-from typing import Any
+from contextlib import contextmanager
+from threading import Event, Thread
+from typing import Iterator
+import uuid
 
 from redis import Redis
 
-from helpers.exceptions import ServerError
+from helpers.codemaze_logger import CodemazeLogger
+from helpers.config import Config
 from helpers.unwrapper import unwrap
 from services.runner.runner import Runner
 
-CHANNEL='manager-channel'
+WAIT_SECONDS = 5
+WAITER_TIMEOUT_SECONDS = 3 * WAIT_SECONDS
+
+# Hands the free containers to the waiters, oldest first. A container is leased to its waiter in the same step, so it's never
+# out of Redis' sight: a waiter that dies before taking it lets the lease expire. Waiters that stopped waiting (crashed workers) are dropped.
+# The grants are pushed to <grant prefix><waiter>, the list each waiter blocks on.
+# KEYS: free, members, leases, owners, waiters, waiting
+_DISPATCH = '''
+local function dispatch(now, ttl, grant_prefix)
+    for _, waiter in ipairs(redis.call('ZRANGEBYSCORE', KEYS[6], '-inf', now)) do
+        redis.call('ZREM', KEYS[6], waiter)
+        redis.call('LREM', KEYS[5], 0, waiter)
+    end
+    while redis.call('LLEN', KEYS[1]) > 0 and redis.call('LLEN', KEYS[5]) > 0 do
+        local waiter = redis.call('LPOP', KEYS[5])
+        redis.call('ZREM', KEYS[6], waiter)
+        local container = redis.call('LPOP', KEYS[1])
+        redis.call('ZADD', KEYS[3], now + ttl, container)
+        redis.call('HSET', KEYS[4], container, waiter)
+        redis.call('RPUSH', grant_prefix .. waiter, container)
+        redis.call('EXPIRE', grant_prefix .. waiter, ttl)
+    end
+end
+'''
+
+# Keeps the free list in sync with the configured pool, gives back expired leases (crashed workers), and keeps the waiter in line:
+# it's queued on its first call, and keeps its place on the following ones.
+# KEYS: free, members, leases, owners, waiters, waiting | ARGV: ttl, grant prefix, waiter, waiter timeout, containers
+_WAIT_SCRIPT = _DISPATCH + '''
+local now = tonumber(redis.call('TIME')[1])
+local pool = {}
+for i = 5, #ARGV do
+    local container = ARGV[i]
+    pool[container] = true
+    if redis.call('SADD', KEYS[2], container) == 1 then
+        redis.call('RPUSH', KEYS[1], container)
+    end
+end
+for _, container in ipairs(redis.call('SMEMBERS', KEYS[2])) do
+    if not pool[container] then
+        redis.call('SREM', KEYS[2], container)
+        redis.call('LREM', KEYS[1], 0, container)
+        redis.call('ZREM', KEYS[3], container)
+        redis.call('HDEL', KEYS[4], container)
+    end
+end
+for _, container in ipairs(redis.call('ZRANGEBYSCORE', KEYS[3], '-inf', now)) do
+    redis.call('ZREM', KEYS[3], container)
+    redis.call('HDEL', KEYS[4], container)
+    redis.call('RPUSH', KEYS[1], container)
+end
+local waiter = ARGV[3]
+if redis.call('ZSCORE', KEYS[6], waiter) then
+    redis.call('ZADD', KEYS[6], now + tonumber(ARGV[4]), waiter)
+elseif redis.call('EXISTS', ARGV[2] .. waiter) == 0 then
+    redis.call('RPUSH', KEYS[5], waiter)
+    redis.call('ZADD', KEYS[6], now + tonumber(ARGV[4]), waiter)
+end
+dispatch(now, tonumber(ARGV[1]), ARGV[2])
+'''
+
+# Only the current owner gives the container back - an expired lease may already belong to someone else.
+# KEYS: free, members, leases, owners, waiters, waiting | ARGV: container, token, ttl, grant prefix
+_RELEASE_SCRIPT = _DISPATCH + '''
+if redis.call('HGET', KEYS[4], ARGV[1]) == ARGV[2] then
+    redis.call('HDEL', KEYS[4], ARGV[1])
+    redis.call('ZREM', KEYS[3], ARGV[1])
+    if redis.call('SISMEMBER', KEYS[2], ARGV[1]) == 1 then
+        redis.call('RPUSH', KEYS[1], ARGV[1])
+    end
+end
+dispatch(tonumber(redis.call('TIME')[1]), tonumber(ARGV[3]), ARGV[4])
+'''
+
+# KEYS: leases, owners | ARGV: container, token, ttl
+_RENEW_SCRIPT = '''
+if redis.call('HGET', KEYS[2], ARGV[1]) ~= ARGV[2] then
+    return 0
+end
+redis.call('ZADD', KEYS[1], tonumber(redis.call('TIME')[1]) + tonumber(ARGV[3]), ARGV[1])
+return 1
+'''
 
 class RunnerQueueManager:
     __shared: RunnerQueueManager | None = None
 
     def __init__(self, host: str, port: int) -> None:
         self.redis = Redis(host, port, decode_responses=True)
-        self.subscriber = self.redis.pubsub()
-        self.subscriber.subscribe(CHANNEL)
+        self.wait_script = self.redis.register_script(_WAIT_SCRIPT)
+        self.release_script = self.redis.register_script(_RELEASE_SCRIPT)
+        self.renew_script = self.redis.register_script(_RENEW_SCRIPT)
 
     @staticmethod
-    def __redis() -> Redis[str]:
-        return unwrap(RunnerQueueManager.__shared).redis
+    def __manager() -> RunnerQueueManager:
+        return unwrap(RunnerQueueManager.__shared)
 
     @staticmethod
-    def __dict_for(runner: Runner) -> dict[str, Any]:
-        current_dict = RunnerQueueManager.__redis().get(runner.language_name)
-        if current_dict is None:
-            new_dict = {
-                'count': 0,
-                'current_run': -1
-            }
-            RunnerQueueManager.__set_value(runner.language_name, new_dict)
-            return new_dict
-        _json = json.loads(str(current_dict))
-        return dict[str, int](_json)
+    def __prefix(runner: Runner) -> str:
+        return f'runners:{runner.language_name}'
 
     @staticmethod
-    def __set_value(key: str, new_value: dict[str, int]) -> None:
-        value = json.dumps(new_value)
-        if not RunnerQueueManager.__redis().set(key, value):
-            raise ServerError()
+    def __keys(runner: Runner) -> list[str]:
+        prefix = RunnerQueueManager.__prefix(runner)
+        return [f'{prefix}:free', f'{prefix}:members', f'{prefix}:leases', f'{prefix}:owners', f'{prefix}:waiters', f'{prefix}:waiting']
 
     @staticmethod
-    def check_container_available(runner: Runner) -> bool:
-        current_run = int(RunnerQueueManager.__dict_for(runner)['current_run'])
-        return current_run == -1
+    def __grant_prefix(runner: Runner) -> str:
+        return f'{RunnerQueueManager.__prefix(runner)}:grant:'
 
     @staticmethod
-    def set_using_container(runner: Runner) -> None:
-        RunnerQueueManager.__set_dict(runner, True)
-
-    @staticmethod
-    def __set_dict(runner: Runner, using: bool) -> dict[str, int]:
-        value = RunnerQueueManager.__dict_for(runner)
-        current_run = -1
-        if using:
-            value['count'] += 1
-            current_run = value['count']
-        value['current_run'] = current_run
-        RunnerQueueManager.__set_value(runner.language_name, value)
-        return value
+    def lease_container(runner: Runner) -> tuple[str, str]:
+        manager = RunnerQueueManager.__manager()
+        ttl = int(Config.get('runners.lease-timeout'))
+        token = str(uuid.uuid4()) # the waiter, then the lease's owner
+        grant_prefix = RunnerQueueManager.__grant_prefix(runner)
+        while True:
+            manager.wait_script(keys=RunnerQueueManager.__keys(runner), args=[ttl, grant_prefix, token, WAITER_TIMEOUT_SECONDS, *runner.containers])
+            popped = manager.redis.blpop([grant_prefix + token], timeout=WAIT_SECONDS)
+            if popped is not None:
+                return (str(popped[1]), token)
+            # still in line - check for expired leases and wait again
 
     @staticmethod
-    def __message(runner: Runner, count: int) -> str:
-        return f'{runner.language_name}-{count}'
+    def renew_lease(runner: Runner, container: str, token: str) -> bool:
+        prefix = RunnerQueueManager.__prefix(runner)
+        renewed = RunnerQueueManager.__manager().renew_script(keys=[f'{prefix}:leases', f'{prefix}:owners'], args=[container, token, int(Config.get('runners.lease-timeout'))])
+        return bool(renewed == 1)
 
     @staticmethod
-    def release_container(runner: Runner) -> None:
-        new_dict = RunnerQueueManager.__set_dict(runner, False)
-        RunnerQueueManager.__redis().publish(CHANNEL, RunnerQueueManager.__message(runner, new_dict['count']))
+    def release_container(runner: Runner, container: str, token: str) -> None:
+        ttl = int(Config.get('runners.lease-timeout'))
+        RunnerQueueManager.__manager().release_script(keys=RunnerQueueManager.__keys(runner), args=[container, token, ttl, RunnerQueueManager.__grant_prefix(runner)])
 
     @staticmethod
-    def continue_when_available(runner: Runner) -> None:
-        while True:
-            message = unwrap(RunnerQueueManager.__shared).subscriber.get_message()
-            if message is not None and message['data'] == RunnerQueueManager.__message(runner, RunnerQueueManager.__dict_for(runner)['count']):
-                break
-            sleep(0.01)
+    @contextmanager
+    def leased_container(runner: Runner) -> Iterator[str]:
+        # the lease is renewed while the container is in use, so a long job doesn't share it with the next lease
+        container, token = RunnerQueueManager.lease_container(runner)
+        stop = Event()
+        def renew() -> None:
+            while not stop.wait(int(Config.get('runners.lease-timeout')) / 3):
+                try:
+                    if not RunnerQueueManager.renew_lease(runner, container, token):
+                        CodemazeLogger.shared().warning(f'Lost the lease of {container}')
+                        return
+                # pylint: disable=broad-exception-caught
+                except Exception:
+                    CodemazeLogger.shared().exception(f'Failed to renew the lease of {container}')
+        renewal = Thread(target=renew, daemon=True)
+        renewal.start()
+        try:
+            yield container
+        finally:
+            stop.set()
+            renewal.join()
+            RunnerQueueManager.release_container(runner, container, token)
 
     @staticmethod
     def initialize(address: str) -> None:
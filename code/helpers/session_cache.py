@@ -0,0 +1,197 @@
+from __future__ import annotations
+import json
+import secrets
+from typing import Any
+
+from flask import g, has_app_context
+from redis import Redis, RedisError
+
+from endpoints.models.group import GroupVO
+from endpoints.models.user import UserVO
+from helpers.codemaze_logger import CodemazeLogger
+from helpers.config import Config
+from helpers.role import Role
+from helpers.unwrapper import unwrap
+
+GROUPS_GENERATION_KEY = 'session-cache:groups:generation'
+TOKEN_VERSION_KEY_PREFIX = 'session-cache:token-version'
+
+# Caches the authenticated user and their groups, which almost every endpoint looks up.
+# First tier: the current request (flask.g). Second tier: Redis, shared by the workers, for admin.session-cache-seconds (0 disables it).
+class SessionCache:
+    __shared: SessionCache | None = None
+
+    def __init__(self, host: str, port: int) -> None:
+        self.redis = Redis(host, port, decode_responses=True)
+
+    @staticmethod
+    def __ttl() -> int:
+        return int(Config.get('admin.session-cache-seconds'))
+
+    @staticmethod
+    def __request_cache() -> dict[str, Any]:
+        if not has_app_context():
+            return {}
+        if 'session_cache' not in g:
+            g.session_cache = {}
+        return g.session_cache # type: ignore
+
+    @staticmethod
+    def __user_key(user_id: int) -> str:
+        return f'session-cache:user:{user_id}'
+
+    @staticmethod
+    def __groups_key(user_id: int, generation: str) -> str:
+        # bumping the generation makes every user's groups unreachable (they expire on their own)
+        return f'session-cache:groups:{generation}:{user_id}'
+
+    @staticmethod
+    def __get(key: str) -> Any | None:
+        try:
+            value = unwrap(SessionCache.__shared).redis.get(key)
+        except RedisError:
+            CodemazeLogger.shared().exception('Failed to read from the session cache')
+            return None
+        return json.loads(value) if value is not None else None
+
+    @staticmethod
+    def __set(key: str, value: Any) -> None:
+        try:
+            unwrap(SessionCache.__shared).redis.set(key, json.dumps(value), ex=SessionCache.__ttl())
+        except RedisError:
+            CodemazeLogger.shared().exception('Failed to write to the session cache')
+
+    @staticmethod
+    def __delete(*keys: str) -> None:
+        try:
+            unwrap(SessionCache.__shared).redis.delete(*keys)
+        except RedisError:
+            CodemazeLogger.shared().exception('Failed to invalidate the session cache')
+
+    @staticmethod
+    def __groups_generation() -> str:
+        try:
+            return unwrap(SessionCache.__shared).redis.get(GROUPS_GENERATION_KEY) or '0'
+        except RedisError:
+            CodemazeLogger.shared().exception('Failed to read from the session cache')
+            return '0'
+
+    @staticmethod
+    def __user_to_json(user: UserVO) -> dict[str, Any]:
+        return { 'id': user.id, 'email': user.email, 'name': user.name, 'role': user.role }
+
+    @staticmethod
+    def __user_from_json(value: dict[str, Any]) -> UserVO:
+        user = UserVO()
+        user.id = int(value['id'])
+        user.email = value['email']
+        user.name = value['name']
+        user.role = Role(value['role'])
+        return user
+
+    @staticmethod
+    def __group_from_json(value: dict[str, Any]) -> GroupVO:
+        group = GroupVO()
+        group.id = int(value['id'])
+        group.active = bool(value['active'])
+        group.name = value['name']
+        group.code = value['code']
+        group.manager = SessionCache.__user_from_json(value['manager'])
+        return group
+
+    @staticmethod
+    def get_user(user_id: int) -> UserVO | None:
+        request_cache = SessionCache.__request_cache()
+        if f'user:{user_id}' in request_cache:
+            return SessionCache.__user_from_json(request_cache[f'user:{user_id}'])
+        if SessionCache.__ttl() <= 0:
+            return None
+        value = SessionCache.__get(SessionCache.__user_key(user_id))
+        if value is None:
+            return None
+        request_cache[f'user:{user_id}'] = value
+        return SessionCache.__user_from_json(value)
+
+    @staticmethod
+    def set_user(user: UserVO) -> None:
+        value = SessionCache.__user_to_json(user)
+        SessionCache.__request_cache()[f'user:{user.id}'] = value
+        if SessionCache.__ttl() > 0:
+            SessionCache.__set(SessionCache.__user_key(user.id), value)
+
+    @staticmethod
+    def get_groups(user_id: int) -> list[GroupVO] | None:
+        request_cache = SessionCache.__request_cache()
+        if f'groups:{user_id}' in request_cache:
+            return [ SessionCache.__group_from_json(group) for group in request_cache[f'groups:{user_id}'] ]
+        if SessionCache.__ttl() <= 0:
+            return None
+        value = SessionCache.__get(SessionCache.__groups_key(user_id, SessionCache.__groups_generation()))
+        if value is None:
+            return None
+        request_cache[f'groups:{user_id}'] = value
+        return [ SessionCache.__group_from_json(group) for group in value ]
+
+    @staticmethod
+    def set_groups(user_id: int, groups: list[GroupVO]) -> None:
+        value = [ { 'id': group.id, 'active': group.active, 'name': group.name, 'code': group.code, 'manager': SessionCache.__user_to_json(unwrap(group.manager)) } for group in groups ]
+        SessionCache.__request_cache()[f'groups:{user_id}'] = value
+        if SessionCache.__ttl() > 0:
+            SessionCache.__set(SessionCache.__groups_key(user_id, SessionCache.__groups_generation()), value)
+
+    @staticmethod
+    def invalidate_user(user_id: int) -> None:
+        SessionCache.__request_cache().pop(f'user:{user_id}', None)
+        SessionCache.__delete(SessionCache.__user_key(user_id))
+
+    @staticmethod
+    def invalidate_groups(user_id: int) -> None:
+        SessionCache.__request_cache().pop(f'groups:{user_id}', None)
+        SessionCache.__delete(SessionCache.__groups_key(user_id, SessionCache.__groups_generation()))
+
+    @staticmethod
+    def invalidate_all_groups() -> None:
+        # e.g. a group or its manager was renamed - it's listed in the groups of all its students
+        request_cache = SessionCache.__request_cache()
+        for key in [ key for key in request_cache if key.startswith('groups:') ]:
+            request_cache.pop(key)
+        try:
+            unwrap(SessionCache.__shared).redis.incr(GROUPS_GENERATION_KEY)
+        except RedisError:
+            CodemazeLogger.shared().exception('Failed to invalidate the session cache')
+
+    @staticmethod
+    def get_token_version(user_id: int) -> int | None:
+        # the version of the user's claims signed in session tokens - never expires, as tokens live longer than the cache
+        # None when it can't be read or is missing (e.g. invalidated, or lost by Redis), so the token's claims aren't trusted
+        try:
+            value = unwrap(SessionCache.__shared).redis.get(f'{TOKEN_VERSION_KEY_PREFIX}:{user_id}')
+        except RedisError:
+            CodemazeLogger.shared().exception('Failed to read the token version')
+            return None
+        return int(value) if value is not None else None
+
+    @staticmethod
+    def issue_token_version(user_id: int) -> int | None:
+        # a missing version is created at random, so it doesn't match the versions of tokens issued before it went missing
+        key = f'{TOKEN_VERSION_KEY_PREFIX}:{user_id}'
+        try:
+            redis = unwrap(SessionCache.__shared).redis
+            redis.set(key, secrets.randbits(62), nx=True)
+            value = redis.get(key)
+        except RedisError:
+            CodemazeLogger.shared().exception('Failed to issue the token version')
+            return None
+        return int(value) if value is not None else None
+
+    @staticmethod
+    def invalidate_token_version(user_id: int) -> None:
+        # the user's tokens go through the database until a new version is issued
+        SessionCache.__delete(f'{TOKEN_VERSION_KEY_PREFIX}:{user_id}')
+
+    @staticmethod
+    def initialize(address: str) -> None:
+        if SessionCache.__shared is not None:
+            return
+        host, port = address.split(':')
+        SessionCache.__shared = SessionCache(host, int(port))
@@ -0,0 +1,53 @@
+from __future__ import annotations
+from abc import ABC, abstractmethod
+import mimetypes
+import os
+import posixpath
+
+from flask import request, send_file
+from flask.wrappers import Response
+
+from helpers import commons
+from helpers.config import Config
+from helpers.file_delivery import FileDelivery
+
+# Where the uploaded files (tasks, test cases, and source codes) are kept. The stored paths are given back to release and send them.
+class Storage(ABC):
+    shared: Storage | None = None
+
+    @abstractmethod
+    def save(self, source_path: str, sha256: str, extension: str) -> str:
+        # the file at source_path is moved into the storage (or left behind, if it's stored already)
+        pass
+
+    @abstractmethod
+    def release(self, path: str) -> None:
+        # the row referencing the file is gone
+        pass
+
+    def sha256(self, path: str) -> str | None:
+        # None when it isn't known without reading the whole file
+        return None
+
+    def send_file(self, path: str, download_name: str) -> Response:
+        # Strong ETag from the content - repeated downloads get a 304 Not Modified. Without it, the file is sent every time.
+        etag = self.sha256(path)
+        if FileDelivery(Config.get('files.delivery')) != FileDelivery.X_ACCEL_REDIRECT:
+            # with files.delivery = x_sendfile, Flask replies with the X-Sendfile header instead of the bytes (see USE_X_SENDFILE)
+            return send_file(path, download_name=download_name, etag=etag if etag is not None else False, conditional=True)
+        # the proxy serves the bytes (and ranges) from its internal location, mapped to the storage directory
+        response = Response(mimetype=mimetypes.guess_type(download_name)[0] or 'application/octet-stream')
+        response.headers.set('Content-Disposition', 'inline', filename=download_name)
+        response.headers['X-Accel-Redirect'] = posixpath.join(str(Config.get('files.internal-location')), os.path.relpath(path, commons.storage_path()))
+        if etag is not None:
+            response.set_etag(etag)
+        response.make_conditional(request)
+        if response.status_code == 304:
+            del response.headers['X-Accel-Redirect'] # nothing to serve
+        return response
+
+    @staticmethod
+    def initialize(storage: Storage) -> None:
+        if Storage.shared is not None:
+            return
+        Storage.shared = storage
@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+from redis import Redis
+
+from helpers.unwrapper import unwrap
+
+QUEUE = 'submissions'
+
+class SubmissionQueue:
+    __shared: SubmissionQueue | None = None
+
+    def __init__(self, host: str, port: int) -> None:
+        self.redis = Redis(host, port, decode_responses=True)
+
+    @staticmethod
+    def __redis() -> Redis[str]:
+        return unwrap(SubmissionQueue.__shared).redis
+
+    @staticmethod
+    def enqueue(result_id: int) -> None:
+        SubmissionQueue.__redis().rpush(QUEUE, result_id)
+
+    @staticmethod
+    def is_queued(result_id: int) -> bool:
+        return SubmissionQueue.__redis().lpos(QUEUE, str(result_id)) is not None
+
+    @staticmethod
+    def wait_for_submission(timeout: int) -> int | None:
+        popped = SubmissionQueue.__redis().blpop([QUEUE], timeout=timeout)
+        if popped is None:
+            return None
+        return int(popped[1])
+
+    @staticmethod
+    def initialize(address: str) -> None:
+        if SubmissionQueue.__shared is not None:
+            return
+        host, port = address.split(':')
+        SubmissionQueue.__shared = SubmissionQueue(host, int(port))
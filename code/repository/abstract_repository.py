@@ -1,10 +1,11 @@
-from typing import TypeVar, Generic
+from typing import Any, TypeVar, Generic
 
-from sqlalchemy import select
+from sqlalchemy import Select, literal, select, tuple_
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
 from helpers.exceptions import Internal_UniqueViolation, ServerError, NotFound
+from helpers.pagination import Cursor
 from helpers.unwrapper import unwrap
 from repository.base import Base
 from repository.database import Database
@@ -19,9 +20,25 @@ class AbstractRepository(Generic[M]):
     def _session(self) -> Session:
         return unwrap(unwrap(Database.shared).session)
 
-    def find_all(self) -> list[M]:
-        stm = select(self.__class).order_by(self.__class.created_at)
-        return list(self._session.scalars(stm).all())
+    @property
+    def _read_session(self) -> Session:
+        # For read-only queries - they may run on the read replica. The models must not be changed.
+        return unwrap(unwrap(Database.shared).read_session)
+
+    def _paginate(self, session: Session, stm: Select[Any], created_at: Any, id: Any, after: Cursor | None, limit: int | None) -> tuple[list[Any], Cursor | None]:
+        # Keyset pagination - (created_at, id) must be backed by an index to keep deep pages as cheap as the first one.
+        # Returns the first selected entity of each row, and the cursor of the next page (if any).
+        if after is not None:
+            stm = stm.where(tuple_(created_at, id) > tuple_(literal(after.created_at), literal(after.id)))
+        stm = stm.add_columns(created_at, id).order_by(created_at, id)
+        if limit is not None:
+            stm = stm.limit(limit + 1) # one more - tells whether there's a next page
+        rows = list(session.execute(stm).all())
+        next_cursor: Cursor | None = None
+        if limit is not None and len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = Cursor(rows[-1][-2], rows[-1][-1])
+        return ([ row[0] for row in rows ], next_cursor)
 
     def find(self, id: int) -> M:
         stm = select(self.__class).where(self.__class.id == id)
@@ -42,6 +59,16 @@ class AbstractRepository(Generic[M]):
             self._session.rollback()
             raise ServerError() from e
 
+    def add_all(self, models: list[M]) -> list[M]:
+        # a single transaction - also commits any pending change of the session's other models
+        try:
+            self._session.add_all(models)
+            self._session.commit()
+            return models
+        except Exception as e:
+            self._session.rollback()
+            raise ServerError() from e
+
     def delete(self, id: int) -> None:
         obj = self.find(id)
         try:
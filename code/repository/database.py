@@ -2,13 +2,17 @@
 
 from __future__ import annotations
 
-from flask import Flask, g
-from sqlalchemy import create_engine
+from flask import Flask, g, has_app_context
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.engine.base import Engine
 
+from helpers.config import Config
+from helpers.read_your_writes import ReadYourWrites
 from helpers.unwrapper import unwrap
 from repository.base import Base
+from repository.migrations import migrate
+from repository.pool_metrics import MeasuredNullPool, MeasuredQueuePool
 import repository.table_builder # must be imported to initialize the database
 
 class Database:
@@ -16,35 +20,62 @@ class Database:
 
     @property
     def session(self) -> Session | None:
-        try:
-            return g.session # type: ignore
-        except AttributeError:
+        if not has_app_context():
             return None
+        if 'session' not in g:
+            # created on first use - requests that never touch the database don't create one
+            Database.open_session()
+        return g.session # type: ignore
 
-    def __init__(self, db_string: str, app: Flask) -> None:
+    @property
+    def read_session(self) -> Session | None:
+        if self.read_session_maker is None or ReadYourWrites.read_from_primary():
+            return self.session
+        if 'read_session' not in g:
+            g.read_session = self.read_session_maker()
+        return g.read_session # type: ignore
+
+    def __init__(self, db_string: str, app: Flask, read_db_string: str | None = None) -> None:
         engine = self.__create_engine(db_string)
+        Base.metadata.create_all(engine)
+        migrate(engine)
         self.session_maker = sessionmaker(bind=engine)
-        app.before_request(Database.__create_session)
+        self.read_session_maker: sessionmaker[Session] | None = None
+        if read_db_string is not None:
+            self.read_session_maker = sessionmaker(bind=self.__create_engine(read_db_string))
+            event.listen(self.session_maker, 'after_commit', lambda session: ReadYourWrites.wrote())
         app.teardown_request(Database.close_session)
 
     def __create_engine(self, db_string: str) -> Engine:
-        engine = create_engine(db_string)
-        Base.metadata.create_all(engine)
+        if Config.get('database.pgbouncer'):
+            # PgBouncer (transaction pooling) already pools the connections. psycopg2 doesn't use server-side prepared statements, which PgBouncer can't route.
+            engine = create_engine(db_string, poolclass=MeasuredNullPool)
+        else:
+            engine = create_engine(
+                db_string,
+                poolclass=MeasuredQueuePool,
+                pool_size=int(Config.get('database.pool-size')),
+                max_overflow=int(Config.get('database.max-overflow')),
+                pool_timeout=float(Config.get('database.pool-timeout')),
+                pool_pre_ping=bool(Config.get('database.pool-pre-ping')), # dead connections (e.g. after a Postgres restart) are replaced before use
+                pool_recycle=int(Config.get('database.pool-recycle')),
+            )
         return engine
 
     @staticmethod
-    def initialize(db_string: str, app: Flask) -> None:
+    def initialize(db_string: str, app: Flask, read_db_string: str | None = None) -> None:
         if Database.shared is not None:
             return
-        Database.shared = Database(db_string, app)
+        Database.shared = Database(db_string, app, read_db_string)
 
     @staticmethod
-    def __create_session() -> None:
+    def open_session() -> None:
         g.session = unwrap(Database.shared).session_maker()
 
     # pylint: disable=unused-argument
     @staticmethod
     def close_session(exception: BaseException | None = None) -> None:
-        session: Session | None = g.pop('session', None)
-        if session:
-            session.close()
+        for key in ('session', 'read_session'):
+            session: Session | None = g.pop(key, None)
+            if session:
+                session.close()
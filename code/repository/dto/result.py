@@ -1,14 +1,21 @@
-from sqlalchemy import Integer, Sequence, ForeignKey
+from sqlalchemy import Index, Integer, Sequence, ForeignKey, String, text
 from sqlalchemy.orm import mapped_column, Mapped
 
+from helpers.result_status import ResultStatus
 from repository.base import Base
 
 class ResultDTO(Base):
     __tablename__ = 'result'
+    __table_args__ = (
+        Index('ix_result_task_id_student_id_created_at', 'task_id', 'student_id', 'created_at'),
+        Index('ix_result_pending_status', 'status', postgresql_where=text("status IN ('queued', 'running')")),
+    )
 
     id: Mapped[int] = mapped_column(Integer, Sequence('sq_result_pk'), primary_key=True, autoincrement=True)
     correct_open: Mapped[int]
     correct_closed: Mapped[int]
     file_path: Mapped[str]
+    status: Mapped[str] = mapped_column(String, nullable=False, default=ResultStatus.DONE, server_default=ResultStatus.DONE)
+    error: Mapped[str | None] = mapped_column(String, nullable=True)
     student_id: Mapped[int] = mapped_column(Integer, ForeignKey('user.id'), nullable=False)
     task_id: Mapped[int] = mapped_column(Integer, ForeignKey('task.id'), nullable=False)
@@ -0,0 +1,12 @@
+from sqlalchemy import Identity, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from repository.base import Base
+
+# Number of rows (tasks, test cases, and results) referencing each blob of the content-addressed storage.
+class StoredFileDTO(Base):
+    __tablename__ = 'stored_file'
+
+    name: Mapped[str] = mapped_column(String, primary_key=True) # sha256 + extension
+    reference_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    id: Mapped[int] = mapped_column(Integer, Identity(), nullable=False) # required by Base - generated by the database, as rows are upserted
@@ -1,10 +1,15 @@
-from sqlalchemy import ForeignKey, Integer
+from sqlalchemy import ForeignKey, Index, Integer
 from sqlalchemy.orm import Mapped, mapped_column
 
 from repository.base import Base
 
 class StudentGroupDTO(Base):
     __tablename__ = 'student_group'
+    __table_args__ = (
+        # the primary key starts with student_id, so it doesn't serve lookups by group - (created_at, student_id) is the keyset of the join requests' pages
+        Index('ix_student_group_group_id_approved_created_at_student_id', 'group_id', 'approved', 'created_at', 'student_id'),
+    )
+
     student_id: Mapped[int] = mapped_column(Integer, ForeignKey('user.id'), nullable=False, primary_key=True)
     group_id: Mapped[int] = mapped_column(Integer, ForeignKey('group.id'), nullable=False, primary_key=True)
     approved: Mapped[bool]
@@ -1,7 +1,7 @@
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import Integer, Sequence, DateTime, ForeignKey, String
+from sqlalchemy import Index, Integer, Sequence, DateTime, ForeignKey, String
 from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.orm import mapped_column, Mapped
 from sqlalchemy.sql import func
@@ -11,6 +11,10 @@ from repository.base import Base
 # pylint: disable=not-callable
 class TaskDTO(Base):
     __tablename__ = 'task'
+    __table_args__ = (
+        # (created_at, id) is the keyset of the tasks' pages
+        Index('ix_task_group_id_created_at_id', 'group_id', 'created_at', 'id'),
+    )
 
     id: Mapped[int] = mapped_column(Integer, Sequence('sq_task_pk'), primary_key=True, autoincrement=True)
     name: Mapped[str]
@@ -0,0 +1,19 @@
+from sqlalchemy import ForeignKey, Identity, Integer
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.orm import Mapped, mapped_column
+
+from repository.base import Base
+
+# Latest result of each student in a task, kept up to date on each evaluated submission.
+# Only facts about the submissions are stored - percentages depend on the task's current tests and are computed on read.
+class TaskSummaryDTO(Base):
+    __tablename__ = 'task_summary'
+
+    task_id: Mapped[int] = mapped_column(Integer, ForeignKey('task.id'), nullable=False, primary_key=True)
+    student_id: Mapped[int] = mapped_column(Integer, ForeignKey('user.id'), nullable=False, primary_key=True)
+    result_id: Mapped[int] = mapped_column(Integer, ForeignKey('result.id'), nullable=False)
+    number_attempts: Mapped[int]
+    correct_open: Mapped[int]
+    correct_closed: Mapped[int]
+    failed_tests: Mapped[list[int]] = mapped_column(ARRAY(Integer), nullable=False)
+    id: Mapped[int] = mapped_column(Integer, Identity(), nullable=False) # required by Base - generated by the database, as rows are upserted
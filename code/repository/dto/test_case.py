@@ -1,13 +1,25 @@
-from sqlalchemy import Integer, Sequence, ForeignKey
+from typing import Optional
+
+from sqlalchemy import Index, Integer, Sequence, ForeignKey, String
 from sqlalchemy.orm import mapped_column, Mapped
 
+from helpers.comparison_mode import ComparisonMode
 from repository.base import Base
 
 class TestCaseDTO(Base):
     __tablename__ = 'test_case'
+    __table_args__ = (
+        # (created_at, id) is the keyset of the tests' pages
+        Index('ix_test_case_task_id_created_at_id', 'task_id', 'created_at', 'id'),
+    )
 
     id: Mapped[int] = mapped_column(Integer, Sequence('sq_test_case_pk'), primary_key=True, autoincrement=True)
     input_file_path: Mapped[str]
     output_file_path: Mapped[str]
     closed: Mapped[bool]
+    input_sha256: Mapped[Optional[str]]
+    output_sha256: Mapped[Optional[str]]
+    output_size: Mapped[Optional[int]]
+    comparison_mode: Mapped[str] = mapped_column(String, nullable=False, default=ComparisonMode.EXACT, server_default=ComparisonMode.EXACT)
+    tolerance: Mapped[Optional[float]]
     task_id: Mapped[int] = mapped_column(Integer, ForeignKey('task.id'), nullable=False)
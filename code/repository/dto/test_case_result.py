@@ -1,12 +1,15 @@
 from typing import Optional
 
-from sqlalchemy import Integer, Sequence, ForeignKey
+from sqlalchemy import Index, Integer, Sequence, ForeignKey
 from sqlalchemy.orm import mapped_column, Mapped
 
 from repository.base import Base
 
 class TestCaseResultDTO(Base):
     __tablename__ = 'test_case_result'
+    __table_args__ = (
+        Index('ix_test_case_result_result_id', 'result_id'),
+    )
 
     id: Mapped[int] = mapped_column(Integer, Sequence('sq_test_case_result_pk'), primary_key=True, autoincrement=True)
     success: Mapped[bool]
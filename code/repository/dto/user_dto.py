@@ -1,8 +1,8 @@
-from bcrypt import hashpw, checkpw, gensalt
 from sqlalchemy import Integer, Sequence, String
 from sqlalchemy.orm import mapped_column, Mapped
 from sqlalchemy.types import Enum
 
+from helpers.password_hasher import PasswordHasher
 from helpers.role import Role
 from repository.base import Base
 
@@ -21,8 +21,10 @@ class UserDTO(Base):
 
     @password.setter
     def password(self, password: str) -> None:
-        password_hash: bytes = hashpw(password.encode('utf-8'), gensalt())
-        self._password = password_hash.decode('utf-8')
+        self._password = PasswordHasher.hash(password)
 
     def authenticate(self, password: str) -> bool:
-        return checkpw(password.encode('utf-8'), self._password.encode('utf-8'))
+        return PasswordHasher.verify(password, self._password)
+
+    def needs_rehash(self) -> bool:
+        return PasswordHasher.needs_rehash(self._password)
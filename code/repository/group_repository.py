@@ -3,6 +3,7 @@ from sqlalchemy import select
 from helpers.exceptions import NotFound
 from repository.abstract_repository import AbstractRepository
 from repository.dto.group_dto import GroupDTO
+from repository.dto.user_dto import UserDTO
 
 # pylint: disable=singleton-comparison
 class GroupRepository(AbstractRepository[GroupDTO]):
@@ -14,3 +15,7 @@ class GroupRepository(AbstractRepository[GroupDTO]):
         if not group:
             raise NotFound()
         return group
+
+    def find_all_with_managers(self) -> list[tuple[GroupDTO, UserDTO]]:
+        stm = select(GroupDTO, UserDTO).join(UserDTO, UserDTO.id == GroupDTO.manager_id).order_by(GroupDTO.created_at)
+        return [ (row[0], row[1]) for row in self._session.execute(stm).all() ]
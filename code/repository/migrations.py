@@ -0,0 +1,42 @@
+from sqlalchemy import text
+from sqlalchemy.engine.base import Engine
+
+# Base.metadata.create_all() only creates missing tables, so changes to existing tables must be listed here.
+# They run on every start - each statement must be idempotent.
+_STATEMENTS = [
+    "ALTER TABLE result ADD COLUMN IF NOT EXISTS status VARCHAR NOT NULL DEFAULT 'done'",
+    "ALTER TABLE result ADD COLUMN IF NOT EXISTS error VARCHAR",
+    "ALTER TABLE test_case ADD COLUMN IF NOT EXISTS input_sha256 VARCHAR",
+    "ALTER TABLE test_case ADD COLUMN IF NOT EXISTS output_sha256 VARCHAR",
+    "ALTER TABLE test_case ADD COLUMN IF NOT EXISTS output_size INTEGER",
+    "ALTER TABLE test_case ADD COLUMN IF NOT EXISTS comparison_mode VARCHAR NOT NULL DEFAULT 'exact'",
+    "ALTER TABLE test_case ADD COLUMN IF NOT EXISTS tolerance FLOAT",
+    # create_all() doesn't add indexes to existing tables either - keep in sync with the DTOs' __table_args__
+    "CREATE INDEX IF NOT EXISTS ix_result_task_id_student_id_created_at ON result (task_id, student_id, created_at)",
+    "CREATE INDEX IF NOT EXISTS ix_test_case_result_result_id ON test_case_result (result_id)",
+    "CREATE INDEX IF NOT EXISTS ix_result_pending_status ON result (status) WHERE status IN ('queued', 'running')",
+    "CREATE INDEX IF NOT EXISTS ix_test_case_task_id_created_at_id ON test_case (task_id, created_at, id)",
+    "CREATE INDEX IF NOT EXISTS ix_task_group_id_created_at_id ON task (group_id, created_at, id)",
+    "CREATE INDEX IF NOT EXISTS ix_student_group_group_id_approved_created_at_student_id ON student_group (group_id, approved, created_at, student_id)",
+    # replaced by the ones above, which also cover the pages' keysets
+    "DROP INDEX IF EXISTS ix_test_case_task_id_created_at",
+    "DROP INDEX IF EXISTS ix_task_group_id_created_at",
+    "DROP INDEX IF EXISTS ix_student_group_group_id_approved",
+    # fills task_summary from the existing results - only while it's empty, i.e. once
+    """
+    INSERT INTO task_summary (task_id, student_id, result_id, number_attempts, correct_open, correct_closed, failed_tests, created_at)
+    SELECT DISTINCT ON (r.task_id, r.student_id)
+        r.task_id, r.student_id, r.id, count(*) OVER (PARTITION BY r.task_id, r.student_id), r.correct_open, r.correct_closed,
+        ARRAY(SELECT tcr.test_case_id FROM test_case_result tcr WHERE tcr.result_id = r.id AND tcr.success IS FALSE ORDER BY tcr.created_at, tcr.id),
+        now()
+    FROM result r
+    WHERE r.status = 'done' AND NOT EXISTS (SELECT 1 FROM task_summary)
+    ORDER BY r.task_id, r.student_id, r.created_at DESC, r.id DESC
+    ON CONFLICT (task_id, student_id) DO NOTHING
+    """,
+]
+
+def migrate(engine: Engine) -> None:
+    with engine.begin() as connection:
+        for statement in _STATEMENTS:
+            connection.execute(text(statement))
@@ -0,0 +1,63 @@
+from threading import Lock
+import time
+
+from sqlalchemy.pool import ConnectionPoolEntry, NullPool, QueuePool
+
+from helpers.codemaze_logger import CodemazeLogger
+
+SLOW_CHECKOUT_SECONDS = 1
+
+class PoolMetrics:
+    __lock = Lock()
+    __checkouts = 0
+    __total_wait = 0.0
+    __max_wait = 0.0
+    __in_use = 0
+
+    @staticmethod
+    def __mean_wait() -> float:
+        return PoolMetrics.__total_wait / PoolMetrics.__checkouts if PoolMetrics.__checkouts > 0 else 0
+
+    @staticmethod
+    def checked_out(wait: float) -> None:
+        with PoolMetrics.__lock:
+            PoolMetrics.__checkouts += 1
+            PoolMetrics.__total_wait += wait
+            PoolMetrics.__max_wait = max(PoolMetrics.__max_wait, wait)
+            PoolMetrics.__in_use += 1
+            in_use = PoolMetrics.__in_use
+        message = f'Database checkout | wait: {wait:.3f}s | in use: {in_use} | mean wait: {PoolMetrics.__mean_wait():.3f}s | max wait: {PoolMetrics.__max_wait:.3f}s'
+        if wait >= SLOW_CHECKOUT_SECONDS:
+            CodemazeLogger.shared().warning(message + ' - consider increasing database.pool-size')
+        else:
+            CodemazeLogger.shared().debug(message)
+
+    @staticmethod
+    def checked_in() -> None:
+        with PoolMetrics.__lock:
+            PoolMetrics.__in_use -= 1
+
+# The time waiting for a connection is measured around the pools' checkout.
+# pylint: disable=abstract-method
+class MeasuredQueuePool(QueuePool):
+    def _do_get(self) -> ConnectionPoolEntry:
+        start = time.monotonic()
+        entry = super()._do_get()
+        PoolMetrics.checked_out(time.monotonic() - start)
+        return entry
+
+    def _do_return_conn(self, record: ConnectionPoolEntry) -> None:
+        super()._do_return_conn(record)
+        PoolMetrics.checked_in()
+
+# With PgBouncer, it pools the connections - each checkout opens a new connection to it.
+class MeasuredNullPool(NullPool):
+    def _do_get(self) -> ConnectionPoolEntry:
+        start = time.monotonic()
+        entry = super()._do_get()
+        PoolMetrics.checked_out(time.monotonic() - start)
+        return entry
+
+    def _do_return_conn(self, record: ConnectionPoolEntry) -> None:
+        super()._do_return_conn(record)
+        PoolMetrics.checked_in()
@@ -1,6 +1,10 @@
-from sqlalchemy import select, func, and_, desc
+from datetime import datetime
+from typing import Any
 
-from helpers.exceptions import NotFound
+from sqlalchemy import select, update, func, and_, or_, desc
+
+from helpers.exceptions import NotFound, ServerError
+from helpers.result_status import ResultStatus
 from helpers.unwrapper import unwrap
 from repository.abstract_repository import AbstractRepository
 from repository.dto.result import ResultDTO
@@ -12,7 +16,7 @@ class ResultRepository(AbstractRepository[ResultDTO]):
 
     def get_number_of_results(self, user_id: int, task_id: int) -> int:
         stm = select(func.count()).select_from(ResultDTO)\
-            .where(and_(ResultDTO.student_id == user_id, ResultDTO.task_id == task_id))
+            .where(and_(ResultDTO.student_id == user_id, ResultDTO.task_id == task_id, ResultDTO.status != ResultStatus.FAILED))
         result = self._session.scalar(stm)
         return unwrap(result)
 
@@ -23,6 +27,75 @@ class ResultRepository(AbstractRepository[ResultDTO]):
             raise NotFound()
         return result
 
-    def get_results_for_task(self, task_id: int) -> list[ResultDTO]:
-        stm = select(ResultDTO).where(ResultDTO.task_id == task_id).order_by(ResultDTO.created_at)
+    def get_attempt_number(self, result: ResultDTO) -> int:
+        stm = select(func.count()).select_from(ResultDTO)\
+            .where(and_(ResultDTO.student_id == result.student_id, ResultDTO.task_id == result.task_id, ResultDTO.id <= result.id, or_(ResultDTO.status != ResultStatus.FAILED, ResultDTO.id == result.id)))
+        return unwrap(self._session.scalar(stm))
+
+    def get_latest_results_for_task(self, task_id: int) -> list[ResultDTO]:
+        # one row per student - DISTINCT ON keeps the first of each student's rows, i.e. the latest
+        stm = select(ResultDTO)\
+            .where(and_(ResultDTO.task_id == task_id, ResultDTO.status == ResultStatus.DONE))\
+            .distinct(ResultDTO.student_id)\
+            .order_by(ResultDTO.student_id, desc(ResultDTO.created_at), desc(ResultDTO.id))
+        return list(self._read_session.scalars(stm).all())
+
+    def start_running(self, id: int) -> datetime | None:
+        # only one worker moves a queued result to running - the returned time identifies its attempt (None if it wasn't queued)
+        stm = update(ResultDTO).where(and_(ResultDTO.id == id, ResultDTO.status == ResultStatus.QUEUED))\
+            .values(status=ResultStatus.RUNNING)\
+            .returning(ResultDTO.updated_at)
+        try:
+            started = self._session.scalars(stm).first()
+            self._session.commit()
+            return started
+        except Exception as e:
+            self._session.rollback()
+            raise ServerError() from e
+
+    def __is_attempt(self, id: int, started: datetime) -> Any:
+        # a stale attempt may have been queued again, and picked up by another worker
+        return and_(ResultDTO.id == id, ResultDTO.status == ResultStatus.RUNNING, ResultDTO.updated_at == started)
+
+    def finish(self, id: int, started: datetime, correct_open: int, correct_closed: int) -> bool:
+        # Not committed - it's committed along with the result's test results.
+        # Discards the session, and returns False, if the attempt isn't the result's current one anymore.
+        stm = update(ResultDTO).where(self.__is_attempt(id, started))\
+            .values(status=ResultStatus.DONE, correct_open=correct_open, correct_closed=correct_closed)\
+            .execution_options(synchronize_session='fetch')
+        try:
+            if self._session.execute(stm).rowcount == 1:
+                return True
+            self._session.rollback()
+            return False
+        except Exception as e:
+            self._session.rollback()
+            raise ServerError() from e
+
+    def fail(self, id: int, started: datetime, error: str) -> None:
+        # discards whatever the failed evaluation left pending in the session
+        self._session.rollback()
+        stm = update(ResultDTO).where(self.__is_attempt(id, started)).values(status=ResultStatus.FAILED, error=error)
+        try:
+            self._session.execute(stm)
+            self._session.commit()
+        except Exception as e:
+            self._session.rollback()
+            raise ServerError() from e
+
+    def get_stale_queued_ids(self, before: datetime) -> list[int]:
+        stm = select(ResultDTO.id).where(and_(ResultDTO.status == ResultStatus.QUEUED, func.coalesce(ResultDTO.updated_at, ResultDTO.created_at) < before))
         return list(self._session.scalars(stm).all())
+
+    def requeue_stale_running(self, before: datetime) -> list[int]:
+        # only one worker moves a stale result back to queued
+        stm = update(ResultDTO).where(and_(ResultDTO.status == ResultStatus.RUNNING, ResultDTO.updated_at < before))\
+            .values(status=ResultStatus.QUEUED)\
+            .returning(ResultDTO.id)
+        try:
+            ids = list(self._session.scalars(stm).all())
+            self._session.commit()
+            return ids
+        except Exception as e:
+            self._session.rollback()
+            raise ServerError() from e
@@ -0,0 +1,54 @@
+from typing import Callable
+
+from sqlalchemy import delete, func, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from helpers.exceptions import ServerError
+from helpers.unwrapper import unwrap
+from repository.abstract_repository import AbstractRepository
+from repository.database import Database
+from repository.dto.stored_file import StoredFileDTO
+
+# The references are committed on their own session - the request's session may have pending changes, committed (or not) by its caller.
+# pylint: disable=not-callable
+class StoredFileRepository(AbstractRepository[StoredFileDTO]):
+    def __init__(self) -> None:
+        super().__init__(StoredFileDTO)
+
+    def __new_session(self) -> Session:
+        return unwrap(Database.shared).session_maker()
+
+    def add_reference(self, name: str, write: Callable[[], None]) -> None:
+        # The row stays locked until the commit, so a concurrent remove_reference can't delete the file in between.
+        stm = insert(StoredFileDTO).values(name=name, reference_count=1)
+        stm = stm.on_conflict_do_update(index_elements=[StoredFileDTO.name], set_={
+            'reference_count': StoredFileDTO.reference_count + 1,
+            'updated_at': func.now(),
+        })
+        with self.__new_session() as session:
+            try:
+                session.execute(stm)
+                write()
+                session.commit()
+            except Exception as e:
+                session.rollback()
+                raise ServerError() from e
+
+    def remove_reference(self, name: str, detach: Callable[[], None]) -> None:
+        # detach runs once the last reference is gone - or if the file isn't tracked (i.e. stored before the content-addressed storage).
+        # It runs before the commit, under the row lock - the file must only be removed once the commit succeeds.
+        stm = update(StoredFileDTO)\
+            .where(StoredFileDTO.name == name)\
+            .values(reference_count=StoredFileDTO.reference_count - 1, updated_at=func.now())\
+            .returning(StoredFileDTO.reference_count)
+        with self.__new_session() as session:
+            try:
+                remaining = session.execute(stm).scalar_one_or_none()
+                if remaining is None or remaining <= 0:
+                    session.execute(delete(StoredFileDTO).where(StoredFileDTO.name == name))
+                    detach()
+                session.commit()
+            except Exception as e:
+                session.rollback()
+                raise ServerError() from e
@@ -2,6 +2,7 @@ from sqlalchemy import select, and_
 
 from helpers.exceptions import NotFound, ServerError
 from helpers.role import Role
+from helpers.pagination import Cursor
 from repository.abstract_repository import AbstractRepository
 from repository.dto.group_dto import GroupDTO
 from repository.dto.student_group import StudentGroupDTO
@@ -17,7 +18,14 @@ class StudentGroupRepository(AbstractRepository[StudentGroupDTO]):
             .join(StudentGroupDTO, UserDTO.id == StudentGroupDTO.student_id)\
             .where(and_(StudentGroupDTO.group_id == group_id, StudentGroupDTO.approved == approved))\
             .order_by(UserDTO.name)
-        return list(self._session.scalars(stm).all())
+        return list(self._read_session.scalars(stm).all())
+
+    def get_join_requests(self, group_id: int, after: Cursor | None = None, limit: int | None = None) -> tuple[list[UserDTO], Cursor | None]:
+        # in the order they were made - the student ID breaks ties
+        stm = select(UserDTO)\
+            .join(StudentGroupDTO, UserDTO.id == StudentGroupDTO.student_id)\
+            .where(and_(StudentGroupDTO.group_id == group_id, StudentGroupDTO.approved == False))
+        return self._paginate(self._read_session, stm, StudentGroupDTO.created_at, StudentGroupDTO.student_id, after, limit)
 
     def __find_opened_join_request(self, group_id: int, student_id: int) -> StudentGroupDTO:
         stm = select(StudentGroupDTO)\
@@ -47,16 +55,15 @@ class StudentGroupRepository(AbstractRepository[StudentGroupDTO]):
             self._session.rollback()
             raise ServerError() from e
 
-    def get_groups_for_user(self, id: int, role: Role) -> list[GroupDTO]:
-        result: list[GroupDTO] = []
+    def get_groups_for_user(self, id: int, role: Role) -> list[tuple[GroupDTO, UserDTO]]:
+        # the groups' managers are loaded in the same query
+        stm = select(GroupDTO, UserDTO).join(UserDTO, UserDTO.id == GroupDTO.manager_id)
         match role:
             case Role.MANAGER:
-                result = list(self._session.scalars(select(GroupDTO).where(GroupDTO.manager_id == id).order_by(GroupDTO.created_at)).all())
+                stm = stm.where(GroupDTO.manager_id == id).order_by(GroupDTO.created_at)
             case Role.STUDENT:
-                stm = select(GroupDTO)\
+                stm = stm\
                     .join(StudentGroupDTO, GroupDTO.id == StudentGroupDTO.group_id)\
-                    .join(UserDTO, UserDTO.id == StudentGroupDTO.student_id)\
-                    .where(and_(UserDTO.id == id, StudentGroupDTO.approved == True))\
+                    .where(and_(StudentGroupDTO.student_id == id, StudentGroupDTO.approved == True))\
                     .order_by(GroupDTO.name)
-                result = list(self._session.scalars(stm).all())
-        return result
+        return [ (row[0], row[1]) for row in self._session.execute(stm).all() ]
@@ -6,7 +6,9 @@ from repository.dto.group_dto import GroupDTO
 from repository.dto.plagiarism_report_dto import PlagiarismReportDTO
 from repository.dto.result import ResultDTO
 from repository.dto.student_group import StudentGroupDTO
+from repository.dto.stored_file import StoredFileDTO
 from repository.dto.task import TaskDTO
+from repository.dto.task_summary import TaskSummaryDTO
 from repository.dto.test_case import TestCaseDTO
 from repository.dto.test_case_result import TestCaseResultDTO
 from repository.dto.user_dto import UserDTO
@@ -2,6 +2,7 @@ from datetime import datetime
 
 from sqlalchemy import select
 
+from helpers.pagination import Cursor
 from repository.abstract_repository import AbstractRepository
 from repository.dto.task import TaskDTO
 
@@ -9,9 +10,8 @@ class TaskRepository(AbstractRepository[TaskDTO]):
     def __init__(self) -> None:
         super().__init__(TaskDTO)
 
-    def get_tasks(self, group_id: int, started_only: bool) -> list[TaskDTO]:
+    def get_tasks(self, group_id: int, started_only: bool, after: Cursor | None = None, limit: int | None = None) -> tuple[list[TaskDTO], Cursor | None]:
         stm = select(TaskDTO).where(TaskDTO.group_id == group_id)
         if started_only is True:
             stm = stm.where(TaskDTO.starts_on <= datetime.now().astimezone())
-        stm = stm.order_by(TaskDTO.created_at)
-        return list(self._session.scalars(stm).all())
+        return self._paginate(self._read_session, stm, TaskDTO.created_at, TaskDTO.id, after, limit)
@@ -0,0 +1,39 @@
+from sqlalchemy import case, func, select
+from sqlalchemy.dialects.postgresql import insert
+
+from repository.abstract_repository import AbstractRepository
+from repository.dto.result import ResultDTO
+from repository.dto.task_summary import TaskSummaryDTO
+
+# pylint: disable=not-callable
+class TaskSummaryRepository(AbstractRepository[TaskSummaryDTO]):
+    def __init__(self) -> None:
+        super().__init__(TaskSummaryDTO)
+
+    def get_summaries(self, task_id: int) -> list[TaskSummaryDTO]:
+        stm = select(TaskSummaryDTO).where(TaskSummaryDTO.task_id == task_id)
+        return list(self._read_session.scalars(stm).all())
+
+    def add_result(self, result: ResultDTO, failed_tests: list[int]) -> None:
+        # Not committed - it's committed along with the result's test results.
+        # Upsert, so concurrent evaluations of the same student don't lose attempts.
+        stm = insert(TaskSummaryDTO).values(
+            task_id=result.task_id,
+            student_id=result.student_id,
+            result_id=result.id,
+            number_attempts=1,
+            correct_open=result.correct_open,
+            correct_closed=result.correct_closed,
+            failed_tests=failed_tests,
+        )
+        # results may finish out of order - keep the latest submitted one
+        is_latest = stm.excluded.result_id > TaskSummaryDTO.result_id
+        stm = stm.on_conflict_do_update(index_elements=[TaskSummaryDTO.task_id, TaskSummaryDTO.student_id], set_={
+            'number_attempts': TaskSummaryDTO.number_attempts + 1,
+            'result_id': case((is_latest, stm.excluded.result_id), else_=TaskSummaryDTO.result_id),
+            'correct_open': case((is_latest, stm.excluded.correct_open), else_=TaskSummaryDTO.correct_open),
+            'correct_closed': case((is_latest, stm.excluded.correct_closed), else_=TaskSummaryDTO.correct_closed),
+            'failed_tests': case((is_latest, stm.excluded.failed_tests), else_=TaskSummaryDTO.failed_tests),
+            'updated_at': func.now(),
+        })
+        self._session.execute(stm)
@@ -1,5 +1,6 @@
 from sqlalchemy import select
 
+from helpers.pagination import Cursor
 from repository.abstract_repository import AbstractRepository
 from repository.dto.test_case import TestCaseDTO
 
@@ -7,6 +8,10 @@ class TCaseRepository(AbstractRepository[TestCaseDTO]):
     def __init__(self) -> None:
         super().__init__(TestCaseDTO)
 
-    def get_tests(self, task_id: int) -> list[TestCaseDTO]:
-        stm = select(TestCaseDTO).where(TestCaseDTO.task_id == task_id).order_by(TestCaseDTO.created_at)
+    def get_tests(self, task_id: int, after: Cursor | None = None, limit: int | None = None) -> tuple[list[TestCaseDTO], Cursor | None]:
+        stm = select(TestCaseDTO).where(TestCaseDTO.task_id == task_id)
+        return self._paginate(self._read_session, stm, TestCaseDTO.created_at, TestCaseDTO.id, after, limit)
+
+    def get_tests_to_update(self, task_id: int) -> list[TestCaseDTO]:
+        stm = select(TestCaseDTO).where(TestCaseDTO.task_id == task_id).order_by(TestCaseDTO.created_at, TestCaseDTO.id)
         return list(self._session.scalars(stm).all())
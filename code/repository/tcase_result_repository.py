@@ -8,5 +8,5 @@ class TCaseResultRepository(AbstractRepository[TestCaseResultDTO]):
         super().__init__(TestCaseResultDTO)
 
     def get_test_results(self, result_id: int) -> list[TestCaseResultDTO]:
-        stm = select(TestCaseResultDTO).where(TestCaseResultDTO.result_id == result_id).order_by(TestCaseResultDTO.created_at)
+        stm = select(TestCaseResultDTO).where(TestCaseResultDTO.result_id == result_id).order_by(TestCaseResultDTO.created_at, TestCaseResultDTO.id)
         return list(self._session.scalars(stm).all())
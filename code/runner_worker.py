@@ -0,0 +1,67 @@
+from threading import Thread
+import time
+
+from flask import Flask
+
+from helpers.codemaze_logger import CodemazeLogger
+from helpers.config import Config
+from helpers.submission_queue import SubmissionQueue
+from repository.database import Database
+from services.result_service import ResultService
+from services.runner_service import RunnerService
+from services.tcase_service import TCaseService
+
+WAIT_SECONDS = 5
+RECLAIM_INTERVAL_SECONDS = 60
+
+class RunnerWorker:
+    def __init__(self, app: Flask) -> None:
+        self.__app = app
+        self.__tcase_service = TCaseService()
+        self.__result_service = ResultService(RunnerService(), None)
+
+    def __evaluate(self, result_id: int) -> None:
+        # the repositories use the session of the current app context, as in a request
+        with self.__app.app_context():
+            Database.open_session()
+            try:
+                self.__result_service.evaluate(result_id, self.__tcase_service.get_running_tests)
+            # pylint: disable=broad-exception-caught
+            except Exception:
+                CodemazeLogger.shared().exception(f'Failed to evaluate result {result_id}')
+            finally:
+                Database.close_session()
+
+    def __reclaim(self) -> None:
+        while True:
+            time.sleep(RECLAIM_INTERVAL_SECONDS)
+            with self.__app.app_context():
+                Database.open_session()
+                try:
+                    reclaimed = self.__result_service.reclaim_stale(float(Config.get('runners.stale-result-seconds')))
+                    if len(reclaimed) > 0:
+                        CodemazeLogger.shared().warning(f'Queued again the stale results {reclaimed}')
+                # pylint: disable=broad-exception-caught
+                except Exception:
+                    CodemazeLogger.shared().exception('Failed to reclaim the stale results')
+                finally:
+                    Database.close_session()
+
+    def __consume(self) -> None:
+        while True:
+            try:
+                result_id = SubmissionQueue.wait_for_submission(WAIT_SECONDS)
+            # pylint: disable=broad-exception-caught
+            except Exception:
+                CodemazeLogger.shared().exception('Failed to read the submissions queue')
+                time.sleep(WAIT_SECONDS)
+                continue
+            if result_id is not None:
+                self.__evaluate(result_id)
+
+    def start(self, daemon: bool) -> list[Thread]:
+        threads = [ Thread(target=self.__consume, daemon=daemon) for _ in range(int(Config.get('runners.worker-threads'))) ]
+        threads.append(Thread(target=self.__reclaim, daemon=daemon))
+        for thread in threads:
+            thread.start()
+        return threads
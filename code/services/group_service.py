@@ -6,6 +6,8 @@ from endpoints.models.group import GroupVO
 from endpoints.models.join_request import JoinRequestVO
 from endpoints.models.user import UserVO
 from helpers.exceptions import Internal_UniqueViolation, Forbidden
+from helpers.pagination import Cursor
+from helpers.session_cache import SessionCache
 from repository.group_repository import GroupRepository
 from repository.student_group_repository import StudentGroupRepository
 from repository.dto.group_dto import GroupDTO
@@ -29,6 +31,7 @@ class GroupService:
         dto.manager_id = manager.id
         try:
             stored = self.__group_repository.add(dto, raise_unique_violation_error=True)
+            SessionCache.invalidate_groups(manager.id)
             return GroupVO.import_from_dto(stored, manager)
         except Internal_UniqueViolation:
             return self.create(name, manager) # retry if the same code was generated
@@ -46,11 +49,11 @@ class GroupService:
         dto.id = -1 # must be set to respect Base inheritance
         self.__student_group_repository.add(dto, raise_unique_violation_error=True)
 
-    def get_students_with_join_request(self, group_id: int, manager_id: int) -> list[JoinRequestVO]:
+    def get_students_with_join_request(self, group_id: int, manager_id: int, after: Cursor | None = None, limit: int | None = None) -> tuple[list[JoinRequestVO], Cursor | None]:
         if self.__group_repository.find(group_id).manager_id != manager_id:
             raise Forbidden()
-        students = self.__student_group_repository.get_students_with_join_request(group_id)
-        return list(map(lambda student: JoinRequestVO.import_from_student(student), students))
+        students, next_cursor = self.__student_group_repository.get_join_requests(group_id, after, limit)
+        return (list(map(lambda student: JoinRequestVO.import_from_student(student), students)), next_cursor)
 
     def update_join_request(self, group_id: int, student_id: int, manager_id: int, approved: bool) -> None:
         group = self.__group_repository.find(group_id)
@@ -58,6 +61,7 @@ class GroupService:
             raise Forbidden()
         if approved:
             self.__student_group_repository.approve_join_request(group_id, student_id)
+            SessionCache.invalidate_groups(student_id)
         else:
             self.__student_group_repository.remove_join_request(group_id, student_id)
 
@@ -70,15 +74,19 @@ class GroupService:
         if name is not None:
             dto.name = name
         self.__group_repository.update_session()
+        SessionCache.invalidate_all_groups() # the group is listed in the groups of all its students
         return GroupVO.import_from_dto(dto, manager)
 
-    def get_all(self, user: UserVO | None, get_manager_with_group: Callable[[int], UserVO]) -> list[GroupVO]:
-        dtos: list[GroupDTO]
-        if user:
+    def get_all(self, user: UserVO | None) -> list[GroupVO]:
+        if user is None:
+            dtos = self.__group_repository.find_all_with_managers()
+            return list(map(lambda dto: GroupVO.import_from_dto(dto[0], UserVO.import_from_dto(dto[1])), dtos))
+        groups = SessionCache.get_groups(user.id)
+        if groups is None:
             dtos = self.__student_group_repository.get_groups_for_user(user.id, user.role)
-        else:
-            dtos = self.__group_repository.find_all()
-        return list(map(lambda dto: GroupVO.import_from_dto(dto, get_manager_with_group(dto.manager_id)), dtos))
+            groups = list(map(lambda dto: GroupVO.import_from_dto(dto[0], UserVO.import_from_dto(dto[1])), dtos))
+            SessionCache.set_groups(user.id, groups)
+        return groups
 
     def get_group(self, id: int, get_manager_with_group: Callable[[int], UserVO]) -> GroupVO:
         dto = self.__group_repository.find(id)
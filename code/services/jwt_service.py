@@ -18,11 +18,12 @@ class JWTService:
         expiration_minutes = int(Config.get('admin.session-duration'))
         self.__expiration_delta = datetime.timedelta(days=0, hours=0, minutes=expiration_minutes)
 
-    def create_token(self, user_id: int, intent: Intent) -> str:
+    def create_token(self, user_id: int, intent: Intent, claims: dict[str, Any] | None = None) -> str:
         payload = {
             'exp': datetime.datetime.utcnow() + self.__expiration_delta,
             'iat': datetime.datetime.utcnow(),
             'sub': {
+                **(claims or {}),
                 'intent': intent,
                 'user_id': user_id,
             },
@@ -33,12 +34,16 @@ class JWTService:
             raise ServerError() from e
 
     def decode_token(self, token: str, intent: Intent) -> int:
+        return int(self.decode_claims(token, intent)['user_id'])
+
+    def decode_claims(self, token: str, intent: Intent) -> dict[str, Any]:
         try:
             payload: dict[str, Any] = jwt.decode(token, key=self.__key, algorithms=[ALGORITHM])
             sub: dict[str, Any] = payload['sub']
             if str(sub['intent']) != intent:
                 raise Unauthorized()
-            return int(sub['user_id'])
+            sub['user_id'] = int(sub['user_id'])
+            return sub
         except jwt.ExpiredSignatureError as e:
             raise Unauthorized() from e
         except jwt.InvalidTokenError as e:
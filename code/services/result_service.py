@@ -1,10 +1,10 @@
 from collections import Counter
 from datetime import datetime, timedelta
 from functools import reduce
+import hashlib
 from itertools import groupby
-import os
 from threading import Thread
-from typing import Callable, Optional
+from typing import Any, Callable, Optional
 
 from endpoints.models.all_tests_vo import AllTestsVO
 from endpoints.models.group import GroupVO
@@ -17,13 +17,19 @@ from helpers.commons import file_extension, source_code_download_url, secure_fil
 from helpers.config import Config
 from helpers.exceptions import Forbidden, ServerError
 from helpers.file import File
+from helpers.storage import Storage
+from helpers.result_memo import ResultMemo
+from helpers.result_status import ResultStatus
 from helpers.role import Role
+from helpers.submission_queue import SubmissionQueue
 from helpers.unwrapper import unwrap
 from repository.plagiarism_report_repository import PlagiarismReportRepository
 from repository.result_repository import ResultRepository
+from repository.task_summary_repository import TaskSummaryRepository
 from repository.dto.plagiarism_report_dto import PlagiarismReportDTO
 from repository.dto.result import ResultDTO
-from services.runner_service import RunnerService
+from repository.dto.task_summary import TaskSummaryDTO
+from services.runner_service import RunnerService, TIMEOUT_MESSAGE
 from services.moss_service import MossService
 
 class ResultService:
@@ -32,46 +38,71 @@ class ResultService:
         self.__moss_service = moss_service
         self.__result_repository = ResultRepository()
         self.__plagiarism_report_repository = PlagiarismReportRepository()
+        self.__task_summary_repository = TaskSummaryRepository()
 
     def run(self, user: UserVO, task: TaskVO, tests: AllTestsVO, file: File) -> ResultVO:
         if (len(tests.closed_tests) + len(tests.open_tests)) < 1:
             raise Forbidden() # Prevent running without tests
         match user.role:
             case Role.STUDENT:
-                return self.__run_as_student(user, task, tests, file)
+                return self.__run_as_student(user, task, file)
             case Role.MANAGER:
                 return self.__run_as_manager(user, task, tests, file)
 
-    def __run_as_student(self, user: UserVO, task: TaskVO, tests: AllTestsVO, file: File) -> ResultVO:
+    def __run_as_student(self, user: UserVO, task: TaskVO, file: File) -> ResultVO:
         now = datetime.now().astimezone()
         if unwrap(task.starts_on) > now or (task.ends_on is not None and task.ends_on < now):
             raise Forbidden()
         attempt_number = self.__result_repository.get_number_of_results(user.id, task.id) + 1
         if task.max_attempts is not None and attempt_number > task.max_attempts:
             raise Forbidden()
-        stored = self.__result_repository.add(self.__create_result_dto(user, task, file))
+        dto = self.__create_result_dto(user, task, file)
+        dto.status = ResultStatus.QUEUED
+        stored = self.__result_repository.add(dto)
         try:
-            results = self.__runner_service.run(stored.file_path, tests, stored.id, should_save=True)
-            open_results, closed_results = self.__split_open_closed_results(results, tests)
-            correct_open, correct_closed = self.__compute_correct_open_correct_closed(open_results, closed_results)
-            stored.correct_open = correct_open
-            stored.correct_closed = correct_closed
-            self.__result_repository.update_session()
-            for result in closed_results:
-                result.diff = None
-            return ResultVO.import_from_dto(stored, attempt_number, open_results, closed_results)
-        except ServerError as e:
+            SubmissionQueue.enqueue(stored.id)
+        except Exception as e:
             # rollback
-            os.remove(stored.file_path)
+            unwrap(Storage.shared).release(stored.file_path)
             self.__result_repository.delete(stored.id)
+            raise ServerError() from e
+        return ResultVO.import_from_dto(stored, attempt_number, [], [])
+
+    def evaluate(self, result_id: int, get_tests_func: Callable[[int], AllTestsVO]) -> None:
+        started = self.__result_repository.start_running(result_id)
+        if started is None:
+            return # already picked up by another worker
+        try:
+            stored = self.__result_repository.find(result_id)
+            tests = get_tests_func(stored.task_id)
+            results = self.__run_tests(stored.task_id, stored.file_path, tests)
+            open_results, closed_results = self.__split_open_closed_results(results, tests)
+            correct_open, correct_closed = self.__compute_correct_open_correct_closed(open_results, closed_results)
+            if not self.__result_repository.finish(result_id, started, correct_open, correct_closed):
+                return # took too long - it was queued again, and is another attempt's now
+            self.__task_summary_repository.add_result(stored, [ result.test_case_id for result in results if not result.success ])
+            # same session - the verdicts, the result, and the task's summary are committed in one transaction
+            self.__runner_service.save_test_results(results, stored.id)
+        except Exception as e:
+            # the student keeps polling this result - it's kept as failed, and the attempt doesn't count
+            self.__result_repository.fail(result_id, started, str(ServerError()))
             raise e
 
+    def reclaim_stale(self, timeout_seconds: float) -> list[int]:
+        # results whose worker died - after popping their id (still queued) or while evaluating them (still running)
+        before = datetime.now().astimezone() - timedelta(seconds=timeout_seconds)
+        lost = [ result_id for result_id in self.__result_repository.get_stale_queued_ids(before) if not SubmissionQueue.is_queued(result_id) ]
+        lost.extend(self.__result_repository.requeue_stale_running(before))
+        for result_id in lost:
+            SubmissionQueue.enqueue(result_id)
+        return lost
+
     def __run_as_manager(self, user: UserVO, task: TaskVO, tests: AllTestsVO, file: File) -> ResultVO:
         dto = self.__create_result_dto(user, task, file)
         dto.id = -1
         try:
-            results = self.__runner_service.run(dto.file_path, tests, dto.id, should_save=False)
-            os.remove(dto.file_path)
+            results = self.__run_tests(dto.task_id, dto.file_path, tests)
+            unwrap(Storage.shared).release(dto.file_path)
             open_results, closed_results = self.__split_open_closed_results(results, tests)
             correct_open, correct_closed = self.__compute_correct_open_correct_closed(open_results, closed_results)
             dto.correct_open = correct_open
@@ -79,15 +110,45 @@ class ResultService:
             return ResultVO.import_from_dto(dto, -1, open_results, closed_results)
         except ServerError as e:
             # rollback
-            os.remove(dto.file_path)
+            unwrap(Storage.shared).release(dto.file_path)
             raise e
 
+    def __memo_key(self, task_id: int, path: str, tests: AllTestsVO) -> str | None:
+        source_key = self.__runner_service.source_key(path)
+        if source_key is None:
+            return None
+        # the verdicts also depend on the runners' limits
+        digest = hashlib.sha256(f'{source_key}:{Config.get("runners.timeout")}:{Config.get("runners.max-output-kb")}:{Config.get("runners.parallel-tests")}'.encode('utf-8'))
+        for test in tests.open_tests + tests.closed_tests:
+            digest.update(f':{test.id}:{unwrap(test.input_sha256)}:{unwrap(test.output_sha256)}:{test.comparison_mode}:{test.tolerance}'.encode('utf-8'))
+        return ResultMemo.key(task_id, digest.hexdigest())
+
+    def __run_tests(self, task_id: int, path: str, tests: AllTestsVO) -> list[TCaseResultVO]:
+        memo_key = self.__memo_key(task_id, path, tests)
+        verdicts = ResultMemo.get(memo_key) if memo_key is not None else None
+        if verdicts is not None:
+            # same source and same tests - no need to run it again
+            return [ self.__verdict_to_vo(verdict) for verdict in verdicts ]
+        results = self.__runner_service.run(path, tests)
+        # timeouts depend on the runners' load
+        if memo_key is not None and all(result.diff != TIMEOUT_MESSAGE for result in results):
+            ResultMemo.set(memo_key, [ { 'test_case_id': result.test_case_id, 'success': result.success, 'diff': result.diff } for result in results ])
+        return results
+
+    def __verdict_to_vo(self, verdict: dict[str, Any]) -> TCaseResultVO:
+        vo = TCaseResultVO()
+        vo.test_case_id = int(verdict['test_case_id'])
+        vo.success = bool(verdict['success'])
+        vo.diff = verdict['diff']
+        return vo
+
     def __create_result_dto(self, user: UserVO, task: TaskVO, file: File) -> ResultDTO:
         code_max_size_mb = float(Config.get('files.code-max-size-mb'))
         file_path = file.save(self.__runner_service.allowed_extensions(task.languages), max_file_size_mb=code_max_size_mb)
         dto = ResultDTO()
         dto.correct_open = 0
         dto.correct_closed = 0
+        dto.status = ResultStatus.DONE
         dto.file_path = file_path
         dto.student_id = user.id
         dto.task_id = task.id
@@ -110,13 +171,22 @@ class ResultService:
     def get_latest_result(self, task: TaskVO, user: UserVO, tests: AllTestsVO) -> ResultVO:
         dto = self.__result_repository.get_latest_result(user.id, task.id)
         number_off_attempts = self.__result_repository.get_number_of_results(user.id, task.id)
+        return self.__create_result_vo(dto, number_off_attempts, user, tests)
+
+    def get_result(self, result_id: int, user: UserVO, get_tests_func: Callable[[int], AllTestsVO]) -> ResultVO:
+        dto = self.__result_repository.find(result_id)
+        if dto.student_id != user.id:
+            raise Forbidden()
+        attempt_number = self.__result_repository.get_attempt_number(dto)
+        return self.__create_result_vo(dto, attempt_number, user, get_tests_func(dto.task_id))
+
+    def __create_result_vo(self, dto: ResultDTO, attempt_number: int, user: UserVO, tests: AllTestsVO) -> ResultVO:
         test_results = self.__runner_service.get_test_results(dto.id)
-        open_results = list(filter(lambda result: any(result.test_case_id == test.id for test in tests.open_tests) , test_results))
-        closed_results = list(filter(lambda result: any(result.test_case_id == test.id for test in tests.closed_tests) , test_results))
+        open_results, closed_results = self.__split_open_closed_results(test_results, tests)
         if user.role == Role.STUDENT:
             for result in closed_results:
                 result.diff = None
-        return ResultVO.import_from_dto(dto, number_off_attempts, open_results, closed_results)
+        return ResultVO.import_from_dto(dto, attempt_number, open_results, closed_results)
 
     def get_source_code_from_result_name_path(self, result_id: int, user_id: int, user_groups: list[GroupVO], get_task_func: Callable[[int, int, list[GroupVO]], TaskVO], get_student_func: Callable[[int], UserVO]) -> tuple[str, str]:
         dto = self.__result_repository.find(result_id)
@@ -126,24 +196,24 @@ class ResultService:
         filename = secure_filename('source_' + student.name + file_extension(path))
         return (filename, path)
 
-    def __get_students_report(self, task_results: list[ResultDTO], students: list[UserVO], tests: AllTestsVO) -> list[StudentReport]:
+    def __get_students_report(self, summaries: list[TaskSummaryDTO], students: list[UserVO], tests: AllTestsVO) -> list[StudentReport]:
         number_open_tests = len(tests.open_tests)
         number_closed_tests = len(tests.closed_tests)
+        summaries_by_student = { summary.student_id: summary for summary in summaries }
         student_reports = [ StudentReport(student.id, student.name) for student in students ]
         for report in student_reports:
-            results = [ result for result in task_results if result.student_id == report.id ]
             try:
-                valid_result = results[-1] # last submitted
-                report.open_result_percentage = round((valid_result.correct_open / number_open_tests) * 100, 2)
-                report.closed_result_percentage = round((valid_result.correct_closed / number_closed_tests) * 100, 2) if number_closed_tests > 0 else None
+                summary = summaries_by_student[report.id] # last submitted
+                report.open_result_percentage = round((summary.correct_open / number_open_tests) * 100, 2)
+                report.closed_result_percentage = round((summary.correct_closed / number_closed_tests) * 100, 2) if number_closed_tests > 0 else None
                 report.result_percentage = compute_percentage(report.open_result_percentage, report.closed_result_percentage, number_open_tests, number_closed_tests)
-                report.number_attempts = len(results)
-                report.source_code_url = source_code_download_url(valid_result.id)
+                report.number_attempts = summary.number_attempts
+                report.source_code_url = source_code_download_url(summary.result_id)
                 wrong_tests: list[int] = []
                 if report.result_percentage != 100:
-                    wrong_tests = [ tcase_result.test_case_id for tcase_result in [ tc_result for tc_result in self.__runner_service.get_test_results(valid_result.id) if tc_result.diff is not None ] ]
+                    wrong_tests = list(summary.failed_tests)
                 report.wrong_tests_id = wrong_tests
-            except IndexError:
+            except KeyError:
                 # student didn't submit any result
                 report.open_result_percentage = 0
                 report.closed_result_percentage = 0 if number_closed_tests > 0 else None
@@ -176,13 +246,13 @@ class ResultService:
         return OverallReport(submissions_percentage, sorted(results_percentage, reverse=True), mean_attempts_success, tests_more_failures)
 
     def __get_tests_report(self, students_report: list[StudentReport], tests: AllTestsVO) -> list[TestReport]:
-        students_with_results = [ report for report in students_report if report.number_attempts > 0 ]
-        number_of_submissions = len(students_with_results)
+        number_of_submissions = len([ report for report in students_report if report.number_attempts > 0 ])
+        failures = Counter(test_id for report in students_report for test_id in report.wrong_tests_id)
         reports: list[TestReport] = []
         for test in tests.open_tests + tests.closed_tests:
             correct_percentage: float = 0
             if number_of_submissions > 0:
-                correct_percentage = round((1 - (len([ report for report in students_with_results if test.id in report.wrong_tests_id ]) / number_of_submissions)) * 100, 2)
+                correct_percentage = round((1 - (failures[test.id] / number_of_submissions)) * 100, 2)
             reports.append(TestReport(test.id, correct_percentage))
         return reports
 
@@ -198,28 +268,23 @@ class ResultService:
             return [ report.url for report in reports ]
         return []
 
-    def __get_plagiarism_report(self, task: TaskVO, task_results: list[ResultDTO], students: list[UserVO], reports: dict[str, str]) -> None:
+    def __get_plagiarism_report(self, task: TaskVO, results: list[ResultDTO], students: list[UserVO], reports: dict[str, str]) -> None:
         if self.__moss_service is None or task.ends_on is None:
             return # MOSS user ID not set or task without ends_on set
         if task.ends_on >= datetime.now().astimezone():
             return # task didn't finish
-        task_results.reverse() # the latest is the relevant one
-        results: list[ResultDTO] = []
-        for result in task_results:
-            # keep only one result per student
-            if result.student_id not in [ _result.student_id for _result in results ]:
-                results.append(result)
-        for extension, _results in groupby(results, lambda result: file_extension(result.file_path)):
+        student_names = { student.id: student.name for student in students }
+        # groupby requires a sorted list
+        for extension, _results in groupby(sorted(results, key=lambda result: file_extension(result.file_path)), lambda result: file_extension(result.file_path)):
             filepath_name_list: list[tuple[str, str]] = []
             language = self.__runner_service.language_with_extension(extension)
             if language is None:
                 continue
             for result in _results:
-                try:
-                    student_name = next(student.name for student in students if student.id == result.student_id)
-                    filepath_name_list.append((result.file_path, student_name))
-                except StopIteration:
+                student_name = student_names.get(result.student_id)
+                if student_name is None:
                     continue
+                filepath_name_list.append((result.file_path, student_name))
             report_url = self.__moss_service.get_report(filepath_name_list, language)
             if report_url is None:
                 continue
@@ -238,14 +303,15 @@ class ResultService:
         return result
 
     def get_results_report(self, task: TaskVO, students: list[UserVO], tests: AllTestsVO) -> ReportVO:
-        task_results = self.__result_repository.get_results_for_task(task.id)
         plagiarism_report_urls: list[str] = self.__get_current_plagiarism_reports(task)
         thread: Thread | None = None
         reports = dict[str, str]()
         if len(plagiarism_report_urls) == 0:
-            thread = Thread(target=self.__get_plagiarism_report, args=[task, task_results.copy(), students, reports])
+            latest_results = self.__result_repository.get_latest_results_for_task(task.id)
+            thread = Thread(target=self.__get_plagiarism_report, args=[task, latest_results, students, reports])
             thread.start()
-        students_report = self.__get_students_report(task_results, students, tests)
+        summaries = self.__task_summary_repository.get_summaries(task.id)
+        students_report = self.__get_students_report(summaries, students, tests)
         overall_report = self.__get_overall_report(students_report)
         tests_report = self.__get_tests_report(students_report, tests)
         if thread:
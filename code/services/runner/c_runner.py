@@ -19,8 +19,8 @@ class CRunner(Runner):
         return f'Compilation command: {command}'
 
     @property
-    def container_name(self) -> str:
-        return 'gcc-container'
+    def service_name(self) -> str:
+        return 'gcc'
 
     def __gcc_command(self, executable: str, source_path: str) -> str:
         gcc_options = str(self.__gcc_params)
@@ -0,0 +1,102 @@
+import hashlib
+import os
+from threading import Lock
+import uuid
+
+from helpers.codemaze_logger import CodemazeLogger
+from helpers.commons import storage_path
+from helpers.config import Config
+
+CACHE_DIRECTORY = 'compilation-cache'
+EXECUTABLE_EXTENSION = '.bin'
+ERROR_EXTENSION = '.err'
+
+class CompilationArtifact:
+    def __init__(self, executable: bytes | None = None, error: str | None = None) -> None:
+        self.executable = executable
+        self.error = error
+
+class CompilationCache:
+    def __init__(self) -> None:
+        self.__lock = Lock()
+        self.__hits = 0
+        self.__misses = 0
+
+    @staticmethod
+    def key(source: bytes, language: str, compilation_command: str) -> str:
+        # the compilation command carries the compiler flags (e.g. runners.c.gcc-parameters)
+        source_hash = hashlib.sha256(source).hexdigest()
+        return hashlib.sha256(f'{source_hash}:{language}:{compilation_command}'.encode('utf-8')).hexdigest()
+
+    def __directory(self) -> str:
+        # shared by the workers through the files volume
+        path = os.path.join(storage_path(), CACHE_DIRECTORY)
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    def __count(self, hit: bool) -> None:
+        with self.__lock:
+            if hit:
+                self.__hits += 1
+            else:
+                self.__misses += 1
+            CodemazeLogger.shared().debug(f'Compilation cache {"hit" if hit else "miss"} | hits: {self.__hits} | misses: {self.__misses}')
+
+    def get(self, key: str) -> CompilationArtifact | None:
+        directory = self.__directory()
+        for extension in (EXECUTABLE_EXTENSION, ERROR_EXTENSION):
+            path = os.path.join(directory, key + extension)
+            try:
+                with open(path, 'rb') as file:
+                    blob = file.read()
+                os.utime(path) # most recently used
+            except FileNotFoundError:
+                continue # missing or just evicted
+            self.__count(hit=True)
+            if extension == ERROR_EXTENSION:
+                return CompilationArtifact(error=blob.decode('utf-8'))
+            return CompilationArtifact(executable=blob)
+        self.__count(hit=False)
+        return None
+
+    def put(self, key: str, artifact: CompilationArtifact) -> None:
+        directory = self.__directory()
+        if artifact.executable is not None:
+            path, blob = os.path.join(directory, key + EXECUTABLE_EXTENSION), artifact.executable
+        elif artifact.error is not None:
+            path, blob = os.path.join(directory, key + ERROR_EXTENSION), artifact.error.encode('utf-8')
+        else:
+            return
+        temporary_path = os.path.join(directory, f'.{uuid.uuid4()}')
+        try:
+            with open(temporary_path, 'wb') as file:
+                file.write(blob)
+            os.replace(temporary_path, path) # readers never see a partial file
+            self.__evict(directory)
+        except OSError:
+            # caching is best effort - the job already ran
+            CodemazeLogger.shared().exception('Failed to store the compilation artifact')
+
+    def __evict(self, directory: str) -> None:
+        max_size = float(Config.get('runners.compilation-cache-mb')) * 1024 * 1024
+        entries: list[tuple[float, int, str]] = []
+        total_size = 0
+        with os.scandir(directory) as iterator:
+            for entry in iterator:
+                if entry.name.startswith('.'):
+                    continue # being written
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue # evicted by another worker
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total_size += stat.st_size
+        # least recently used first
+        for _, size, path in sorted(entries):
+            if total_size <= max_size:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total_size -= size
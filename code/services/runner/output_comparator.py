@@ -0,0 +1,148 @@
+from collections import deque
+from io import StringIO
+from itertools import islice
+from typing import Iterator, TextIO
+
+from helpers.comparison_mode import ComparisonMode
+
+CONTEXT_LINES = 3
+WINDOW_LINES = 20
+MAX_LINE_LENGTH = 512
+
+class _LineReader:
+    def __init__(self, lines: Iterator[str]) -> None:
+        self.__lines = lines
+        self.number = 0
+        self.current: str | None = None
+        self.previous: deque[str] = deque(maxlen=CONTEXT_LINES)
+
+    @property
+    def position(self) -> int:
+        return self.number if self.current is not None else self.number + 1
+
+    def next(self) -> str | None:
+        if self.current is not None:
+            self.previous.append(self.current)
+        self.current = next(self.__lines, None)
+        if self.current is not None:
+            self.number += 1
+        return self.current
+
+    def tokens(self) -> Iterator[str]:
+        while (line := self.next()) is not None:
+            yield from line.split()
+
+    def window(self) -> list[str]:
+        # only a window around the divergence - the remaining lines are never read
+        if self.current is None:
+            return []
+        return [self.current] + list(islice(self.__lines, WINDOW_LINES - 1))
+
+class OutputComparator:
+    def __init__(self, max_output_kb: float) -> None:
+        self.__max_output_kb = max_output_kb
+
+    def __line_numbers(self, start: int, count: int) -> str:
+        return f'{start},{count}' if count > 0 else f'{start - 1},0'
+
+    def __format(self, prefix: str, lines: list[str]) -> list[str]:
+        formatted: list[str] = []
+        for line in lines:
+            content = line.rstrip('\r\n')
+            if len(content) > MAX_LINE_LENGTH:
+                content = content[:MAX_LINE_LENGTH] + f' [{len(content) - MAX_LINE_LENGTH} more characters]'
+            formatted.append(prefix + content)
+            if not line.endswith('\n'):
+                formatted.append('\\ No newline at end of file')
+        return formatted
+
+    def __diff(self, expected: _LineReader, result: _LineReader, aligned: bool, truncated: bool) -> str:
+        # the lines before the divergence are only the same on both sides when comparing line by line
+        context = list(expected.previous) if aligned else []
+        expected_window = expected.window()
+        result_window = result.window()
+        expected_start = expected.position - len(context)
+        result_start = result.position - len(context)
+        lines = [
+            '--- expected.out',
+            '+++ result.out',
+            f'@@ -{self.__line_numbers(expected_start, len(context) + len(expected_window))} +{self.__line_numbers(result_start, len(context) + len(result_window))} @@',
+        ]
+        lines.extend(self.__format(' ', context))
+        lines.extend(self.__format('-', expected_window))
+        lines.extend(self.__format('+', result_window))
+        if truncated:
+            lines.append(f'Output limit of {self.__max_output_kb:g} KB exceeded.')
+        return '\n'.join(lines)
+
+    def __compare_exact(self, expected: _LineReader, result: _LineReader) -> bool:
+        while True:
+            expected_line = expected.next()
+            result_line = result.next()
+            if expected_line is None and result_line is None:
+                return True
+            if expected_line != result_line:
+                return False
+
+    def __compare_trailing_whitespace(self, expected: _LineReader, result: _LineReader) -> bool:
+        while True:
+            expected_line = expected.next()
+            result_line = result.next()
+            if expected_line is None or result_line is None:
+                break
+            if expected_line.rstrip() != result_line.rstrip():
+                return False
+        # one of them ended - the other may only have blank lines left
+        remaining = expected if expected_line is not None else result
+        line = remaining.current
+        while line is not None:
+            if line.strip():
+                return False
+            line = remaining.next()
+        return True
+
+    def __numbers_match(self, expected_token: str, result_token: str, tolerance: float) -> bool:
+        if expected_token == result_token:
+            return True
+        try:
+            expected_number = float(expected_token)
+            result_number = float(result_token)
+        except ValueError:
+            return False
+        # absolute for small numbers, relative for large ones
+        return abs(expected_number - result_number) <= tolerance * max(1.0, abs(expected_number), abs(result_number))
+
+    def __compare_tokens(self, expected: _LineReader, result: _LineReader, tolerance: float | None) -> bool:
+        expected_tokens = expected.tokens()
+        result_tokens = result.tokens()
+        while True:
+            expected_token = next(expected_tokens, None)
+            result_token = next(result_tokens, None)
+            if expected_token is None and result_token is None:
+                return True
+            if expected_token is None or result_token is None:
+                return False
+            if tolerance is None:
+                if expected_token != result_token:
+                    return False
+            elif not self.__numbers_match(expected_token, result_token, tolerance):
+                return False
+
+    def compare(self, expected: TextIO, output: str, truncated: bool, mode: ComparisonMode = ComparisonMode.EXACT, tolerance: float | None = None) -> str | None:
+        # Single pass over both outputs. Returns None when they match, else a bounded diff.
+        expected_reader = _LineReader(iter(expected))
+        result_reader = _LineReader(iter(StringIO(output, newline=''))) # keeps '\r' and '\r\n' line endings
+        match mode:
+            case ComparisonMode.EXACT:
+                matches = self.__compare_exact(expected_reader, result_reader)
+            case ComparisonMode.TRAILING_WHITESPACE:
+                matches = self.__compare_trailing_whitespace(expected_reader, result_reader)
+            case ComparisonMode.TOKENS:
+                matches = self.__compare_tokens(expected_reader, result_reader, tolerance=None)
+            case ComparisonMode.NUMERIC:
+                matches = self.__compare_tokens(expected_reader, result_reader, tolerance=tolerance or 0)
+        if matches and not truncated:
+            return None
+        # when everything kept matched, the program still wrote more than allowed
+        aligned = mode in (ComparisonMode.EXACT, ComparisonMode.TRAILING_WHITESPACE) and expected_reader.position == result_reader.position
+        return self.__diff(expected_reader, result_reader, aligned, truncated)
@@ -14,8 +14,12 @@ class PythonRunner(Runner):
         return 'Python version: 3.11' # defined on compose.yml
 
     @property
-    def container_name(self) -> str:
-        return 'python-container'
+    def is_compiled(self) -> bool:
+        return False
+
+    @property
+    def service_name(self) -> str:
+        return 'python'
 
     def compilation_command(self, source_path: str, executable: str) -> str:
         return f'cp {source_path} {executable}'
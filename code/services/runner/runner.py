@@ -1,8 +1,25 @@
 from abc import ABC, abstractmethod
 
 from helpers.commons import file_extension
+from helpers.config import Config
+
+COMPOSE_PROJECT = 'codemaze' # defined on compose.yaml
 
 class Runner(ABC):
+    @property
+    def pool_size(self) -> int:
+        return int(Config.get(f'runners.{self.language_name}.pool-size'))
+
+    @property
+    def containers(self) -> list[str]:
+        # interchangeable replicas of the compose service (see compose.yaml)
+        return [ f'{COMPOSE_PROJECT}-{self.service_name}-{index}' for index in range(1, self.pool_size + 1) ]
+
+    @property
+    def is_compiled(self) -> bool:
+        # compiled executables are cached, see CompilationCache
+        return True
+
     def is_source_code(self, source_path: str) -> bool:
         source_extension = file_extension(source_path)
         return any(source_extension == extension for extension in self.file_extensions)
@@ -24,7 +41,7 @@ class Runner(ABC):
 
     @property
     @abstractmethod
-    def container_name(self) -> str:
+    def service_name(self) -> str:
         pass
 
     @abstractmethod
@@ -0,0 +1,90 @@
+from base64 import b64decode, b64encode
+import json
+import math
+import socket
+import subprocess
+import time
+from typing import Any
+
+AGENT_PORT = 7000
+COMPILATION_SECONDS = 30
+DRAIN_SECONDS = 1 # see the agent's - spent after each test at most
+MARGIN_SECONDS = 10
+
+class ExecutionOutput:
+    def __init__(self, message: dict[str, Any]) -> None:
+        self.stdout: bytes = b64decode(message['stdout'])
+        self.stderr: bytes = b64decode(message['stderr'])
+        self.exit_code: int | None = message['exit_code']
+        self.timed_out: bool = message['timed_out']
+        self.output_exceeded: bool = message['output_exceeded']
+        self.duration: float = message['duration']
+
+class JobOutput:
+    def __init__(self) -> None:
+        self.compilation_stdout = ''
+        self.compilation_stderr = ''
+        self.executable: bytes | None = None
+        self.executions: list[ExecutionOutput] = []
+
+class SandboxClient:
+    def __init__(self) -> None:
+        self.__addresses: dict[str, str] = {}
+
+    def __address(self, container: str) -> str:
+        address = self.__addresses.get(container)
+        if address is not None:
+            return address
+        try:
+            socket.getaddrinfo(container, AGENT_PORT)
+            address = container # reachable through the compose network
+        except socket.gaierror:
+            # running outside of the compose network (e.g. tests on the host) - reach the container by IP
+            inspect = ['docker', 'inspect', '-f', '{{range .NetworkSettings.Networks}}{{.IPAddress}} {{end}}', container]
+            address = subprocess.run(inspect, check=True, capture_output=True, text=True).stdout.split()[0]
+        self.__addresses[container] = address
+        return address
+
+    # pylint: disable=too-many-arguments
+    def run_job(self, container: str, source: bytes, source_name: str, compilation_command: str, execution_command: str, tests: list[bytes], timeout: float, parallel: int, max_output: int, executable_name: str, executable: bytes | None = None, return_executable: bool = False) -> JobOutput:
+        job = {
+            'source_name': source_name,
+            'source': b64encode(source).decode('ascii'),
+            'compile': compilation_command.split(' '),
+            'executable_name': executable_name,
+            'executable': b64encode(executable).decode('ascii') if executable is not None else None,
+            'return_executable': return_executable,
+            'execute': execution_command.split(' '),
+            'tests': [ b64encode(test).decode('ascii') for test in tests ],
+            'timeout': timeout,
+            'parallel': parallel,
+            'max_output': max_output,
+        }
+        output = JobOutput()
+        # a stuck agent must not hold the worker - nor the container, whose lease expires meanwhile
+        deadline = time.monotonic() + COMPILATION_SECONDS + math.ceil(len(tests) / max(1, parallel)) * (timeout + DRAIN_SECONDS) + MARGIN_SECONDS
+        with socket.create_connection((self.__address(container), AGENT_PORT), timeout=deadline - time.monotonic()) as connection, connection.makefile('rwb') as stream:
+            stream.write(json.dumps(job).encode('utf-8') + b'\n')
+            stream.flush()
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f'Sandbox {container} didn\'t finish the job in time.')
+                connection.settimeout(remaining)
+                line = stream.readline()
+                if not line:
+                    break
+                message: dict[str, Any] = json.loads(line)
+                if 'compilation' in message:
+                    output.compilation_stdout = message['compilation']['stdout']
+                    output.compilation_stderr = message['compilation']['stderr']
+                    if message['compilation'].get('executable') is not None:
+                        output.executable = b64decode(message['compilation']['executable'])
+                elif 'index' in message:
+                    output.executions.append(ExecutionOutput(message))
+                elif 'error' in message:
+                    raise RuntimeError(message['error'])
+                elif message.get('done') is True:
+                    return output
+        self.__addresses.pop(container, None) # the container may have been recreated with a new address
+        raise ConnectionError(f'Sandbox {container} closed the stream before finishing the job.')
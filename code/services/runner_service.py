@@ -1,11 +1,10 @@
-import difflib
-from io import TextIOWrapper
+import hashlib
 import subprocess
-import uuid
 
 from endpoints.models.all_tests_vo import AllTestsVO
 from endpoints.models.tcase_result_vo import TCaseResultVO
-from helpers.commons import file_extension, filename, lossless_decode
+from endpoints.models.tcase_vo import TCaseVO
+from helpers.commons import file_extension, lossless_decode
 from helpers.config import Config
 from helpers.exceptions import InvalidSourceCode, ExecutionError, CompilationError, ServerError, InvalidCodec
 from helpers.runner_queue_manager import RunnerQueueManager
@@ -13,12 +12,21 @@ from helpers.unwrapper import unwrap
 from repository.tcase_result_repository import TCaseResultRepository
 from repository.dto.test_case_result import TestCaseResultDTO
 from services.runner.c_runner import CRunner
+from services.runner.compilation_cache import CompilationCache, CompilationArtifact
+from services.runner.output_comparator import OutputComparator
 from services.runner.python_runner import PythonRunner
 from services.runner.runner import Runner
+from services.runner.sandbox_client import SandboxClient, JobOutput, ExecutionOutput
+
+SOURCE_NAME = 'source'
+EXECUTABLE_NAME = 'executable'
+TIMEOUT_MESSAGE = 'Timeout.'
 
 class RunnerService:
     def __init__(self) -> None:
         self.__tcase_result_repository = TCaseResultRepository()
+        self.__sandbox_client = SandboxClient()
+        self.__compilation_cache = CompilationCache()
         self.__runners: list[Runner] = [
             CRunner(),
             PythonRunner(),
@@ -48,103 +56,113 @@ class RunnerService:
         except StopIteration:
             return None
 
-    def __execution_command(self, command: str, container: str, interactive: bool = False) -> list[str]:
-        return ['docker', 'exec'] + (['-i'] if interactive else []) + [container] + command.split(' ')
-
-    def __add_to_sandbox(self, source_path: str, destination_directory: str, container: str) -> str:
-        _filename = filename(source_path)
-        dest = f'{destination_directory}/{_filename}'
-        subprocess.run(self.__execution_command(f'mkdir {destination_directory}', container), check=True)
-        subprocess.run(['docker', 'cp', source_path, f'{container}:sandbox/{dest}'], check=True)
-        return dest
-
-    def __compile(self, command: str, container: str) -> None:
-        with subprocess.Popen(self.__execution_command(command, container), stdout=subprocess.PIPE,  stderr=subprocess.PIPE, text=True) as process:
-            stdout, stderr = process.communicate()
-            if stdout.strip():
-                raise CompilationError(stdout)
-            if stderr.strip():
-                raise CompilationError(stderr)
+    def source_key(self, path: str) -> str | None:
+        try:
+            runner = next(_runner for _runner in self.__runners if _runner.is_source_code(path))
+        except StopIteration:
+            return None
+        with open(path, 'rb') as source:
+            blob = source.read()
+        return CompilationCache.key(blob, runner.language_name, runner.compilation_command(SOURCE_NAME + file_extension(path), EXECUTABLE_NAME))
 
-    def __remove_source_path(self, source_path: str, container: str) -> None:
-        subprocess.run(self.__execution_command(f'rm {source_path}', container), check=True)
+    def __assert_executed(self, execution: ExecutionOutput) -> None:
+        if execution.timed_out:
+            raise subprocess.TimeoutExpired(EXECUTABLE_NAME, float(Config.get('runners.timeout')))
+        stderr = lossless_decode(execution.stderr)
+        if stderr.strip():
+            raise ExecutionError(stderr)
 
-    def __execute(self, command: str, stdin: TextIOWrapper, timeout: float, container: str) -> str:
-        with subprocess.Popen(self.__execution_command(command, container, interactive=True), stdin=stdin, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=False) as process:
-            b_stdout, b_stderr = process.communicate(timeout=timeout)
-            stderr = lossless_decode(b_stderr)
-            if stderr.strip():
-                raise ExecutionError(stderr)
-            return lossless_decode(b_stdout)
+    def __is_identical(self, execution: ExecutionOutput, test: TCaseVO) -> bool:
+        # most passing submissions print exactly the expected bytes - no need to read the expected file
+        if execution.output_exceeded or test.output_size is None or len(execution.stdout) != test.output_size:
+            return False
+        return hashlib.sha256(execution.stdout).hexdigest() == test.output_sha256
 
-    def __remove_directory(self, path: str, container: str) -> None:
-        subprocess.run(self.__execution_command(f'rm -rf {path}', container), check=True)
+    def __run_in_sandbox(self, runner: Runner, path: str, tests: list[TCaseVO]) -> JobOutput:
+        source_name = SOURCE_NAME + file_extension(path)
+        with open(path, 'rb') as source:
+            blob = source.read()
+        compilation_command = runner.compilation_command(source_name, EXECUTABLE_NAME)
+        key = CompilationCache.key(blob, runner.language_name, compilation_command)
+        artifact = self.__compilation_cache.get(key) if runner.is_compiled else None
+        if artifact is not None and artifact.error is not None:
+            raise CompilationError(artifact.error) # no need to lease a container
+        inputs: list[bytes] = []
+        for test in tests:
+            with open(unwrap(test.input_path), 'rb') as stdin:
+                inputs.append(stdin.read())
+        with RunnerQueueManager.leased_container(runner) as container:
+            output = self.__sandbox_client.run_job(container, blob, source_name, compilation_command, runner.execution_command(EXECUTABLE_NAME), inputs, float(Config.get('runners.timeout')), int(Config.get('runners.parallel-tests')), int(float(Config.get('runners.max-output-kb')) * 1024),
+                                                   EXECUTABLE_NAME, executable=artifact.executable if artifact is not None else None, return_executable=runner.is_compiled and artifact is None)
+        error: str | None = None
+        if output.compilation_stdout.strip():
+            error = output.compilation_stdout
+        elif output.compilation_stderr.strip():
+            error = output.compilation_stderr
+        if runner.is_compiled and artifact is None:
+            self.__compilation_cache.put(key, CompilationArtifact(output.executable if error is None else None, error))
+        if error is not None:
+            raise CompilationError(error)
+        return output
 
     # pylint: disable=too-many-branches,too-many-statements
-    def run(self, path: str, tests: AllTestsVO, result_id: int, should_save: bool) -> list[TCaseResultVO]:
+    def run(self, path: str, tests: AllTestsVO) -> list[TCaseResultVO]:
         results: list[TCaseResultVO] = []
+        all_tests = tests.open_tests + tests.closed_tests
         try:
             runner = next(_runner for _runner in self.__runners if _runner.is_source_code(path))
-            if not RunnerQueueManager.check_container_available(runner):
-                RunnerQueueManager.continue_when_available(runner)
-                self.run(path, tests, result_id, should_save)
-            RunnerQueueManager.set_using_container(runner)
-            dest = str(uuid.uuid1()) # temp folder
-            source_path = self.__add_to_sandbox(path, dest, runner.container_name)
-            executable_path = f'{dest}/{str(uuid.uuid1())}'
-            self.__compile(runner.compilation_command(source_path, executable_path), runner.container_name)
-            self.__remove_source_path(source_path, runner.container_name)
-            timeout = float(Config.get('runners.timeout'))
-            for test in tests.open_tests + tests.closed_tests:
+            output = self.__run_in_sandbox(runner, path, all_tests)
+            comparator = OutputComparator(float(Config.get('runners.max-output-kb')))
+            for test, execution in zip(all_tests, output.executions):
                 dto = TestCaseResultDTO()
                 dto.test_case_id = test.id
-                dto.result_id = result_id
                 try:
-                    with open(unwrap(test.input_path), encoding='utf-8') as stdin, open(unwrap(test.output_path), encoding='utf-8') as expected_result:
-                        output = self.__execute(runner.execution_command(executable_path), stdin, timeout, runner.container_name)
-                        diff = '\n'.join(line for line in difflib.unified_diff(expected_result.readlines(), output.splitlines(keepends=True), fromfile='expected.out', tofile='result.out', lineterm=''))
-                        if len(diff) == 0:
-                            dto.success = True
-                        else:
-                            dto.success = False
-                            dto.diff = diff
+                    self.__assert_executed(execution)
+                    if self.__is_identical(execution, test):
+                        dto.success = True
+                    else:
+                        with open(unwrap(test.output_path), encoding='utf-8') as expected_result:
+                            diff = comparator.compare(expected_result, lossless_decode(execution.stdout), execution.output_exceeded, test.comparison_mode, test.tolerance)
+                        dto.success = diff is None
+                        dto.diff = diff
                 except ExecutionError as e:
                     dto.success = False
                     dto.diff = str(e)
                 except subprocess.TimeoutExpired:
                     dto.success = False
-                    dto.diff = 'Timeout.'
+                    dto.diff = TIMEOUT_MESSAGE
                 except InvalidCodec as e:
                     dto.success = False
                     dto.diff = str(e)
                 finally:
-                    stored = self.__tcase_result_repository.add(dto) if should_save else dto
-                    results.append(TCaseResultVO.import_from_dto(stored))
-            self.__remove_directory(dest, runner.container_name)
-            RunnerQueueManager.release_container(runner)
+                    results.append(TCaseResultVO.import_from_dto(dto))
             return results
         except StopIteration:
             # no runner found
             # pylint: disable=raise-missing-from
             raise InvalidSourceCode(file_extension(path))
         except CompilationError as e:
-            for test in tests.open_tests + tests.closed_tests:
+            for test in all_tests:
                 dto = TestCaseResultDTO()
                 dto.test_case_id = test.id
-                dto.result_id = result_id
                 dto.success = False
                 dto.diff = str(e)
-                stored = self.__tcase_result_repository.add(dto) if should_save else dto
-                results.append(TCaseResultVO.import_from_dto(stored))
-            if runner:
-                self.__remove_directory(dest, runner.container_name)
-                RunnerQueueManager.release_container(runner)
+                results.append(TCaseResultVO.import_from_dto(dto))
             return results
         except Exception as e:
-            if runner:
-                RunnerQueueManager.release_container(runner)
             raise ServerError from e
 
+    def save_test_results(self, results: list[TCaseResultVO], result_id: int) -> None:
+        dtos: list[TestCaseResultDTO] = []
+        for result in results:
+            dto = TestCaseResultDTO()
+            dto.test_case_id = result.test_case_id
+            dto.result_id = result_id
+            dto.success = result.success
+            dto.diff = result.diff
+            dtos.append(dto)
+        self.__tcase_result_repository.add_all(dtos)
+
     def get_test_results(self, result_id: int) -> list[TCaseResultVO]:
         dtos = self.__tcase_result_repository.get_test_results(result_id)
         return list(map(lambda dto: TCaseResultVO.import_from_dto(dto), dtos))
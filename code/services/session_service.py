@@ -1,8 +1,10 @@
 from __future__ import annotations
-from typing import Optional
+from typing import Any, Optional
 
 from endpoints.models.user import UserVO
+from helpers.exceptions import NotFound
 from helpers.role import Role
+from helpers.session_cache import SessionCache
 from services.jwt_service import JWTService
 from services.user_service import UserService
 
@@ -17,26 +19,51 @@ class SessionService:
         match role:
             case Role.MANAGER:
                 vo = self.__user_service.create_manager(name=name, email=email, password=password)
-                vo.token = self.__jwt_service.create_token(vo.id, JWTService.Intent.SESSION)
+                vo.token = self.__create_session_token(vo)
                 return vo
             case Role.STUDENT:
                 vo = self.__user_service.create_student(name=name, email=email, password=password)
-                vo.token = self.__jwt_service.create_token(vo.id, JWTService.Intent.SESSION)
+                vo.token = self.__create_session_token(vo)
                 return vo
 
     def login(self, email: str, password: str) -> UserVO:
         user_id = self.__user_service.login(email, password)
         vo = self.__user_service.get_user_with_role(user_id, None)
-        token = self.__jwt_service.create_token(user_id, JWTService.Intent.SESSION)
-        vo.token = token
+        vo.token = self.__create_session_token(vo)
         return vo
 
+    def __create_session_token(self, user: UserVO) -> str:
+        # the user is signed in the token, so validating it doesn't hit the database
+        version = SessionCache.issue_token_version(user.id)
+        claims = { 'role': user.role, 'name': user.name, 'email': user.email, 'version': version } if version is not None else {}
+        return self.__jwt_service.create_token(user.id, JWTService.Intent.SESSION, claims)
+
+    def __user_from_claims(self, claims: dict[str, Any]) -> UserVO | None:
+        # tokens without claims (e.g. issued before they existed), or issued before the user was updated, go through the database
+        if 'version' not in claims or claims['version'] != SessionCache.get_token_version(int(claims['user_id'])):
+            return None
+        user = UserVO()
+        user.id = int(claims['user_id'])
+        user.email = claims['email']
+        user.name = claims['name']
+        user.role = Role(claims['role'])
+        return user
+
     def validate_session_token(self, token: str, role: Role | None) -> UserVO:
-        user_id = self.__jwt_service.decode_token(token, JWTService.Intent.SESSION)
-        return self.__user_service.get_user_with_role(user_id, role)
+        claims = self.__jwt_service.decode_claims(token, JWTService.Intent.SESSION)
+        user = self.__user_from_claims(claims)
+        if user is None:
+            user = self.get_user(int(claims['user_id']))
+        if role is not None and user.role != role:
+            raise NotFound()
+        return user
 
     def get_user(self, id: int) -> UserVO:
-        return self.__user_service.get_user_with_role(id, None)
+        user = SessionCache.get_user(id)
+        if user is None:
+            user = self.__user_service.get_user_with_role(id, None)
+            SessionCache.set_user(user)
+        return user
 
     def update_user(self, id: int, name: Optional[str], current_password: Optional[str], new_password: Optional[str]) -> UserVO:
         return self.__user_service.update_user(id, name, current_password, new_password)
@@ -1,5 +1,4 @@
 from datetime import datetime
-import os
 from typing import Optional, Callable
 
 from endpoints.models.group import GroupVO
@@ -9,6 +8,8 @@ from helpers.commons import file_extension, secure_filename
 from helpers.config import Config
 from helpers.exceptions import Forbidden, ParameterValidationError
 from helpers.file import File
+from helpers.storage import Storage
+from helpers.pagination import Cursor
 from helpers.unwrapper import unwrap
 from repository.dto.task import TaskDTO
 from repository.task_repository import TaskRepository
@@ -56,7 +57,12 @@ class TaskService:
         dto.ends_on = ends_on
         dto.group_id = group.id
         dto.file_path = full_path
-        stored = self.__task_repository.add(dto)
+        try:
+            stored = self.__task_repository.add(dto)
+        except Exception as e:
+            # rollback - the saved file's reference is committed already
+            unwrap(Storage.shared).release(full_path)
+            raise e
         return TaskVO.import_from_dto(stored)
 
     def get_task_name_path(self, task_id: int, user_groups: list[GroupVO], user_id: int) -> tuple[str, str]:
@@ -76,32 +82,42 @@ class TaskService:
         group = get_group_func(dto.group_id)
         self.__assert_is_manager(user, group)
         self.__assert_is_group_active(group)
-        if file is not None:
-            new_file = file.save(max_file_size_mb=self.__max_task_size)
-            os.remove(dto.file_path)
-            dto.file_path = new_file
-        if name is not None and name != dto.name:
-            dto.name = name
-        if max_attempts is not None and max_attempts != dto.max_attempts:
-            dto.max_attempts = max_attempts
-        if languages is not None and languages != dto.languages:
-            self.__assert_languages(languages)
-            dto.languages = languages
-        if starts_on is not None and starts_on != dto.starts_on:
-            dto.starts_on = starts_on
-        if ends_on is not None and ends_on != dto.ends_on:
-            self.__assert_date('ends_on', ends_on, unwrap(dto.starts_on))
-            dto.ends_on = ends_on
-        self.__task_repository.update_session()
+        old_file_path: str | None = None
+        new_file_path: str | None = None
+        try:
+            if file is not None:
+                old_file_path = dto.file_path
+                new_file_path = file.save(max_file_size_mb=self.__max_task_size)
+                dto.file_path = new_file_path
+            if name is not None and name != dto.name:
+                dto.name = name
+            if max_attempts is not None and max_attempts != dto.max_attempts:
+                dto.max_attempts = max_attempts
+            if languages is not None and languages != dto.languages:
+                self.__assert_languages(languages)
+                dto.languages = languages
+            if starts_on is not None and starts_on != dto.starts_on:
+                dto.starts_on = starts_on
+            if ends_on is not None and ends_on != dto.ends_on:
+                self.__assert_date('ends_on', ends_on, unwrap(dto.starts_on))
+                dto.ends_on = ends_on
+            self.__task_repository.update_session()
+        except Exception as e:
+            # rollback - the saved file's reference is committed already
+            if new_file_path is not None:
+                unwrap(Storage.shared).release(new_file_path)
+            raise e
+        if old_file_path is not None:
+            unwrap(Storage.shared).release(old_file_path) # the file may still be referenced elsewhere (same content)
         return TaskVO.import_from_dto(dto)
 
-    def get_tasks(self, user_id: int, group: GroupVO, user_groups: list[GroupVO]) -> list[TaskVO]:
+    def get_tasks(self, user_id: int, group: GroupVO, user_groups: list[GroupVO], after: Cursor | None = None, limit: int | None = None) -> tuple[list[TaskVO], Cursor | None]:
         group_id = group.id
         if any(group_id == _group.id for _group in user_groups) is False:
             raise Forbidden()
         started_only = user_id != group.manager_id # only managers can retrieve upcoming tasks
-        dtos = self.__task_repository.get_tasks(group_id, started_only)
-        return list(map(lambda dto: TaskVO.import_from_dto(dto), dtos))
+        dtos, next_cursor = self.__task_repository.get_tasks(group_id, started_only, after, limit)
+        return (list(map(lambda dto: TaskVO.import_from_dto(dto), dtos)), next_cursor)
 
     def get_task(self, task_id: int, user_id: int, user_groups: list[GroupVO], active_required: bool = False) -> TaskVO:
         dto = self.__task_repository.find(task_id)
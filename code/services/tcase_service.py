@@ -1,12 +1,19 @@
+import os
 from typing import Callable
 
 from endpoints.models.all_tests_vo import AllTestsVO
 from endpoints.models.group import GroupVO
 from endpoints.models.task_vo import TaskVO
 from endpoints.models.tcase_vo import TCaseVO
+from helpers.commons import file_sha256
+from helpers.comparison_mode import ComparisonMode
 from helpers.config import Config
-from helpers.exceptions import Forbidden
+from helpers.exceptions import Forbidden, ParameterValidationError
 from helpers.file import File
+from helpers.pagination import Cursor
+from helpers.result_memo import ResultMemo
+from helpers.storage import Storage
+from helpers.unwrapper import unwrap
 from repository.dto.test_case import TestCaseDTO
 from repository.tcase_repository import TCaseRepository
 
@@ -14,14 +21,36 @@ class TCaseService:
     def __init__(self) -> None:
         self.__tcase_repository = TCaseRepository()
 
-    def add_test_case(self, task: TaskVO, input_file: File, output_file: File, closed: bool) -> TCaseVO:
+    # pylint: disable=too-many-arguments
+    def add_test_case(self, task: TaskVO, input_file: File, output_file: File, closed: bool, comparison_mode: ComparisonMode = ComparisonMode.EXACT, tolerance: float | None = None) -> TCaseVO:
+        if comparison_mode == ComparisonMode.NUMERIC:
+            if tolerance is None or tolerance < 0:
+                raise ParameterValidationError('tolerance', str(tolerance), 'non-negative number')
+        elif tolerance is not None:
+            raise ParameterValidationError('tolerance', str(tolerance), f'parameter for the {comparison_mode} comparison')
         dto = TestCaseDTO()
         dto.task_id = task.id
         max_test_size = float(Config.get('files.test-max-size-mb'))
-        dto.input_file_path = input_file.save(max_file_size_mb=max_test_size)
-        dto.output_file_path = output_file.save(max_file_size_mb=max_test_size)
-        dto.closed = closed
-        stored = self.__tcase_repository.add(dto)
+        saved_paths: list[str] = []
+        try:
+            dto.input_file_path = input_file.save(max_file_size_mb=max_test_size)
+            saved_paths.append(dto.input_file_path)
+            dto.output_file_path = output_file.save(max_file_size_mb=max_test_size)
+            saved_paths.append(dto.output_file_path)
+            dto.closed = closed
+            dto.comparison_mode = comparison_mode
+            dto.tolerance = tolerance
+            # the runners compare against these instead of reading the files again
+            dto.input_sha256 = input_file.sha256
+            dto.output_sha256 = output_file.sha256
+            dto.output_size = output_file.size
+            stored = self.__tcase_repository.add(dto)
+        except Exception as e:
+            # rollback - the saved files' references are committed already
+            for path in saved_paths:
+                unwrap(Storage.shared).release(path)
+            raise e
+        ResultMemo.invalidate(task.id)
         return TCaseVO.import_from_dto(stored, is_manager=True)
 
     def __is_manager(self, user_id: int, group_id: int, user_groups: list[GroupVO]) -> bool:
@@ -46,18 +75,40 @@ class TCaseService:
         return dto.output_file_path
 
     def get_tests(self, user_id: int, task: TaskVO, user_groups: list[GroupVO], running_context: bool = False) -> AllTestsVO:
-        dtos = self.__tcase_repository.get_tests(task.id)
-        vos: list[TCaseVO] = []
         if running_context is True:
-            vos = list(map(lambda dto: TCaseVO.running_context_from_dto(dto), dtos))
-        else:
-            is_manager = self.__is_manager(user_id, task.group_id, user_groups)
-            vos = list(map(lambda dto: TCaseVO.import_from_dto(dto, is_manager), dtos))
+            return self.get_running_tests(task.id)
+        return self.get_tests_page(user_id, task, user_groups)[0]
+
+    def get_tests_page(self, user_id: int, task: TaskVO, user_groups: list[GroupVO], after: Cursor | None = None, limit: int | None = None) -> tuple[AllTestsVO, Cursor | None]:
+        # the page is taken over open and closed tests together, then split
+        dtos, next_cursor = self.__tcase_repository.get_tests(task.id, after, limit)
+        is_manager = self.__is_manager(user_id, task.group_id, user_groups)
+        return (self.__split_tests(list(map(lambda dto: TCaseVO.import_from_dto(dto, is_manager), dtos))), next_cursor)
+
+    def get_running_tests(self, task_id: int) -> AllTestsVO:
+        dtos = self.__tcase_repository.get_tests_to_update(task_id)
+        missing_hashes = [ dto for dto in dtos if dto.input_sha256 is None or dto.output_sha256 is None or dto.output_size is None ]
+        if len(missing_hashes) > 0:
+            # tests added before the hashes were stored
+            for dto in missing_hashes:
+                dto.input_sha256 = file_sha256(dto.input_file_path)
+                dto.output_sha256 = file_sha256(dto.output_file_path)
+                dto.output_size = os.path.getsize(dto.output_file_path)
+            self.__tcase_repository.update_session()
+        return self.__split_tests(list(map(lambda dto: TCaseVO.running_context_from_dto(dto), dtos)))
+
+    def __split_tests(self, vos: list[TCaseVO]) -> AllTestsVO:
         open_tests = list(filter(lambda test: test.closed is False, vos))
         closed_tests = list(filter(lambda test: test.closed is True, vos))
         return AllTestsVO(open_tests, closed_tests)
 
     def delete_test(self, id: int, user_id: int, get_task_func: Callable[[int, int, list[GroupVO]], TaskVO], user_groups: list[GroupVO]) -> None:
         dto = self.__tcase_repository.find(id)
-        get_task_func(dto.task_id, user_id, user_groups) # if has access to the task, is the manager - this is a manager only function
+        task_id = dto.task_id
+        get_task_func(task_id, user_id, user_groups) # if has access to the task, is the manager - this is a manager only function
+        input_file_path = dto.input_file_path
+        output_file_path = dto.output_file_path
         self.__tcase_repository.delete(id)
+        unwrap(Storage.shared).release(input_file_path)
+        unwrap(Storage.shared).release(output_file_path)
+        ResultMemo.invalidate(task_id)
@@ -2,8 +2,9 @@ from typing import Optional
 
 from endpoints.models.user import UserVO
 from helpers.config import Config
-from helpers.exceptions import Forbidden, NotFound, ServerError, WrongCurrentPassword
+from helpers.exceptions import Forbidden, NotFound, ServerError, ServiceUnavailable, WrongCurrentPassword
 from helpers.role import Role
+from helpers.session_cache import SessionCache
 from repository.user_repository import UserRepository
 from repository.dto.user_dto import UserDTO
 
@@ -34,10 +35,14 @@ class UserService:
             dto = self.__user_repository.find_email(email)
             if not dto.authenticate(password):
                 raise Forbidden()
+            if dto.needs_rehash():
+                # admin.bcrypt-rounds changed - the password is only known now
+                dto.password = password
+                self.__user_repository.update_session()
             return dto.id
         except NotFound as e:
             raise Forbidden() from e
-        except Forbidden as e:
+        except (Forbidden, ServiceUnavailable) as e:
             raise e
         except Exception as e:
             raise ServerError() from e
@@ -55,4 +60,8 @@ class UserService:
                 raise WrongCurrentPassword()
             dto.password = new_password
         self.__user_repository.update_session()
+        SessionCache.invalidate_user(id)
+        SessionCache.invalidate_token_version(id) # the claims of the user's tokens are stale
+        if name and dto.role == Role.MANAGER:
+            SessionCache.invalidate_all_groups() # the manager's name is listed in their groups
         return UserVO.import_from_dto(dto)
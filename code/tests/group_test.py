@@ -1,6 +1,6 @@
 import pytest
 
-from tests.helper import post, get, patch, get_random_name, get_manager_id_token, get_student_id_token, get_random_manager_token, get_new_group_id_code, create_expired_token, create_join_request_group_id
+from tests.helper import post, get, patch, get_random_name, get_manager_id_token, get_student_id_token, get_random_manager_token, get_new_group_id_code, create_expired_token, create_join_request_group_id, get_random_student_token, join_group, get_page
 
 # pylint: disable=too-many-public-methods
 class TestGroup:
@@ -176,6 +176,25 @@ class TestGroup:
         assert group['name'] == new_name
         assert group['code'] == code
 
+    def test_student_groups_should_reflect_approval_and_updates(self) -> None:
+        manager_token = get_random_manager_token()
+        student_token = get_random_student_token(None)
+        group_id, code = get_new_group_id_code(get_random_name(), manager_token)
+        get('/api/v1/groups?member_of=true', student_token) # cached before joining
+        join_group(code, group_id, student_token, manager_token)
+
+        response = get('/api/v1/groups?member_of=true', student_token)
+        assert response[0] == 200
+        assert [ group['id'] for group in response[1]['groups'] ] == [group_id]
+
+        patch(f'/api/v1/groups/{group_id}', { 'name': 'Renamed' }, manager_token)
+        patch('/api/v1/user', { 'name': 'Renamed Manager' }, manager_token)
+
+        response = get('/api/v1/groups?member_of=true', student_token)
+        assert response[0] == 200
+        assert response[1]['groups'][0]['name'] == 'Renamed'
+        assert response[1]['groups'][0]['manager']['name'] == 'Renamed Manager'
+
     @pytest.mark.smoke
     def test_update_group_name_active_should_update(self) -> None:
         manager_id_token = get_manager_id_token()
@@ -346,6 +365,23 @@ class TestGroup:
         requests = response[1]['requests']
         assert len(requests) == 0
 
+    def test_manager_get_requests_list_with_limit_should_page_through_all_requests(self) -> None:
+        manager_token = get_manager_id_token()[1]
+        group_id, code = get_new_group_id_code(get_random_name(), manager_token)
+        initials = ['A', 'B', 'C']
+        for initial in initials:
+            post('/api/v1/groups/join', {'code': code}, get_random_student_token(initial))
+
+        first_page = get_page(f'/api/v1/groups/{group_id}/requests?limit=2', manager_token)
+        second_page = get_page(f'/api/v1/groups/{group_id}/requests?limit=2&after={first_page[2]}', manager_token)
+
+        assert first_page[0] == 200
+        assert [ request['student'][0] for request in first_page[1]['requests'] ] == initials[:2]
+        assert first_page[2] is not None
+        assert second_page[0] == 200
+        assert [ request['student'][0] for request in second_page[1]['requests'] ] == initials[2:]
+        assert second_page[2] is None
+
     def test_student_get_requests_list_should_return_unauthorized(self) -> None:
         manager_token = get_manager_id_token()[1]
         student_id_token = get_student_id_token()
@@ -1,4 +1,5 @@
 import datetime
+import hashlib
 from io import BytesIO
 import os
 import time
@@ -36,6 +37,16 @@ def get(path: str, token: str | None = None, custom_headers: dict[str, str] | No
         data = json.loads(data)
     return (response.status_code, data)
 
+def get_headers(path: str, token: str | None = None, custom_headers: dict[str, str] | None = None) -> tuple[int, dict[str, str]]:
+    headers = __headers(token) or {}
+    headers.update(custom_headers or {})
+    response = __app.get(path, headers=headers)
+    return (response.status_code, dict(response.headers))
+
+def get_page(path: str, token: str | None = None) -> tuple[int, Any, str | None]:
+    response = __app.get(path, headers=__headers(token))
+    return (response.status_code, json.loads(response.data.decode('utf-8')), response.headers.get('X-Next-Cursor'))
+
 def post(path: str, payload: dict[str, Any], token: str | None = None, content_type: str = CONTENT_TYPE_JSON) -> HTTPResponse:
     data: Any | None = None
     if content_type == CONTENT_TYPE_JSON:
@@ -201,7 +212,7 @@ def create_task_json(manager_token: str, group_id: str | None = None, starts_on:
 
     return post(f'/api/v1/groups/{group_id}/tasks', payload, manager_token, CONTENT_TYPE_FORM_DATA)[1]
 
-def create_test_case_json(manager_token: str, task_id: int | None = None, group_id: str | None = None, closed: bool = False, content_in: str = 'Input.', content_out: str = 'Output.') -> Dict[str, Any]:
+def create_test_case_json(manager_token: str, task_id: int | None = None, group_id: str | None = None, closed: bool = False, content_in: str = 'Input.', content_out: str = 'Output.', comparison_mode: str | None = None, tolerance: float | None = None) -> Dict[str, Any]:
     if task_id is None:
         task_id = create_task_json(manager_token, group_id)['id']
     else:
@@ -211,6 +222,10 @@ def create_test_case_json(manager_token: str, task_id: int | None = None, group_
         'output': (BytesIO(content_out.encode('UTF-8')), 'output.out'),
         'closed': closed
     }
+    if comparison_mode is not None:
+        payload['comparison_mode'] = comparison_mode
+    if tolerance is not None:
+        payload['tolerance'] = tolerance
     return post(f'/api/v1/tasks/{task_id}/tests', payload, manager_token, CONTENT_TYPE_FORM_DATA)[1]
 
 def set_up_task_id_student_token(starts_on: str | None = None, ends_on: str | None = None, max_attempts: int | None = None) -> tuple[str, str]:
@@ -244,5 +259,21 @@ def get_filepath_of_size(size: int, extension: str = '.txt') -> str:
         file.write(b'\0')
     return full_path
 
+def get_stored_filepath(content: str, extension: str) -> str:
+    # where the content-addressed storage keeps the content
+    name = hashlib.sha256(content.encode('utf-8')).hexdigest() + extension
+    return os.path.join(__app.application.config['STORAGE_PATH'], 'blobs', name[0:2], name[2:4], name)
+
 def get_script_path(filename: str) -> str:
     return os.path.join(__app.application.config['SCRIPTS_PATH'], filename)
+
+def post_result_and_wait(task_id: str, payload: dict[str, Any], token: str, timeout: float = 30) -> HTTPResponse:
+    response = post(f'/api/v1/tasks/{task_id}/results', payload, token, CONTENT_TYPE_FORM_DATA)
+    if response[0] != 202:
+        return response
+    deadline = time.monotonic() + timeout
+    while True:
+        result = get(f'/api/v1/results/{response[1]["id"]}', token)
+        if result[0] != 200 or result[1]['status'] in ('done', 'failed') or time.monotonic() > deadline:
+            return result
+        time.sleep(0.1)
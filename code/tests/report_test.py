@@ -4,7 +4,7 @@ import os
 
 import pytest
 
-from tests.helper import get_manager_id_token, get_student_id_token, get_random_student_token, get_new_group_id_code, join_group, create_task_json, create_test_case_json, post, CONTENT_TYPE_FORM_DATA, get, get_random_manager_token, set_up_task_id_student_token, patch
+from tests.helper import get_manager_id_token, get_student_id_token, get_random_student_token, get_new_group_id_code, join_group, create_task_json, create_test_case_json, post_result_and_wait, CONTENT_TYPE_FORM_DATA, get, get_random_manager_token, set_up_task_id_student_token, patch
 
 class TestReport:
     def __set_up_valid_3_open_3_closed_tests_manager_three_students_tests_task(self, starts_on: str | None = None, ends_on: str | None = None) -> tuple[str, str, str, str, list[str], str]:
@@ -58,7 +58,7 @@ int main() {{
         payload = {
             'code': (BytesIO(code.encode('utf-8')), 'code.c')
         }
-        return str(post(f'/api/v1/tasks/{task_id}/results', payload, student_token, CONTENT_TYPE_FORM_DATA)[1]['id'])
+        return str(post_result_and_wait(task_id, payload, student_token)[1]['id'])
 
     def test_get_report_download_code_all_success_first_attempt(self) -> None:
         manager_token, student_token_one, student_token_two, student_token_three, _, task_id = self.__set_up_valid_3_open_3_closed_tests_manager_three_students_tests_task()
@@ -135,6 +135,22 @@ int main() {{
         assert len(tests) == 6
         assert all(test['correct_percentage'] == 0 for test in tests)
 
+    def test_get_report_after_adding_test_should_use_current_tests(self) -> None:
+        manager_token, student_token_one, *_, task_id = self.__set_up_valid_3_open_3_closed_tests_manager_three_students_tests_task()
+        code = self.__get_code_failing_tests([])
+        self.__post_result_id(task_id, code, student_token_one)
+        self.__post_result_id(task_id, code, student_token_one)
+        create_test_case_json(manager_token, int(task_id), closed=False, content_in='7', content_out='8')
+
+        response = get(f'/api/v1/tasks/{task_id}/results', manager_token)
+
+        assert response[0] == 200
+        student = next(student for student in response[1]['students'] if student['number_attempts'] > 0)
+        assert student['number_attempts'] == 2
+        assert student['open_result_percentage'] == 75
+        assert student['closed_result_percentage'] == 100
+        assert student['wrong_tests_id'] == [] # the new test didn't run
+
     # pylint: disable=too-many-statements
     @pytest.mark.smoke
     def test_get_report_download_code_with_mixed_results(self) -> None:
@@ -4,7 +4,8 @@ from unittest import mock
 
 import pytest
 
-from tests.helper import post, get_manager_id_token, create_task_json, create_test_case_json, get_student_id_token, create_join_request_group_id, CONTENT_TYPE_FORM_DATA, get_filepath_of_size, get_random_name, get, patch, set_up_task_id_student_token
+from helpers.exceptions import ServerError
+from tests.helper import post, get_manager_id_token, create_task_json, create_test_case_json, get_student_id_token, create_join_request_group_id, CONTENT_TYPE_FORM_DATA, get_filepath_of_size, get_random_name, get, patch, set_up_task_id_student_token, post_result_and_wait
 
 VALID_C_CODE = '''
 #include<stdio.h>
@@ -72,6 +73,16 @@ int main() {
 }
 '''
 
+INFINITE_OUTPUT_C_CODE = '''
+#include<stdio.h>
+int main() {
+    while(1) {
+        printf("3");
+    }
+    return 0;
+}
+'''
+
 C_CODE_NON_UTF_CHAR = '''
 #include<stdio.h>
 int main() {
@@ -99,7 +110,7 @@ class TestResult:
         payload = {
             'code': (BytesIO(code.encode('utf-8')), 'code.c')
         }
-        source_url = post(f'/api/v1/tasks/{task_id}/results', payload, student_token, CONTENT_TYPE_FORM_DATA)[1]['source_url']
+        source_url = post_result_and_wait(task_id, payload, student_token)[1]['source_url']
         return (source_url, student_token)
 
     def test_post_result_without_code_should_fail(self) -> None:
@@ -107,7 +118,7 @@ class TestResult:
         payload = {
             'file': (BytesIO(b'Random file.'), 'code.c')
         }
-        response = post(f'/api/v1/tasks/{task_id}/results', payload, student_token, CONTENT_TYPE_FORM_DATA)
+        response = post_result_and_wait(task_id, payload, student_token)
 
         assert response[0] == 400
 
@@ -116,7 +127,7 @@ class TestResult:
         payload = {
             'code': (BytesIO(VALID_C_CODE.encode('utf-8')))
         }
-        response = post(f'/api/v1/tasks/{task_id}/results', payload, student_token, CONTENT_TYPE_FORM_DATA)
+        response = post_result_and_wait(task_id, payload, student_token)
 
         assert response[0] == 400
 
@@ -125,7 +136,7 @@ class TestResult:
         payload = {
             'code': (BytesIO(VALID_C_CODE.encode('utf-8')), '')
         }
-        response = post(f'/api/v1/tasks/{task_id}/results', payload, student_token, CONTENT_TYPE_FORM_DATA)
+        response = post_result_and_wait(task_id, payload, student_token)
 
         assert response[0] == 422
 
@@ -134,7 +145,7 @@ class TestResult:
         payload = {
             'code': (BytesIO(VALID_C_CODE.encode('utf-8')), 'code.png')
         }
-        response = post(f'/api/v1/tasks/{task_id}/results', payload, student_token, CONTENT_TYPE_FORM_DATA)
+        response = post_result_and_wait(task_id, payload, student_token)
 
         assert response[0] == 422
 
@@ -146,7 +157,7 @@ class TestResult:
             payload = {
             'code': (file, 'code.c')
             }
-            response = post(f'/api/v1/tasks/{task_id}/results', payload, student_token, CONTENT_TYPE_FORM_DATA)
+            response = post_result_and_wait(task_id, payload, student_token)
 
             assert response[0] == 413
 
@@ -164,7 +175,7 @@ class TestResult:
         payload = {
             'code': (BytesIO(VALID_C_CODE.encode('utf-8')), 'code.c')
         }
-        response = post(f'/api/v1/tasks/{task_id}/results', payload, student_token, CONTENT_TYPE_FORM_DATA)
+        response = post_result_and_wait(task_id, payload, student_token)
 
         assert response[0] == 403
 
@@ -173,7 +184,7 @@ class TestResult:
         payload = {
             'code': (BytesIO(VALID_C_CODE.encode('utf-8')), 'code.c')
         }
-        response = post(f'/api/v1/tasks/{task_id}/results', payload, student_token, CONTENT_TYPE_FORM_DATA)
+        response = post_result_and_wait(task_id, payload, student_token)
 
         assert response[0] == 403
 
@@ -182,7 +193,7 @@ class TestResult:
         payload = {
             'code': (BytesIO(VALID_C_CODE.encode('utf-8')), 'code.c')
         }
-        response = post(f'/api/v1/tasks/{task_id}/results', payload, student_token, CONTENT_TYPE_FORM_DATA)
+        response = post_result_and_wait(task_id, payload, student_token)
 
         assert response[0] == 403
 
@@ -194,10 +205,10 @@ class TestResult:
         payload_second = {
             'code': (BytesIO(VALID_C_CODE.encode('utf-8')), 'code.c')
         }
-        response_first = post(f'/api/v1/tasks/{task_id}/results', payload, student_token, CONTENT_TYPE_FORM_DATA)
-        response_second = post(f'/api/v1/tasks/{task_id}/results', payload_second, student_token, CONTENT_TYPE_FORM_DATA)
+        response_first = post_result_and_wait(task_id, payload, student_token)
+        response_second = post_result_and_wait(task_id, payload_second, student_token)
 
-        assert response_first[0] == 201
+        assert response_first[0] == 200
         assert response_first[1]['attempt_number'] == 1
         assert response_second[0] == 403
 
@@ -210,7 +221,7 @@ class TestResult:
         payload = {
             'code': (BytesIO(VALID_C_CODE.encode('utf-8')), 'code.c')
         }
-        response = post(f'/api/v1/tasks/{task_id}/results', payload, student_token, CONTENT_TYPE_FORM_DATA)
+        response = post_result_and_wait(task_id, payload, student_token)
 
         assert response[0] == 403
 
@@ -223,7 +234,7 @@ class TestResult:
         payload = {
             'code': (BytesIO(VALID_C_CODE.encode('utf-8')), 'code.c')
         }
-        response = post(f'/api/v1/tasks/{task_id}/results', payload, student_token, CONTENT_TYPE_FORM_DATA)
+        response = post_result_and_wait(task_id, payload, student_token)
 
         assert response[0] == 403
 
@@ -267,9 +278,9 @@ class TestResult:
         payload = {
             'code': (BytesIO(INVALID_C_CODE.encode('utf-8')), 'code.c')
         }
-        response = post(f'/api/v1/tasks/{task_id}/results', payload, student_token, CONTENT_TYPE_FORM_DATA)
+        response = post_result_and_wait(task_id, payload, student_token)
 
-        assert response[0] == 201
+        assert response[0] == 200
         result = response[1]
         assert result['attempt_number'] == 1
         assert result['open_result_percentage'] == 0
@@ -290,9 +301,9 @@ class TestResult:
         payload = {
             'code': (BytesIO(code.encode('utf-8')), filename)
         }
-        response = post(f'/api/v1/tasks/{task_id}/results', payload, student_token, CONTENT_TYPE_FORM_DATA)
+        response = post_result_and_wait(task_id, payload, student_token)
 
-        assert response[0] == 201
+        assert response[0] == 200
         result = response[1]
         assert result['attempt_number'] == 1
         assert result['open_result_percentage'] == 100
@@ -325,9 +336,9 @@ class TestResult:
         payload = {
             'code': (BytesIO(VALID_PYTHON_CODE.encode('utf-8')), 'code.py')
         }
-        response = post(f'/api/v1/tasks/{task_id}/results', payload, student_token, CONTENT_TYPE_FORM_DATA)
+        response = post_result_and_wait(task_id, payload, student_token)
 
-        assert response[0] == 201
+        assert response[0] == 200
         result = response[1]
         assert result['attempt_number'] == 1
         assert result['open_result_percentage'] == 0
@@ -348,9 +359,9 @@ class TestResult:
         payload = {
             'code': (BytesIO(TIMEOUT_C_CODE.encode('utf-8')), 'code.c')
         }
-        response = post(f'/api/v1/tasks/{task_id}/results', payload, student_token, CONTENT_TYPE_FORM_DATA)
+        response = post_result_and_wait(task_id, payload, student_token)
 
-        assert response[0] == 201
+        assert response[0] == 200
         result = response[1]
         assert result['attempt_number'] == 1
         assert result['result_percentage'] == 0
@@ -370,9 +381,9 @@ class TestResult:
         payload = {
             'code': (BytesIO(RUNTIME_ERROR_C_CODE.encode('utf-8')), 'code.c')
         }
-        response = post(f'/api/v1/tasks/{task_id}/results', payload, student_token, CONTENT_TYPE_FORM_DATA)
+        response = post_result_and_wait(task_id, payload, student_token)
 
-        assert response[0] == 201
+        assert response[0] == 200
         result = response[1]
         assert result['attempt_number'] == 1
         assert result['result_percentage'] == 0
@@ -395,9 +406,9 @@ class TestResult:
 
         with mock.patch('helpers.commons.CODEC_LIST') as mock_valid_codecs:
             mock_valid_codecs.side_effect = { 'utf-8' }
-            response = post(f'/api/v1/tasks/{task_id}/results', payload, student_token, CONTENT_TYPE_FORM_DATA)
+            response = post_result_and_wait(task_id, payload, student_token)
 
-        assert response[0] == 201
+        assert response[0] == 200
         result = response[1]
         assert result['attempt_number'] == 1
         assert result['result_percentage'] == 0
@@ -418,9 +429,9 @@ class TestResult:
             'code': (BytesIO(C_CODE_NON_UTF_CHAR.encode('cp860')), 'code.c')
         }
 
-        response = post(f'/api/v1/tasks/{task_id}/results', payload, student_token, CONTENT_TYPE_FORM_DATA)
+        response = post_result_and_wait(task_id, payload, student_token)
 
-        assert response[0] == 201
+        assert response[0] == 200
         result = response[1]
         assert result['attempt_number'] == 1
         assert result['result_percentage'] == 0
@@ -449,11 +460,11 @@ class TestResult:
         payload_first = {
             'code': (BytesIO(VALID_C_CODE.encode('utf-8')), 'code.c')
         }
-        source_url = post(f'/api/v1/tasks/{task_id}/results', payload_first, student_token, CONTENT_TYPE_FORM_DATA)[1]['source_url']
+        source_url = post_result_and_wait(task_id, payload_first, student_token)[1]['source_url']
         payload_second = {
             'code': (BytesIO(INVALID_C_CODE.encode('utf-8')), 'code.c')
         }
-        post(f'/api/v1/tasks/{task_id}/results', payload_second, student_token, CONTENT_TYPE_FORM_DATA)
+        post_result_and_wait(task_id, payload_second, student_token)
 
         response = get(source_url, student_token, decode_as_json=False)
 
@@ -504,8 +515,8 @@ class TestResult:
         payload_first = {
             'code': (BytesIO(VALID_C_CODE.encode('utf-8')), 'code.c')
         }
-        response_first = post(f'/api/v1/tasks/{task_id}/results', payload_first, student_token, CONTENT_TYPE_FORM_DATA)
-        assert response_first[0] == 201
+        response_first = post_result_and_wait(task_id, payload_first, student_token)
+        assert response_first[0] == 200
         assert response_first[1]['attempt_number'] == 1
         assert response_first[1]['open_result_percentage'] == 100
         assert response_first[1]['closed_result_percentage'] == 100
@@ -514,8 +525,8 @@ class TestResult:
         payload_second = {
             'code': (BytesIO(FAIL_TWO_TESTS_C_CODE.encode('utf-8')), 'code.c')
         }
-        response_second = post(f'/api/v1/tasks/{task_id}/results', payload_second, student_token, CONTENT_TYPE_FORM_DATA)
-        assert response_second[0] == 201
+        response_second = post_result_and_wait(task_id, payload_second, student_token)
+        assert response_second[0] == 200
         assert response_second[1]['attempt_number'] == 2
         assert response_second[1]['open_result_percentage'] == 50
         assert response_second[1]['closed_result_percentage'] == 50
@@ -566,3 +577,145 @@ class TestResult:
 
         response = get(f'api/v1/tasks/{task_id}/results/latest', student_token)
         assert response[0] == 404
+
+    def test_post_result_with_student_should_return_accepted_and_queue_the_result(self) -> None:
+        task_id, student_token = set_up_task_id_student_token()
+        payload = {
+            'code': (BytesIO(VALID_C_CODE.encode('utf-8')), 'code.c')
+        }
+        response = post(f'/api/v1/tasks/{task_id}/results', payload, student_token, CONTENT_TYPE_FORM_DATA)
+
+        assert response[0] == 202
+        assert response[1]['attempt_number'] == 1
+        assert response[1]['status'] == 'queued'
+        assert response[1].get('result_percentage') is None
+        assert len(response[1]['open_results']) == 0
+        assert len(response[1]['closed_results']) == 0
+
+    def test_get_result_with_student_should_return_the_evaluated_result(self) -> None:
+        task_id, student_token = set_up_task_id_student_token()
+        payload = {
+            'code': (BytesIO(VALID_C_CODE.encode('utf-8')), 'code.c')
+        }
+        response = post_result_and_wait(task_id, payload, student_token)
+
+        assert response[0] == 200
+        assert response[1]['attempt_number'] == 1
+        assert response[1]['status'] == 'done'
+        assert response[1]['result_percentage'] == 100
+
+    def test_get_result_with_evaluation_error_should_return_failed_and_not_count_the_attempt(self) -> None:
+        task_id, student_token = set_up_task_id_student_token()
+        payload = {
+            'code': (BytesIO(VALID_C_CODE.encode('utf-8')), 'code.c')
+        }
+        with mock.patch('services.runner_service.RunnerService.run', side_effect=ServerError()):
+            response = post_result_and_wait(task_id, payload, student_token)
+
+        assert response[0] == 200
+        assert response[1]['status'] == 'failed'
+        assert response[1]['error'] == str(ServerError())
+        assert response[1].get('result_percentage') is None
+
+        payload = {
+            'code': (BytesIO(VALID_C_CODE.encode('utf-8')), 'code.c')
+        }
+        response = post_result_and_wait(task_id, payload, student_token)
+
+        assert response[1]['status'] == 'done'
+        assert response[1]['attempt_number'] == 1
+
+    def test_get_result_with_another_student_should_return_forbidden(self) -> None:
+        task_id, student_token = set_up_task_id_student_token()
+        payload = {
+            'code': (BytesIO(VALID_C_CODE.encode('utf-8')), 'code.c')
+        }
+        result_id = post(f'/api/v1/tasks/{task_id}/results', payload, student_token, CONTENT_TYPE_FORM_DATA)[1]['id']
+        name = get_random_name()
+        student_payload = {
+            'name': name,
+            'email': name + '@mail.com',
+            'password': name + 'password'
+        }
+        another_student_token = post('/api/v1/students', student_payload)[1]['token']
+
+        response = get(f'/api/v1/results/{result_id}', another_student_token)
+
+        assert response[0] == 403
+
+    def test_get_result_with_invalid_id_should_return_not_found(self) -> None:
+        student_token = get_student_id_token()[1]
+
+        response = get(f'/api/v1/results/{999999}', student_token)
+
+        assert response[0] == 404
+
+    def test_post_same_code_twice_should_return_same_result(self) -> None:
+        task_id, student_token = self.__set_up_valid_2_open_2_closed_tests_task_id_student_token()
+        responses = []
+        for code in [FAIL_TWO_TESTS_C_CODE, FAIL_TWO_TESTS_C_CODE, INVALID_C_CODE, INVALID_C_CODE]:
+            payload = {
+                'code': (BytesIO(code.encode('utf-8')), 'code.c')
+            }
+            response = post_result_and_wait(task_id, payload, student_token)
+            assert response[0] == 200
+            responses.append(response[1])
+
+        for first, second in [(responses[0], responses[1]), (responses[2], responses[3])]:
+            assert first['result_percentage'] == second['result_percentage']
+            assert first['open_results'] == second['open_results']
+            assert first['closed_results'] == second['closed_results']
+        assert responses[0]['result_percentage'] == 50
+        assert responses[2]['result_percentage'] == 0
+
+    def test_post_same_code_after_adding_test_should_run_new_test(self) -> None:
+        manager_token = get_manager_id_token()[1]
+        task_id, student_token = self.__set_up_valid_2_open_2_closed_tests_task_id_student_token()
+        payload = {
+            'code': (BytesIO(VALID_C_CODE.encode('utf-8')), 'code.c')
+        }
+        response_first = post_result_and_wait(task_id, payload, student_token)
+        create_test_case_json(manager_token, int(task_id), closed=False, content_in='1 1', content_out='3')
+        payload_second = {
+            'code': (BytesIO(VALID_C_CODE.encode('utf-8')), 'code.c')
+        }
+        response_second = post_result_and_wait(task_id, payload_second, student_token)
+
+        assert response_first[1]['result_percentage'] == 100
+        assert len(response_second[1]['open_results']) == 3
+        assert response_second[1]['open_results'][2]['success'] is False
+        assert response_second[1]['result_percentage'] == 80
+
+    def test_post_result_with_infinite_output_should_fail_test_with_bounded_diff(self) -> None:
+        task_id, student_token = set_up_task_id_student_token()
+        payload = {
+            'code': (BytesIO(INFINITE_OUTPUT_C_CODE.encode('utf-8')), 'code.c')
+        }
+        response = post_result_and_wait(task_id, payload, student_token)
+
+        assert response[0] == 200
+        open_result = response[1]['open_results'][0]
+        assert open_result['success'] is False
+        assert open_result['diff'].startswith('--- expected.out\n+++ result.out\n')
+        assert open_result['diff'].endswith('Output limit of 1024 KB exceeded.')
+
+    @pytest.mark.parametrize('comparison_mode,tolerance,content_out,success', [
+        ('exact', None, '3\n', False),
+        ('trailing_whitespace', None, '3  \n\n', True),
+        ('tokens', None, '\n3', True),
+        ('numeric', 0.001, '3.0001', True),
+        ('numeric', 0.00001, '3.0001', False),
+    ])
+    def test_post_result_with_comparison_mode_should_compare_accordingly(self, comparison_mode: str, tolerance: float | None, content_out: str, success: bool) -> None:
+        manager_token = get_manager_id_token()[1]
+        student_token = get_student_id_token()[1]
+        group_id = create_join_request_group_id(student_token, manager_token, approve=True)
+        task_id = create_task_json(manager_token, group_id, languages=['python'])['id']
+        create_test_case_json(manager_token, task_id, content_in='1 2', content_out=content_out, comparison_mode=comparison_mode, tolerance=tolerance)
+        payload = {
+            'code': (BytesIO(VALID_PYTHON_CODE.encode('utf-8')), 'code.py')
+        }
+        response = post_result_and_wait(task_id, payload, student_token)
+
+        assert response[0] == 200
+        assert response[1]['open_results'][0]['success'] is success
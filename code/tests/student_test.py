@@ -1,5 +1,12 @@
+from threading import Event, Thread
+from typing import Any
+from unittest.mock import patch
+
+from bcrypt import hashpw
 import pytest
 
+from helpers.config import Config
+from helpers.password_hasher import PasswordHasher
 from tests.helper import post, get_random_name, assert_user_response, get_user_payload
 
 class TestStudent:
@@ -91,3 +98,59 @@ class TestStudent:
         response = post('/api/v1/students', payload)
 
         assert response[0] == 400
+
+    def test_login_with_other_bcrypt_rounds_should_rehash_the_password_once(self) -> None:
+        rounds = 4
+        config_get = Config.get
+        def get_mock(key_path: str) -> Any:
+            if key_path == 'admin.bcrypt-rounds':
+                return rounds
+            return config_get(key_path)
+        with patch.object(Config, 'get', get_mock):
+            user_payload = get_user_payload()
+            post('/api/v1/students', user_payload)
+            payload = {
+                'email': user_payload['email'],
+                'password': user_payload['password']
+            }
+
+            rounds = 5
+            with patch.object(PasswordHasher, 'hash', wraps=PasswordHasher.hash) as hash_spy:
+                rehash_response = post('/api/v1/session', payload)
+                assert hash_spy.call_count == 1
+
+                response = post('/api/v1/session', payload)
+                assert hash_spy.call_count == 1 # already upgraded
+
+            assert_user_response(rehash_response, user_payload['name'], user_payload['email'], 'student', status_code=200)
+            assert_user_response(response, user_payload['name'], user_payload['email'], 'student', status_code=200)
+
+    def test_login_waiting_longer_than_the_queue_timeout_should_return_service_unavailable(self) -> None:
+        user_payload = get_user_payload()
+        post('/api/v1/students', user_payload)
+        payload = {
+            'email': user_payload['email'],
+            'password': user_payload['password']
+        }
+        hashing, release = Event(), Event()
+        def hashpw_mock(password: bytes, salt: bytes) -> bytes:
+            hashing.set()
+            release.wait()
+            return hashpw(password, salt)
+        config_get = Config.get
+        def get_mock(key_path: str) -> Any:
+            if key_path == 'admin.password-queue-timeout':
+                return 0.1
+            return config_get(key_path)
+        with patch.object(Config, 'get', get_mock), patch('helpers.password_hasher.hashpw', hashpw_mock):
+            # a sign up holds the only password worker
+            sign_up = Thread(target=post, args=('/api/v1/students', get_user_payload()))
+            sign_up.start()
+            hashing.wait()
+            try:
+                response = post('/api/v1/session', payload)
+            finally:
+                release.set()
+                sign_up.join()
+
+        assert response[0] == 503
@@ -3,7 +3,7 @@ from io import BytesIO
 
 import pytest
 
-from tests.helper import post, get_manager_id_token, get_random_name, get_new_group_id_code, CONTENT_TYPE_FORM_DATA, get_random_manager_token, get_filepath_of_size, get, get_student_id_token, create_join_request_group_id, patch, create_task_json, create_test_case_json
+from tests.helper import post, get_manager_id_token, get_random_name, get_new_group_id_code, CONTENT_TYPE_FORM_DATA, get_random_manager_token, get_filepath_of_size, get, get_student_id_token, create_join_request_group_id, patch, create_task_json, create_test_case_json, get_page
 
 # pylint: disable=too-many-public-methods
 class TestTask:
@@ -510,6 +510,29 @@ class TestTask:
         tasks = response[1]['tasks']
         assert len(tasks) == 0
 
+    def test_get_tasks_with_limit_should_page_through_all_tasks(self) -> None:
+        manager_token = get_manager_id_token()[1]
+        group_id = get_new_group_id_code(get_random_name(), manager_token)[0]
+        created = [ create_task_json(manager_token, group_id) for _ in range(3) ]
+
+        first_page = get_page(f'/api/v1/groups/{group_id}/tasks?limit=2', manager_token)
+        second_page = get_page(f'/api/v1/groups/{group_id}/tasks?limit=2&after={first_page[2]}', manager_token)
+
+        assert first_page[0] == 200
+        assert first_page[1]['tasks'] == created[:2]
+        assert first_page[2] is not None
+        assert second_page[0] == 200
+        assert second_page[1]['tasks'] == created[2:]
+        assert second_page[2] is None
+
+    def test_get_tasks_with_invalid_cursor_should_return_bad_request(self) -> None:
+        manager_token = get_manager_id_token()[1]
+        group_id = get_new_group_id_code(get_random_name(), manager_token)[0]
+
+        response = get(f'/api/v1/groups/{group_id}/tasks?after=invalid', manager_token)
+
+        assert response[0] == 400
+
     def test_get_tasks_with_invalid_group_should_return_not_found(self) -> None:
         manager_token = get_manager_id_token()[1]
 
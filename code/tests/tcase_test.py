@@ -1,11 +1,13 @@
+import hashlib
 from io import BytesIO
+import os
 from typing import Any
 from unittest.mock import patch as mock_patch
 
 import pytest
 
 from helpers.config import Config
-from tests.helper import get_manager_id_token, create_task_json, post, CONTENT_TYPE_FORM_DATA, get_filepath_of_size, get_student_id_token, create_join_request_group_id, get_random_manager_token, create_test_case_json, get, delete, get_new_group_id_code, get_random_name, patch
+from tests.helper import get_manager_id_token, create_task_json, post, CONTENT_TYPE_FORM_DATA, get_filepath_of_size, get_student_id_token, create_join_request_group_id, get_random_manager_token, create_test_case_json, get, delete, get_new_group_id_code, get_random_name, patch, get_page, get_stored_filepath, get_headers
 
 # pylint: disable=too-many-public-methods
 class TestTCase:
@@ -25,6 +27,7 @@ class TestTCase:
         json = response[1]
         test_id = json['id']
         assert json['closed'] is False
+        assert json['comparison_mode'] == 'exact'
         assert json['input_url'] == f'/api/v1/tests/{test_id}/in'
         assert json['output_url'] == f'/api/v1/tests/{test_id}/out'
 
@@ -47,6 +50,51 @@ class TestTCase:
         assert json['input_url'] == f'/api/v1/tests/{test_id}/in'
         assert json['output_url'] == f'/api/v1/tests/{test_id}/out'
 
+    def test_add_numeric_test_case_should_succeed_with_tolerance(self) -> None:
+        manager_token = get_manager_id_token()[1]
+        task_id = create_task_json(manager_token)['id']
+        payload = {
+            'input': (BytesIO(b'Input.'), 'input.in'),
+            'output': (BytesIO(b'3.14'), 'output.out'),
+            'closed': False,
+            'comparison_mode': 'numeric',
+            'tolerance': 0.01
+        }
+
+        response = post(f'/api/v1/tasks/{task_id}/tests', payload, manager_token, CONTENT_TYPE_FORM_DATA)
+
+        assert response[0] == 201
+        assert response[1]['comparison_mode'] == 'numeric'
+        assert response[1]['tolerance'] == 0.01
+
+    def test_add_numeric_test_case_without_tolerance_should_return_bad_request(self) -> None:
+        manager_token = get_manager_id_token()[1]
+        task_id = create_task_json(manager_token)['id']
+        payload = {
+            'input': (BytesIO(b'Input.'), 'input.in'),
+            'output': (BytesIO(b'3.14'), 'output.out'),
+            'closed': False,
+            'comparison_mode': 'numeric'
+        }
+
+        response = post(f'/api/v1/tasks/{task_id}/tests', payload, manager_token, CONTENT_TYPE_FORM_DATA)
+
+        assert response[0] == 400
+
+    def test_add_test_case_with_invalid_comparison_mode_should_return_bad_request(self) -> None:
+        manager_token = get_manager_id_token()[1]
+        task_id = create_task_json(manager_token)['id']
+        payload = {
+            'input': (BytesIO(b'Input.'), 'input.in'),
+            'output': (BytesIO(b'Output.'), 'output.out'),
+            'closed': False,
+            'comparison_mode': 'fuzzy'
+        }
+
+        response = post(f'/api/v1/tasks/{task_id}/tests', payload, manager_token, CONTENT_TYPE_FORM_DATA)
+
+        assert response[0] == 400
+
     def test_add_test_case_without_input_should_return_bad_request(self) -> None:
         manager_token = get_manager_id_token()[1]
         task_id = create_task_json(manager_token)['id']
@@ -123,26 +171,29 @@ class TestTCase:
 
             assert response[0] == 413
 
-    def test_add_test_case_with_invalid_output_size_should_return_invalid_file_size(self) -> None:
+    def test_add_test_case_with_invalid_output_size_should_return_invalid_file_size_and_release_the_input(self) -> None:
+        config_get = Config.get
         def get_mock(key_path: str) -> Any:
             if key_path == 'admin.managers-mail-list':
                 return []
             if key_path == 'files.test-max-size-mb':
                 return 0.3
-            assert False
+            return config_get(key_path)
         with mock_patch.object(Config, 'get', get_mock):
             filepath = get_filepath_of_size(round(0.31 * 1024 * 1024)) # 0.31 MB
             manager_token = get_manager_id_token()[1]
             task_id = create_task_json(manager_token)['id']
+            content_in = get_random_name()
             with open(filepath, 'rb') as file:
                 payload = {
-                    'input': (BytesIO(b'Input.'), 'input.in'),
+                    'input': (BytesIO(content_in.encode('utf-8')), 'input.in'),
                     'output': (file, 'output.out'),
                     'closed': True
                 }
                 response = post(f'/api/v1/tasks/{task_id}/tests', payload, manager_token, CONTENT_TYPE_FORM_DATA)
 
                 assert response[0] == 413
+                assert os.path.exists(get_stored_filepath(content_in, '.in')) is False
 
     def test_add_test_case_with_invalid_id_should_return_not_found(self) -> None:
         manager_token = get_manager_id_token()[1]
@@ -265,6 +316,66 @@ class TestTCase:
         assert response_in[0] == 403
         assert response_out[0] == 403
 
+    def test_download_input_again_with_its_etag_should_return_not_modified(self) -> None:
+        manager_token = get_manager_id_token()[1]
+        content_in = get_random_name()
+        test_case = create_test_case_json(manager_token, content_in=content_in)
+        etag = f'"{hashlib.sha256(content_in.encode("utf-8")).hexdigest()}"'
+
+        response = get(test_case['input_url'], manager_token, custom_headers={'If-None-Match': etag}, decode_as_json=False)
+
+        assert response[0] == 304
+
+    def test_download_input_with_x_accel_redirect_should_let_the_proxy_send_it(self) -> None:
+        manager_token = get_manager_id_token()[1]
+        content_in = get_random_name()
+        test_case = create_test_case_json(manager_token, content_in=content_in)
+        etag = f'"{hashlib.sha256(content_in.encode("utf-8")).hexdigest()}"'
+        stored_path = get_stored_filepath(content_in, '.in')
+        config_get = Config.get
+        def get_mock(key_path: str) -> Any:
+            if key_path == 'files.delivery':
+                return 'x_accel_redirect'
+            if key_path == 'files.internal-location':
+                return '/internal-files'
+            return config_get(key_path)
+        with mock_patch.object(Config, 'get', get_mock):
+            response = get_headers(test_case['input_url'], manager_token)
+            response_cached = get_headers(test_case['input_url'], manager_token, custom_headers={'If-None-Match': etag})
+
+        assert response[0] == 200
+        assert response[1]['X-Accel-Redirect'] == '/internal-files/blobs/' + '/'.join(stored_path.split(os.sep)[-3:])
+        assert response[1]['ETag'] == etag
+        assert response_cached[0] == 304
+        assert 'X-Accel-Redirect' not in response_cached[1]
+
+    def test_add_test_case_should_store_files_readable_by_other_users(self) -> None:
+        manager_token = get_manager_id_token()[1]
+        content_in = get_random_name()
+        create_test_case_json(manager_token, content_in=content_in)
+        umask = os.umask(0)
+        os.umask(umask)
+
+        mode = os.stat(get_stored_filepath(content_in, '.in')).st_mode & 0o777
+
+        assert mode == 0o644 & ~umask
+
+    def test_delete_test_with_same_content_of_another_should_keep_the_other_files(self) -> None:
+        manager_token = get_manager_id_token()[1]
+        content_in = get_random_name()
+        content_out = get_random_name()
+        deleted_test = create_test_case_json(manager_token, content_in=content_in, content_out=content_out)
+        kept_test = create_test_case_json(manager_token, content_in=content_in, content_out=content_out)
+
+        delete(f'/api/v1/tests/{deleted_test["id"]}', manager_token)
+        response_in = get(kept_test['input_url'], manager_token, decode_as_json=False)
+        response_out = get(kept_test['output_url'], manager_token, decode_as_json=False)
+
+        assert response_in[0] == 200
+        assert response_out[0] == 200
+        assert str(response_in[1]) == content_in
+        assert str(response_out[1]) == content_out
+
     def test_download_input_output_of_open_test_with_non_manager_should_return_forbidden(self) -> None:
         manager_id_token = get_manager_id_token()
         test_case = create_test_case_json(manager_id_token[1], closed=False)
@@ -355,6 +466,21 @@ class TestTCase:
         assert len(response_student[1]['open_tests']) == 0
         assert len(response_student[1]['closed_tests']) == 0
 
+    def test_get_tests_with_limit_should_page_through_all_tests(self) -> None:
+        manager_token = get_manager_id_token()[1]
+        task_id = create_task_json(manager_token)['id']
+        created = [ create_test_case_json(manager_token, task_id=task_id)['id'] for _ in range(3) ]
+
+        first_page = get_page(f'/api/v1/tasks/{task_id}/tests?limit=2', manager_token)
+        second_page = get_page(f'/api/v1/tasks/{task_id}/tests?limit=2&after={first_page[2]}', manager_token)
+
+        assert first_page[0] == 200
+        assert [ test['id'] for test in first_page[1]['open_tests'] ] == created[:2]
+        assert first_page[2] is not None
+        assert second_page[0] == 200
+        assert [ test['id'] for test in second_page[1]['open_tests'] ] == created[2:]
+        assert second_page[2] is None
+
     def test_get_tests_with_non_manager_should_return_forbidden(self) -> None:
         manager_token = get_manager_id_token()[1]
         task_id = create_task_json(manager_token)['id']
@@ -35,6 +35,27 @@ class TestUser:
 
         assert_user_response(response, user_payload['name'], user_payload['email'], 'manager', False, 200)
 
+    def test_update_name_should_not_trust_the_stale_token_claims(self) -> None:
+        user_payload = get_user_payload()
+        token = post('/api/v1/students', user_payload)[1]['token']
+        updated_name = get_random_name()
+        patch('/api/v1/user', {'name': updated_name}, token)
+
+        response = patch('/api/v1/user', {}, token) # returns the authenticated user
+
+        assert_user_response(response, updated_name, user_payload['email'], 'student', False, 200)
+
+    def test_update_name_should_not_trust_the_stale_token_claims_after_a_new_login(self) -> None:
+        user_payload = get_user_payload()
+        token = post('/api/v1/students', user_payload)[1]['token']
+        updated_name = get_random_name()
+        patch('/api/v1/user', {'name': updated_name}, token)
+        post('/api/v1/session', {'email': user_payload['email'], 'password': user_payload['password']}) # issues a new version
+
+        response = patch('/api/v1/user', {}, token)
+
+        assert_user_response(response, updated_name, user_payload['email'], 'student', False, 200)
+
     def test_update_user_without_token_should_return_unauthorized(self) -> None:
         response = patch('/api/v1/user', {}, 'invalid-token')
 
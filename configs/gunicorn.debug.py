@@ -3,5 +3,6 @@ wsgi_app = 'app_debug:server'
 bind = '0.0.0.0:3031'
 workers = 2
 threads = 2
+raw_env = [f'CODEMAZE_REQUEST_THREADS={threads}'] # bounds the passwords waiting to be hashed (see PasswordHasher)
 max_requests = 1000
 reload = True
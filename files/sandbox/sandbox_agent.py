@@ -0,0 +1,164 @@
+# © 2023 Codemaze and Codemaze-Web by Danilo Cleber Becke
+
+# Long-lived agent running inside each runner container (see compose.yaml).
+# Receives a whole job as a single JSON line and streams back one JSON line per step:
+#   -> {"source_name", "source", "compile", "executable_name", "executable"?, "return_executable"?, "execute", "tests", "timeout", "parallel", "max_output"?}
+#   <- {"compilation": {"stdout", "stderr", "executable"?}}
+#   <- {"index", "stdout", "stderr", "exit_code", "timed_out", "output_exceeded", "duration"} (one per test, in order)
+#   <- {"done": true} | {"error": "..."}
+# When "executable" (a cached compilation) is given, it's used instead of compiling the source.
+# When "return_executable" is true, the compiled executable is sent back to be cached.
+# A test writing more than "max_output" bytes to stdout or stderr is killed, and only the first "max_output" bytes are sent.
+# Binary payloads (source, executable, tests' stdin, stdout, and stderr) are base64 encoded.
+
+from argparse import ArgumentParser
+from base64 import b64decode, b64encode
+from concurrent.futures import ThreadPoolExecutor
+import json
+import os
+import select
+import shutil
+import signal
+from socketserver import StreamRequestHandler, ThreadingTCPServer
+import subprocess
+import tempfile
+from threading import Event, Thread
+import time
+
+CHUNK_SIZE = 64 * 1024
+POLL_SECONDS = 0.1
+DRAIN_SECONDS = 1 # after the process exits - a leftover child (e.g. in its own session) may keep the pipes open forever
+
+def encode(blob):
+    return b64encode(blob).decode('ascii')
+
+def kill_group(process):
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+
+def write_stdin(process, stdin, stop):
+    # polled, as the reads - a leftover child may keep the pipe open without reading it
+    fd = process.stdin.fileno()
+    try:
+        while stdin and not stop.is_set():
+            if select.select([], [fd], [], POLL_SECONDS)[1]:
+                stdin = stdin[os.write(fd, stdin[:CHUNK_SIZE]):]
+        if not stop.is_set():
+            process.stdin.close()
+    except OSError:
+        pass # the process exited without reading all of it
+
+def read_capped(process, stream, chunks, max_output, exceeded, stop):
+    # polled, so it can be stopped while the pipe is still open
+    size = 0
+    fd = stream.fileno()
+    while not stop.is_set():
+        if not select.select([fd], [], [], POLL_SECONDS)[0]:
+            continue
+        chunk = os.read(fd, CHUNK_SIZE)
+        if not chunk:
+            return
+        if max_output is not None and size + len(chunk) > max_output:
+            chunks.append(chunk[:max_output - size])
+            exceeded.set()
+            kill_group(process) # e.g. printing in an infinite loop
+            return
+        chunks.append(chunk)
+        size += len(chunk)
+
+def run_process(command, cwd, stdin=b'', timeout=None, max_output=None):
+    with subprocess.Popen(command, cwd=cwd, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE, start_new_session=True) as process:
+        start = time.monotonic()
+        stdout, stderr, exceeded, stop = [], [], Event(), Event()
+        writer = Thread(target=write_stdin, args=(process, stdin, stop), daemon=True)
+        readers = [
+            Thread(target=read_capped, args=(process, process.stdout, stdout, max_output, exceeded, stop), daemon=True),
+            Thread(target=read_capped, args=(process, process.stderr, stderr, max_output, exceeded, stop), daemon=True),
+        ]
+        writer.start()
+        for reader in readers:
+            reader.start()
+        timed_out = False
+        try:
+            process.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            timed_out = True
+        kill_group(process) # also any leftover child in its group
+        process.wait()
+        deadline = time.monotonic() + DRAIN_SECONDS
+        for reader in readers:
+            reader.join(timeout=max(0, deadline - time.monotonic()))
+        if any(reader.is_alive() for reader in readers):
+            timed_out = True # a child outside of the group still holds the pipes
+        stop.set() # the pipes are closed once the threads are done
+        for thread in [writer, *readers]:
+            thread.join()
+        duration = time.monotonic() - start
+        if timed_out:
+            return {'stdout': b'', 'stderr': b'', 'exit_code': None, 'timed_out': True, 'output_exceeded': False, 'duration': duration}
+        return {'stdout': b''.join(stdout), 'stderr': b''.join(stderr), 'exit_code': process.returncode, 'timed_out': False, 'output_exceeded': exceeded.is_set(), 'duration': duration}
+
+class JobHandler(StreamRequestHandler):
+    def send(self, message):
+        self.wfile.write(json.dumps(message).encode('utf-8') + b'\n')
+        self.wfile.flush()
+
+    def handle(self):
+        line = self.rfile.readline()
+        if not line:
+            return
+        workdir = tempfile.mkdtemp(dir=os.getcwd())
+        try:
+            self.run_job(json.loads(line), workdir)
+            self.send({'done': True})
+        # pylint: disable=broad-exception-caught
+        except Exception as e:
+            self.send({'error': repr(e)})
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    def compile(self, job, workdir):
+        executable_path = os.path.join(workdir, job['executable_name'])
+        if job.get('executable') is not None:
+            with open(executable_path, 'wb') as executable:
+                executable.write(b64decode(job['executable']))
+            os.chmod(executable_path, 0o755)
+            return {'stdout': '', 'stderr': ''}
+        source_path = os.path.join(workdir, job['source_name'])
+        with open(source_path, 'wb') as source:
+            source.write(b64decode(job['source']))
+        compilation = run_process(job['compile'], workdir)
+        os.remove(source_path)
+        result = {'stdout': compilation['stdout'].decode('utf-8', 'replace'), 'stderr': compilation['stderr'].decode('utf-8', 'replace')}
+        if job.get('return_executable') and os.path.exists(executable_path):
+            with open(executable_path, 'rb') as executable:
+                result['executable'] = encode(executable.read())
+        return result
+
+    def run_job(self, job, workdir):
+        compilation = self.compile(job, workdir)
+        self.send({'compilation': compilation})
+        if compilation['stdout'].strip() or compilation['stderr'].strip():
+            return
+        def execute(test):
+            return run_process(job['execute'], workdir, b64decode(test), float(job['timeout']), job.get('max_output'))
+        with ThreadPoolExecutor(max_workers=max(1, int(job.get('parallel', 1)))) as executor:
+            # map yields in submission order, so results are streamed in the tests' order
+            for index, execution in enumerate(executor.map(execute, job['tests'])):
+                execution['index'] = index
+                execution['stdout'] = encode(execution['stdout'])
+                execution['stderr'] = encode(execution['stderr'])
+                self.send(execution)
+
+class AgentServer(ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+if __name__ == '__main__':
+    parser = ArgumentParser(usage='sandbox_agent.py [--port 7000]')
+    parser.add_argument('--port', '-p', type=int, default=7000, help='TCP port to listen on. Default = 7000')
+    args = parser.parse_args()
+    with AgentServer(('0.0.0.0', args.port), JobHandler) as server:
+        server.serve_forever()
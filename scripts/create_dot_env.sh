@@ -36,3 +36,10 @@ fi
 # runner max memory allowed
 MEM_ALLOWED=`cat config.toml | grep max-memory-mb | awk -F '=' '{print $2}'`
 echo RUNNER_MAX_MEM=\""$MEM_ALLOWED"\" >> "$DOT_ENV"
+
+# runners' pool sizes
+pool_size() {
+    awk -v section="[runners.$1]" '$0 == section { found = 1; next } /^\[/ { found = 0 } found && /^pool-size/ { split($0, value, "="); gsub(/ /, "", value[2]); print value[2] }' config.toml
+}
+echo RUNNER_POOL_C=\""$(pool_size c)"\" >> "$DOT_ENV"
+echo RUNNER_POOL_PYTHON=\""$(pool_size python)"\" >> "$DOT_ENV"
@@ -0,0 +1,73 @@
+import os
+import sys
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine.base import Connection
+
+# Prints the query plans of the repository's hot lookups without and with the indexes declared in the DTOs.
+# Everything runs in a single transaction that is rolled back: the synthetic rows and the dropped indexes never persist.
+# Dropping the indexes locks the tables until the rollback, so run it against a copy of the database, not production.
+# Usage: CODEMAZE_DB_STRING=postgresql://... python scripts/explain_hot_queries.py [number of students]
+
+INDEXES = [
+    'ix_result_task_id_student_id_created_at',
+    'ix_test_case_result_result_id',
+    'ix_test_case_task_id_created_at_id',
+    'ix_task_group_id_created_at_id',
+    'ix_student_group_group_id_approved_created_at_student_id',
+]
+
+QUERIES = {
+    'get_latest_result': 'SELECT * FROM result WHERE student_id = :student_id AND task_id = :task_id ORDER BY created_at DESC LIMIT 1',
+    'get_number_of_results': 'SELECT count(id) FROM result WHERE student_id = :student_id AND task_id = :task_id',
+    'get_results_for_task': "SELECT * FROM result WHERE task_id = :task_id AND status = 'done' ORDER BY created_at",
+    'get_test_case_results': 'SELECT * FROM test_case_result WHERE result_id = :result_id ORDER BY created_at, id',
+    'get_tests': 'SELECT * FROM test_case WHERE task_id = :task_id ORDER BY created_at, id LIMIT 20',
+    'get_tasks': 'SELECT * FROM task WHERE group_id = :group_id ORDER BY created_at, id LIMIT 20',
+    'get_join_requests': 'SELECT * FROM "user" JOIN student_group ON "user".id = student_group.student_id WHERE student_group.group_id = :group_id AND student_group.approved = false ORDER BY student_group.created_at, student_group.student_id LIMIT 20',
+    'get_students_with_join_request': 'SELECT * FROM "user" JOIN student_group ON "user".id = student_group.student_id WHERE student_group.group_id = :group_id AND student_group.approved = true ORDER BY "user".name',
+}
+
+SEED = [
+    # a few semesters of history: 50 groups, 10 tasks each, 10 tests per task, and every student submitting 5 times to each task of their group
+    # the ids come from the DTOs' sequences, which are client-side defaults only
+    'INSERT INTO "user" (id, email, password, name, role, created_at) SELECT nextval(\'sq_user_pk\'), \'bench-manager@codemaze\', \'\', \'manager\', \'MANAGER\', now()',
+    'INSERT INTO "user" (id, email, password, name, role, created_at) SELECT nextval(\'sq_user_pk\'), \'bench-\' || n || \'@codemaze\', \'\', \'student \' || n, \'STUDENT\', now() FROM generate_series(1, :students) AS n',
+    'INSERT INTO "group" (id, active, name, code, manager_id, created_at) SELECT nextval(\'sq_group_pk\'), true, \'group \' || n, lpad(to_hex(n), 6, \'x\'), (SELECT id FROM "user" WHERE email = \'bench-manager@codemaze\'), now() FROM generate_series(1, 50) AS n',
+    'INSERT INTO student_group (student_id, group_id, approved, created_at) SELECT u.id, g.id, u.id % 7 <> 0, now() FROM "user" u JOIN "group" g ON u.id % 50 = g.id % 50 WHERE u.email LIKE \'bench-%@codemaze\' AND u.role = \'STUDENT\' AND g.manager_id = (SELECT id FROM "user" WHERE email = \'bench-manager@codemaze\')',
+    'INSERT INTO task (id, name, languages, file_path, group_id, created_at) SELECT nextval(\'sq_task_pk\'), \'task \' || n, ARRAY[\'c\'], \'\', g.id, now() FROM "group" g CROSS JOIN generate_series(1, 10) AS n WHERE g.manager_id = (SELECT id FROM "user" WHERE email = \'bench-manager@codemaze\')',
+    'INSERT INTO test_case (id, input_file_path, output_file_path, closed, task_id, created_at) SELECT nextval(\'sq_test_case_pk\'), \'\', \'\', n % 2 = 0, t.id, now() FROM task t JOIN "group" g ON t.group_id = g.id CROSS JOIN generate_series(1, 10) AS n WHERE g.manager_id = (SELECT id FROM "user" WHERE email = \'bench-manager@codemaze\')',
+    'INSERT INTO result (id, correct_open, correct_closed, file_path, student_id, task_id, created_at) SELECT nextval(\'sq_result_pk\'), 0, 0, \'\', sg.student_id, t.id, now() - (n || \' minutes\')::interval FROM student_group sg JOIN task t ON t.group_id = sg.group_id CROSS JOIN generate_series(1, 5) AS n',
+    'INSERT INTO test_case_result (id, success, test_case_id, result_id, created_at) SELECT nextval(\'sq_test_case_result_pk\'), tc.id % 3 = 0, tc.id, r.id, now() FROM result r JOIN test_case tc ON tc.task_id = r.task_id',
+    'ANALYZE',
+]
+
+def sample_parameters(connection: Connection) -> dict[str, int]:
+    row = connection.execute(text('SELECT id, student_id, task_id FROM result ORDER BY id DESC LIMIT 1')).one()
+    group_id = connection.execute(text('SELECT group_id FROM task WHERE id = :id'), {'id': row.task_id}).scalar_one()
+    return {'result_id': row.id, 'student_id': row.student_id, 'task_id': row.task_id, 'group_id': group_id}
+
+def explain(connection: Connection, title: str, parameters: dict[str, int]) -> None:
+    print(f'===== {title} =====')
+    for name, query in QUERIES.items():
+        print(f'--- {name}')
+        for line in connection.execute(text(f'EXPLAIN (ANALYZE, BUFFERS) {query}'), parameters).scalars():
+            print(line)
+
+def main(students: int) -> None:
+    engine = create_engine(os.environ['CODEMAZE_DB_STRING'])
+    with engine.connect() as connection:
+        transaction = connection.begin()
+        try:
+            for statement in SEED:
+                connection.execute(text(statement), {'students': students})
+            parameters = sample_parameters(connection)
+            explain(connection, 'with indexes', parameters)
+            for index in INDEXES:
+                connection.execute(text(f'DROP INDEX IF EXISTS {index}'))
+            explain(connection, 'without indexes', parameters)
+        finally:
+            transaction.rollback()
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)